@@ -0,0 +1,236 @@
+import re
+from collections import namedtuple
+
+import numpy as np
+
+from highlights_loader import UNIT_BPS, UNIT_PCT, load_highlights, quarter_key
+
+# --- Derived figures over (bank x metric x quarter) arrays ---
+# Every function works on float arrays whose last axis is consecutive
+# quarters, so one call covers all banks and metrics. Missing quarters are
+# NaN and only spoil the windows that contain them. Conventions follow the
+# highlights tables: amounts change in %, percentages change in bps, and
+# year-to-date amounts are sums of the quarters of the calendar year.
+
+# Amounts reported per quarter (YTD = sum, LTM = rolling sum); every other
+# VND metric is an end-of-quarter balance.
+FLOW_METRICS = ('Net interest income', 'Non-interest income', 'Total operating income', 'Operating expenses',
+                'Profit before tax')
+
+# LTM flow over the average balance of the last five quarter ends, in %. The
+# highlights carry neither net income nor equity, so these are pre-tax
+# returns on assets; ltm_return() takes any other pair.
+RETURN_RATIOS = {
+    'Pre-tax ROA (LTM)': ('Profit before tax', 'Total assets'),
+    'NII / average assets (LTM)': ('Net interest income', 'Total assets'),
+}
+
+_VS_RE = re.compile(r'\s+vs\.?\s+', re.IGNORECASE)
+_YTD_LABEL_RE = re.compile(r'^(?:(\d{1,2})M|FY)(\d{2})$')
+
+
+def shift(values, lag):
+    """Values moved `lag` quarters later along the last axis; the first `lag` quarters become NaN."""
+    out = np.full_like(values, np.nan, dtype=np.float64)
+    if lag < values.shape[-1]:
+        out[..., lag:] = values[..., :values.shape[-1] - lag]
+    return out
+
+
+def rolling_sum(values, window):
+    out = np.array(values, dtype=np.float64)
+    for lag in range(1, window):
+        out += shift(values, lag)
+    return out
+
+
+def ltm(values):
+    """Last-twelve-months sum of quarterly flows."""
+    return rolling_sum(values, 4)
+
+
+def ytd(values, keys):
+    """Year-to-date sum of quarterly flows; `keys` are the quarter_key() of the last axis."""
+    q = np.asarray(keys) % 4
+    out = np.array(values, dtype=np.float64)
+    for lag in range(1, 4):
+        out = np.where(q >= lag, out + shift(values, lag), out)
+    return out
+
+
+def annualize(ytd_values, keys):
+    """Year-to-date flows scaled to a full year."""
+    return ytd_values * 4 / (np.asarray(keys) % 4 + 1)
+
+
+def average_balance(stock, quarters=4):
+    """Mean of the quarters + 1 quarter-end balances spanning the last `quarters` quarters."""
+    return rolling_sum(stock, quarters + 1) / (quarters + 1)
+
+
+def ltm_return(flow, stock):
+    """LTM flow over the average balance, in % (ROA, ROE, NIM style ratios)."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return ltm(flow) / average_balance(stock) * 100
+
+
+def pct_change(cur, prev):
+    """(cur / prev - 1) in %, as printed for amounts (a smaller expense is a negative change)."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return (cur / prev - 1) * 100
+
+
+def bps_change(cur, prev):
+    """Difference of two percentages in bps."""
+    return (cur - prev) * 100
+
+
+def change(values, lag, is_pct):
+    """
+    Change against `lag` quarters earlier (1: QoQ, 4: YoY): bps where is_pct
+    (broadcast against `values`), % elsewhere.
+    """
+    prev = shift(values, lag)
+    return np.where(is_pct, bps_change(values, prev), pct_change(values, prev))
+
+
+class Panel:
+    """values[bank, metric, quarter] over consecutive quarters starting at quarter key `start`."""
+
+    def __init__(self, banks, metrics, start, values, units):
+        self.banks = list(banks)
+        self.metrics = list(metrics)
+        self.keys = start + np.arange(values.shape[-1])
+        self.values = np.asarray(values, dtype=np.float64)
+        self.units = np.asarray(units)
+        self.is_flow = np.isin(self.metrics, FLOW_METRICS)
+        self.is_pct = self.units == UNIT_PCT
+
+    def metric(self, name):
+        """(bank, quarter) array of one metric."""
+        return self.values[:, self.metrics.index(name)]
+
+    @classmethod
+    def from_highlights(cls, snapshots):
+        """
+        Panel from {bank: [Highlights, ...]}. Quarter columns are merged over
+        the snapshots of a bank; later snapshots win where they overlap.
+        """
+        metrics, units = [], {}
+        keys = []
+        for tables in snapshots.values():
+            for h in tables:
+                keys += [quarter_key(q) for q in h.quarters]
+                for metric, unit in zip(h.metrics, h.units):
+                    if metric not in units:
+                        metrics.append(metric)
+                        units[metric] = unit
+        start = min(keys)
+        values = np.full((len(snapshots), len(metrics), max(keys) - start + 1), np.nan)
+        row_of = {metric: i for i, metric in enumerate(metrics)}
+        for b, tables in enumerate(snapshots.values()):
+            for h in tables:
+                rows = [row_of[m] for m in h.metrics]
+                cols = [quarter_key(q) - start for q in h.quarters]
+                values[b, np.array(rows)[:, None], np.array(cols)[None, :]] = h.values[:, h.quarter_cols]
+        return cls(snapshots.keys(), metrics, start, values, [units[m] for m in metrics])
+
+
+def analyze(panel):
+    """
+    All derived figures of a panel at once. Returns {name: array}: per
+    (bank, metric, quarter) 'ltm', 'ytd', 'annualized' (NaN for balances and
+    ratios), 'qoq', 'yoy' and 'ytd_yoy' (year to date against the same period
+    a year earlier); per (bank, quarter) each RETURN_RATIOS entry whose
+    inputs are in the panel.
+    """
+    v, keys = panel.values, panel.keys
+    flow = panel.is_flow[:, None]
+    pct = panel.is_pct[:, None]
+    ytd_values = np.where(flow, ytd(v, keys), v)
+    results = {
+        'ltm': np.where(flow, ltm(v), np.nan),
+        'ytd': ytd_values,
+        'annualized': np.where(flow, annualize(ytd_values, keys), np.nan),
+        'qoq': change(v, 1, pct),
+        'yoy': change(v, 4, pct),
+        'ytd_yoy': change(ytd_values, 4, pct),
+    }
+    for name, (flow_metric, stock_metric) in RETURN_RATIOS.items():
+        if flow_metric in panel.metrics and stock_metric in panel.metrics:
+            results[name] = ltm_return(panel.metric(flow_metric), panel.metric(stock_metric))
+    return results
+
+
+# --- Checks against the printed tables ---
+Mismatch = namedtuple('Mismatch', ['metric', 'column', 'printed', 'computed', 'tolerance'])
+
+
+def _half_ulp(values):
+    """Half a unit of the last decimal each value is printed with (0 to 3 decimals)."""
+    decimals = np.full(values.shape, 3)
+    for d in (2, 1, 0):
+        scaled = values * 10 ** d
+        decimals = np.where(np.abs(scaled - np.round(scaled)) < 1e-6, d, decimals)
+    return 0.5 * 10.0 ** -decimals
+
+
+def _ytd_quarters(label):
+    """'6M25' -> (2025, 2): the year and number of quarters of a YTD label."""
+    match = _YTD_LABEL_RE.match(label)
+    return 2000 + int(match.group(2)), int(match.group(1) or 12) // 3
+
+
+def check_changes(h):
+    """
+    Recomputes the "vs" columns of a Highlights table from its own period
+    columns, and the current YTD of each flow from its quarters where the
+    table has them all. Returns (cells checked, [Mismatch]); a mismatch is a
+    difference larger than the rounding of the printed figures allows.
+    """
+    v = h.values
+    ulp = _half_ulp(np.nan_to_num(v))
+    checked, mismatches = 0, []
+
+    for k, col in enumerate(h.change_cols):
+        cur_label, prev_label = _VS_RE.split(h.columns[col])
+        cur, prev = v[:, h.columns.index(cur_label)], v[:, h.columns.index(prev_label)]
+        u_cur, u_prev = ulp[:, h.columns.index(cur_label)], ulp[:, h.columns.index(prev_label)]
+        bps = h.change_units[:, k] == UNIT_BPS
+        computed = np.where(bps, bps_change(cur, prev), pct_change(cur, prev))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            tolerance = np.where(bps, 100 * (u_cur + u_prev) + 0.5,
+                                 100 * (u_cur / np.abs(prev) + np.abs(cur) * u_prev / prev ** 2) + 0.05)
+        printed = v[:, col]
+        valid = ~np.isnan(printed) & ~np.isnan(computed)
+        checked += int(valid.sum())
+        for i in np.flatnonzero(valid & (np.abs(printed - computed) > tolerance + 1e-9)):
+            mismatches.append(Mismatch(h.metrics[i], h.columns[col], printed[i], computed[i], tolerance[i]))
+
+    ytd_label = h.ytd_periods[-1]
+    year, n = _ytd_quarters(ytd_label)
+    wanted = [year * 4 + q for q in range(n)]
+    cols = {quarter_key(h.columns[c]): c for c in h.quarter_cols}
+    if all(key in cols for key in wanted):
+        quarter_cols = [cols[key] for key in wanted]
+        for i, metric in enumerate(h.metrics):
+            if metric in FLOW_METRICS:
+                computed = v[i, quarter_cols].sum()
+                printed = v[i, h.columns.index(ytd_label)]
+                tolerance = 0.5 * (n + 1)
+                checked += 1
+                if abs(printed - computed) > tolerance:
+                    mismatches.append(Mismatch(metric, f"{ytd_label} (sum of quarters)", printed, computed,
+                                               tolerance))
+    return checked, mismatches
+
+
+if __name__ == '__main__':
+    import sys
+
+    for path in sys.argv[1:] or ['aithucchien_1.csv', 'aithucchien_2.csv', 'aithucchien_3.csv']:
+        checked, mismatches = check_changes(load_highlights(path))
+        print(f"{path}: {checked} printed figures checked, {len(mismatches)} mismatches")
+        for m in mismatches:
+            print(f"  {m.metric} [{m.column}]: printed {m.printed:g}, computed {m.computed:.2f} "
+                  f"(tolerance {m.tolerance:.2f})")
@@ -0,0 +1,824 @@
+import csv
+import statistics
+import time
+
+# --- Benchmark helpers ---
+# Run with: python benchmarks.py <name> [options]
+
+
+def time_call(func, repeat=5):
+    """Runs func() `repeat` times and returns the median wall time in seconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def synthetic_highlights_page(source_csv='aithucchien_1.csv', decoy_tables=300, copies=20):
+    """
+    Builds a large highlights page: the real table (repeated `copies` times to
+    make it big) surrounded by many small navigation/layout tables.
+    """
+    from synthetic_data import highlights_html
+
+    with open(source_csv, newline='', encoding='utf-8') as f:
+        return highlights_html(list(csv.reader(f)), decoy_tables, copies)
+
+
+# --- Crawler table extraction ---
+
+def bench_table_extraction(pages=None, repeat=5):
+    """Compares the BeautifulSoup + pd.read_html path with the single-pass lxml path."""
+    from crawler import extract_highlights, extract_main_table, parse_financials_html
+
+    if pages:
+        documents = []
+        for path in pages:
+            with open(path, 'rb') as f:
+                documents.append((path, f.read()))
+    else:
+        documents = [('synthetic (300 decoy tables, 460 rows)', synthetic_highlights_page())]
+
+    for name, content in documents:
+        legacy = time_call(lambda: parse_financials_html(content), repeat)
+        rows_only = time_call(lambda: extract_main_table(content), repeat)
+        typed = time_call(lambda: extract_highlights(content), repeat)
+        print(f"{name}: {len(content) / 1e6:.2f} MB")
+        print(f"  bs4 + read_html + max(size): {legacy * 1000:9.1f} ms")
+        print(f"  lxml single pass (rows):     {rows_only * 1000:9.1f} ms  ({legacy / rows_only:.1f}x)")
+        print(f"  lxml single pass (typed):    {typed * 1000:9.1f} ms  ({legacy / typed:.1f}x)")
+
+
+# --- Chart templates ---
+
+def _jittered_page_data(seed):
+    """Page 4-6 data with every number scaled by a random factor, like another bank's figures."""
+    import random
+
+    import report_visualization as rv
+
+    rng = random.Random(seed)
+    data = rv.page_data()
+    for key in ('pbt', 'nim', 'cof', 'credit_costs', 'credit_growth', 'roa', 'roe'):
+        data[key] = tuple(round(v * rng.uniform(0.5, 1.5), 1) for v in data[key])
+    return data
+
+
+def bench_chart_templates(counts=(1, 100), pages=(4, 5, 6), dpi=72):
+    """Per-chart cost of rebuilding each page vs updating a template, for 1 and N datasets."""
+    import io
+
+    import report_visualization as rv
+    from chart_templates import PageTemplate
+
+    rv.plt.switch_backend('Agg')
+    for page in pages:
+        for count in counts:
+            datasets = [_jittered_page_data(i) for i in range(count)]
+
+            start = time.perf_counter()
+            for data in datasets:
+                fig = rv.PAGES[page](data)
+                fig.savefig(io.BytesIO(), format='png', dpi=dpi)
+                rv.plt.close(fig)
+            rebuild = (time.perf_counter() - start) / count
+
+            start = time.perf_counter()
+            template = PageTemplate(page, datasets[0])
+            for data in datasets:
+                template.render(data, io.BytesIO(), dpi=dpi, fmt='png')
+            template.close()
+            templated = (time.perf_counter() - start) / count
+
+            print(f"page {page}, {count:4d} datasets: rebuild {rebuild * 1000:7.1f} ms/chart, "
+                  f"template {templated * 1000:7.1f} ms/chart ({rebuild / templated:.1f}x)")
+
+
+# --- Report builds ---
+
+def bench_report_throughput(count=24, workers=None, sources=('aithucchien_1.csv', 'aithucchien_2.csv', 'aithucchien_3.csv')):
+    """Board packs per minute: sequential build_report calls vs build_reports over a process pool."""
+    import os
+    import tempfile
+
+    from generate_report import ReportSpec, build_report, build_reports
+
+    specs = [ReportSpec(f"Bank{i:03d}", sources[i % len(sources)]) for i in range(count)]
+    with tempfile.TemporaryDirectory() as output_dir:
+        build_report(specs[0], os.path.join(output_dir, 'warmup.pdf'))
+
+        start = time.perf_counter()
+        for i, spec in enumerate(specs):
+            build_report(spec, os.path.join(output_dir, f"sequential_{i}.pdf"))
+        sequential = time.perf_counter() - start
+
+        start = time.perf_counter()
+        build_reports(specs, os.path.join(output_dir, 'pool'), workers)
+        pooled = time.perf_counter() - start
+
+    print(f"{count} reports, sequential: {sequential:6.2f}s ({count / sequential * 60:6.0f} reports/min)")
+    print(f"{count} reports, {workers or os.cpu_count()} workers: {pooled:6.2f}s "
+          f"({count / pooled * 60:6.0f} reports/min, {sequential / pooled:.1f}x)")
+
+
+def bench_font_loading(repeat=5):
+    """Cost of parsing the report font and building the stylesheet, against a whole report build."""
+    import os
+    import tempfile
+
+    from reportlab.pdfbase.ttfonts import TTFont
+
+    import generate_report
+    from report_fonts import resolve_font
+
+    found = resolve_font()
+    if found is None:
+        print("No Vietnamese font found; nothing to measure.")
+        return
+    label, path = found
+    parse = time_call(lambda: TTFont('BenchFont', path), repeat)
+    styles = time_call(lambda: generate_report.get_styles.__wrapped__('Helvetica'), repeat)
+    with tempfile.TemporaryDirectory() as output_dir:
+        output = os.path.join(output_dir, 'report.pdf')
+        start = time.perf_counter()
+        generate_report.build_report(output=output)
+        first = time.perf_counter() - start
+        warm = time_call(lambda: generate_report.build_report(output=output), repeat)
+        pdf_size = os.path.getsize(output)
+    print(f"{label}: parse {parse * 1000:.1f} ms (once per process), stylesheet {styles * 1000:.1f} ms")
+    print(f"report build: first {first * 1000:.0f} ms, later {warm * 1000:.0f} ms")
+    print(f"font file {os.path.getsize(path) / 1024:.0f} KB, whole PDF {pdf_size / 1024:.0f} KB (font embedded as a glyph subset)")
+
+
+def bench_image_assets(dpis=(150, 100), repeat=3):
+    """PDF size and build time with images embedded at source resolution vs resized for their placed size."""
+    import os
+    import tempfile
+
+    import generate_report
+
+    assets_dir = os.getcwd()
+    metrics = generate_report.ReportMetrics.from_csv()
+    with tempfile.TemporaryDirectory() as work_dir:
+        os.chdir(work_dir)  # keeps the asset cache of this run out of the repo
+        try:
+            def build(dpi):
+                spec = generate_report.ReportSpec(assets_dir=assets_dir, image_dpi=dpi)
+                generate_report.build_report(spec, 'report.pdf', metrics)
+
+            raw = time_call(lambda: build(None), repeat)
+            raw_size = os.path.getsize('report.pdf')
+            print(f"source images:  {raw * 1000:6.0f} ms, {raw_size / 1024:6.0f} KB")
+            for dpi in dpis:
+                start = time.perf_counter()
+                build(dpi)
+                cold = time.perf_counter() - start
+                warm = time_call(lambda: build(dpi), repeat)
+                size = os.path.getsize('report.pdf')
+                print(f"{dpi:3d} dpi assets: {warm * 1000:6.0f} ms ({cold * 1000:.0f} ms with an empty cache), "
+                      f"{size / 1024:6.0f} KB ({raw_size / size:.1f}x smaller)")
+        finally:
+            os.chdir(assets_dir)
+
+
+def bench_chart_embedding(pages=(5, 7, 8), repeat=3):
+    """Per-chart cost and PDF size of in-memory vector charts vs in-memory PNGs vs PNG files."""
+    import io
+    import os
+    import tempfile
+
+    from reportlab.platypus import Image, SimpleDocTemplate
+
+    import report_visualization as rv
+    from chart_flowables import FigureFlowable, svg2rlg
+
+    rv.plt.switch_backend('Agg')
+    data = rv.page_data()
+
+    def via_file(page, work_dir):
+        fig = rv.PAGES[page](data)
+        path = os.path.join(work_dir, f'page{page}.png')
+        fig.savefig(path, dpi=150, facecolor=fig.get_facecolor())
+        rv.plt.close(fig)
+        return Image(path, width=450, height=225)
+
+    modes = {'png file': None, 'in-memory png': False}
+    if svg2rlg is not None:
+        modes['in-memory vector'] = True
+    with tempfile.TemporaryDirectory() as work_dir:
+        for page in pages:
+            for mode, vector in modes.items():
+                def build():
+                    if vector is None:
+                        flowable = via_file(page, work_dir)
+                    else:
+                        flowable = FigureFlowable(lambda: rv.PAGES[page](data), 450, 225, vector=vector)
+                    out = io.BytesIO()
+                    SimpleDocTemplate(out).build([flowable])
+                    return out
+
+                seconds = time_call(build, repeat)
+                print(f"page {page}, {mode:17s} {seconds * 1000:7.0f} ms  {len(build().getvalue()) / 1024:7.0f} KB")
+
+
+def bench_report_book(bank_counts=(4, 16), workers=None):
+    """Sharded book build: time, pages and peak RSS of the merging process and of the layout workers."""
+    import os
+    import resource
+    import tempfile
+
+    from generate_report import ReportSpec
+    from report_book import build_book
+
+    sources = ('aithucchien_1.csv', 'aithucchien_2.csv', 'aithucchien_3.csv')
+    with tempfile.TemporaryDirectory() as output_dir:
+        for count in sorted(bank_counts):
+            specs = [ReportSpec(f"Bank{i:03d}", sources[i % len(sources)]) for i in range(count)]
+            output = os.path.join(output_dir, f'book_{count}.pdf')
+            start = time.perf_counter()
+            pages = build_book(specs, output, workers=workers)
+            seconds = time.perf_counter() - start
+            merge_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+            worker_rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+            print(f"{count:4d} banks, {pages:5d} pages: {seconds:6.2f}s, {os.path.getsize(output) / 1e6:6.1f} MB, "
+                  f"peak RSS merge {merge_rss:5.0f} MB, layout worker {worker_rss:5.0f} MB")
+
+
+# --- PDF extraction ---
+
+def synthetic_investor_deck(path, pages=100, source_csv='aithucchien_1.csv', table_page=None, revised_page=None):
+    """
+    Writes an investor deck: `pages` pages of filler text with the highlights
+    table of `source_csv` on one of them (default: the middle page).
+    `revised_page` gets a different title, like a deck re-issued with one edit.
+    """
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import PageBreak, Paragraph, SimpleDocTemplate, Table
+
+    with open(source_csv, newline='', encoding='utf-8') as f:
+        rows = [row for row in csv.reader(f) if any(cell.strip() for cell in row)]
+    if rows[0][0].startswith('Column'):
+        rows = rows[1:]
+    styles = getSampleStyleSheet()
+    table_page = pages // 2 if table_page is None else table_page
+    story = []
+    for i in range(pages):
+        title = f"Investor presentation, page {i + 1}" + (" (revised)" if i == revised_page else "")
+        story.append(Paragraph(title, styles['Heading1']))
+        if i == table_page:
+            story.append(Table(rows, style=[('FONTSIZE', (0, 0), (-1, -1), 6)]))
+        else:
+            story.extend(Paragraph(f"Business update {i}.{j}: loans, deposits and fee income.", styles['Normal'])
+                         for j in range(30))
+        story.append(PageBreak())
+    SimpleDocTemplate(path).build(story)
+
+
+def bench_pdf_extraction(pages=100, workers=None):
+    """Extracting a deck with an empty page cache, a warm cache, and after one page changed."""
+    import os
+    import tempfile
+
+    import numpy as np
+
+    from highlights_loader import load_highlights
+    from pdf_extractor import extract_highlights_pdf
+
+    expected = load_highlights('aithucchien_1.csv')
+    with tempfile.TemporaryDirectory() as work_dir:
+        deck = os.path.join(work_dir, 'deck.pdf')
+        cache_dir = os.path.join(work_dir, 'cache')
+        synthetic_investor_deck(deck, pages)
+        for label in ('empty cache', 'warm cache'):
+            start = time.perf_counter()
+            highlights = extract_highlights_pdf(deck, cache_dir, workers)
+            print(f"{label:18s} {time.perf_counter() - start:6.2f}s")
+        assert highlights.labels == expected.labels
+        assert np.allclose(highlights.values, expected.values, equal_nan=True)
+
+        synthetic_investor_deck(deck, pages, revised_page=0)
+        start = time.perf_counter()
+        extract_highlights_pdf(deck, cache_dir, workers)
+        print(f"{'one page changed':18s} {time.perf_counter() - start:6.2f}s")
+
+
+# --- Analytics ---
+
+def bench_analytics(banks=1000, quarters=40, repeat=5, check_banks=20):
+    """
+    analytics.analyze() over synthetic histories of `banks` x `quarters`, and
+    its YoY/QoQ/YTD changes at the last quarter against the "vs" columns of
+    the snapshot tables printed from the same histories.
+    """
+    import numpy as np
+
+    from analytics import Panel, analyze
+    from highlights_loader import UNIT_PCT, UNIT_VND_BN, parse_rows, quarter_key, quarter_label
+    from synthetic_data import HISTORY_START, SECTIONS, simulate_bank, snapshot_rows
+
+    kinds = {name: kind for _, metrics in SECTIONS for name, kind in metrics}
+    metrics = list(kinds)
+    histories = [simulate_bank(b, quarters) for b in range(banks)]
+    values = np.array([[h[m] if m in h else np.full(quarters, np.nan) for m in metrics] for h in histories])
+    units = [UNIT_VND_BN if kinds[m] in ('stock', 'flow') else UNIT_PCT for m in metrics]
+    # the Panel is keyed by clean metric names, as parsed from the tables
+    table = parse_rows(snapshot_rows(histories[0], quarter_label(quarter_key(HISTORY_START) + quarters - 1)))
+    panel = Panel(range(banks), table.metrics, quarter_key(HISTORY_START), values, units)
+
+    seconds = time_call(lambda: analyze(panel), repeat)
+    results = analyze(panel)
+    print(f"analyze(): {banks} banks x {len(metrics)} metrics x {quarters} quarters "
+          f"({panel.values.size / 1e6:.2f}M values) in {seconds * 1000:.1f} ms")
+
+    worst = {'ytd_yoy': 0.0, 'qoq': 0.0, 'yoy': 0.0}
+    for b in range(min(check_banks, banks)):
+        h = parse_rows(snapshot_rows(histories[b], quarter_label(panel.keys[-1])))
+        for name, col in zip(('ytd_yoy', 'qoq', 'yoy'), h.change_cols):
+            for i, metric in enumerate(h.metrics):
+                if name == 'ytd_yoy' and kinds[h.labels[i]] == 'share':
+                    continue  # YTD of a share is computed from YTD flows, not from its own quarters
+                tolerance = 0.5 if h.units[i] == UNIT_PCT else 0.05
+                error = abs(h.values[i, col] - results[name][b, panel.metrics.index(metric), -1])
+                worst[name] = max(worst[name], error - tolerance)
+    print(f"Checked against the \"vs\" columns of {min(check_banks, banks)} snapshots: "
+          + ', '.join(f"{name} {'ok' if w <= 1e-9 else f'off by {w:.3g}'}" for name, w in worst.items()))
+
+
+# --- Columnar history ---
+
+def bench_columnar_store(banks=200, quarters=20, repeat=5):
+    """
+    History queries on synthetic data: parsing every snapshot CSV against
+    opening the memory-mapped store and reading one bank's series and table.
+    """
+    import os
+    import tempfile
+
+    from columnar_store import ColumnarStore, import_csvs, scan_data_dir
+    from highlights_loader import load_highlights
+    from synthetic_data import bank_name, generate
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir, store_dir = os.path.join(tmp, 'csv'), os.path.join(tmp, 'store')
+        generate(data_dir, banks, quarters)
+        pairs = scan_data_dir(data_dir)
+        csv_bytes = sum(os.path.getsize(path) for _, path in pairs)
+
+        start = time.perf_counter()
+        store = import_csvs(pairs, store_dir)
+        import_seconds = time.perf_counter() - start
+        store_bytes = sum(os.path.getsize(os.path.join(store_dir, name)) for name in os.listdir(store_dir))
+        bank, quarter = bank_name(banks // 2), store.quarters[-2]
+
+        parse_all = time_call(lambda: [load_highlights(path) for _, path in pairs], 1)
+        parse_bank = time_call(lambda: [load_highlights(path) for b, path in pairs if b == bank], repeat)
+
+        def query():
+            s = ColumnarStore(store_dir)
+            s.series(bank, 'Profit before tax')
+            s.snapshot(bank, quarter)
+
+        mapped = time_call(query, repeat)
+        print(f"{banks} banks x {quarters} quarters: {len(pairs)} CSVs ({csv_bytes / 1e6:.1f} MB), "
+              f"store {store_bytes / 1e6:.1f} MB, imported in {import_seconds:.2f}s")
+        print(f"  parse every CSV:                        {parse_all * 1000:9.1f} ms")
+        print(f"  parse one bank's CSVs:                  {parse_bank * 1000:9.1f} ms")
+        print(f"  open store + one series + one snapshot: {mapped * 1000:9.1f} ms")
+
+
+# --- Report service ---
+
+def bench_report_service(banks=4, warm_repeat=20, workers=None):
+    """Cold and warm latency of /report and /chart requests to an in-process report service."""
+    import tempfile
+    import threading
+    import urllib.request
+
+    from report_service import ReportService, make_server
+    from synthetic_data import generate
+
+    def get(url):
+        start = time.perf_counter()
+        with urllib.request.urlopen(url) as response:
+            response.read()
+            return time.perf_counter() - start, response.headers['X-Cache']
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        written = generate(data_dir, banks, quarters=1)
+        service = ReportService(data_dir, workers=workers)
+        server = make_server(service, port=0, log_requests=False)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base = f"http://127.0.0.1:{server.server_address[1]}"
+        try:
+            for name, path in (('report', '/report'), ('chart 5', '/chart?page=5&')):
+                sep = '&' if '?' in path else '?'
+                urls = [f"{base}{path}{'' if path.endswith('&') else sep}bank={bank}&period={period}"
+                        for bank, period, _ in written]
+                cold = [get(url)[0] for url in urls]
+                warm = [get(url) for url in urls for _ in range(warm_repeat)]
+                assert all(cache == 'hit' for _, cache in warm)
+                print(f"{name:8s} cold {statistics.median(cold) * 1000:8.1f} ms   "
+                      f"warm {statistics.median(t for t, _ in warm) * 1000:6.2f} ms   ({banks} banks)")
+        finally:
+            server.shutdown()
+            service.close()
+
+
+# --- Data appendix ---
+
+def bench_appendix(row_counts=(250, 1000, 2000, 4000), single_limit=4000):
+    """Layout time of the appendix against row count: one big Table vs chunked tables."""
+    import io
+
+    from reportlab.lib.pagesizes import A4
+    from reportlab.platypus import SimpleDocTemplate
+
+    from generate_report import register_font
+    from highlights_loader import load_highlights
+    from report_appendix import data_tables, highlights_sections
+
+    font_name = register_font()
+    columns, sections = highlights_sections(load_highlights('aithucchien_1.csv'))
+    name, rows = sections[0]
+
+    def layout(story):
+        doc = SimpleDocTemplate(io.BytesIO(), pagesize=A4, rightMargin=60, leftMargin=60, topMargin=80,
+                                bottomMargin=60)
+        start = time.perf_counter()
+        doc.build(story)
+        return time.perf_counter() - start, doc.page
+
+    for count in row_counts:
+        body = [rows[i % len(rows)] for i in range(count)]
+        chunked, pages = layout(data_tables(columns, [(name, body)], font_name))
+        line = f"{count:6d} rows, {pages:4d} pages: chunked {chunked * 1000:7.0f} ms ({chunked / count * 1e6:4.0f} us/row)"
+        if count <= single_limit:
+            single, _ = layout(data_tables(columns, [(name, body)], font_name, chunk_rows=count))
+            line += f"   one Table {single * 1000:7.0f} ms ({single / count * 1e6:4.0f} us/row)"
+        print(line)
+
+
+# --- Snapshot history ---
+
+def bench_snapshot_history(quarters=12, crawls_per_quarter=30, restated=2, repeat=5):
+    """History size and query time for many crawls of one bank, against keeping every crawled CSV."""
+    import io
+    import os
+    import random
+    import tempfile
+
+    from highlights_loader import is_section_header, quarter_key, quarter_label
+    from snapshot_history import SnapshotHistory
+    from synthetic_data import HISTORY_START, simulate_bank, snapshot_rows
+
+    rng = random.Random(0)
+    end = quarter_key('2Q25')
+    bank_history = simulate_bank(0, end - quarter_key(HISTORY_START) + 1)
+
+    def restate(text):
+        """The printed figure with its last digit changed."""
+        i = max(i for i, c in enumerate(text) if c.isdigit())
+        return f"{text[:i]}{(int(text[i]) + 1) % 10}{text[i + 1:]}"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'history.sqlite')
+        csv_bytes = crawls = 0
+        start = time.perf_counter()
+        with SnapshotHistory(path) as history:
+            for key in range(end - quarters + 1, end + 1):
+                rows = snapshot_rows(bank_history, quarter_label(key))
+                metric_rows = [i for i, row in enumerate(rows) if len(row) > 5 and row[1].strip()
+                               and not is_section_header(row)]
+                for _ in range(crawls_per_quarter):
+                    for _ in range(restated):
+                        row = rows[rng.choice(metric_rows)]
+                        column = rng.randrange(1, 6)
+                        row[column] = restate(row[column])
+                    buf = io.StringIO()
+                    csv.writer(buf).writerows(rows)
+                    csv_bytes += len(buf.getvalue().encode('utf-8'))
+                    result = history.record_rows([list(row) for row in rows], 'Bank', f"crawl {crawls}")
+                    if crawls == (quarters - 1) * crawls_per_quarter:
+                        quarter_start = result['version']  # first crawl of the latest quarter
+                    crawls += 1
+            record = (time.perf_counter() - start) / crawls
+            versions = history.versions()
+            first, last = versions[0]['version'], versions[-1]['version']
+            stored = sum(v['changed'] for v in versions)
+            oldest = time_call(lambda: history.rows(first), repeat)
+            newest = time_call(lambda: history.rows(last), repeat)
+            diff = time_call(lambda: history.restated(quarter_start, last), repeat)
+            restatements = len(history.restated(quarter_start, last))
+            history.conn.execute("VACUUM")
+        size = os.path.getsize(path)
+    print(f"{crawls} crawls over {quarters} quarters, {restated} figures restated per crawl")
+    print(f"  every crawled CSV:  {csv_bytes / 1024:8.0f} KB")
+    print(f"  history:            {size / 1024:8.0f} KB ({len(versions)} versions, {stored} cells stored)")
+    print(f"  record one crawl:   {record * 1000:8.2f} ms")
+    print(f"  rebuild oldest:     {oldest * 1000:8.2f} ms")
+    print(f"  rebuild newest:     {newest * 1000:8.2f} ms")
+    print(f"  restated in the last quarter's crawls: {restatements} figures in {diff * 1000:.2f} ms")
+
+
+# --- Fast bar charts ---
+
+def _seaborn_chart(chart, data):
+    """The seaborn version of a fast_charts.CHARTS chart, as the pages and the notebook draw it."""
+    import matplotlib.pyplot as plt
+    import pandas as pd
+    import seaborn as sns
+
+    fig, ax = plt.subplots(figsize=(8, 5) if chart in ('nim_cof', 'roa_roe') else (7, 5))
+    if chart == 'nim_cof':
+        df = pd.DataFrame({'Year': list(data['years']), 'NIM (%)': list(data['nim']),
+                           'Cost of Funds (%)': list(data['cof'])})
+        sns.barplot(x='Year', y='NIM (%)', data=df, ax=ax, color='#40466e', label='NIM (%)')
+        sns.lineplot(x='Year', y='Cost of Funds (%)', data=df, ax=ax.twinx(), color='#ff7f0e', marker='o',
+                     label='Cost of Funds (%)')
+    elif chart == 'roa_roe':
+        df = pd.DataFrame({'Năm': list(data['years']), 'ROA (%)': list(data['roa']), 'ROE (%)': list(data['roe'])})
+        df = df.melt(id_vars='Năm', var_name='Chỉ số', value_name='Giá trị (%)')
+        sns.barplot(x='Năm', y='Giá trị (%)', hue='Chỉ số', data=df, ax=ax, palette=['#a9a9a9', '#40466e'])
+    else:
+        labels = data['pbt_labels'] if chart == 'pbt' else data['years']
+        df = pd.DataFrame({'Year': list(labels), 'Value': list(data[chart])})
+        sns.barplot(x='Year', y='Value', hue='Year', data=df, ax=ax, palette=['#a9a9a9', '#40466e'], legend=False)
+    if chart != 'nim_cof':
+        for p in ax.patches:
+            ax.annotate(f'{p.get_height()}%', (p.get_x() + p.get_width() / 2., p.get_height()),
+                        ha='center', va='center', xytext=(0, 9), textcoords='offset points')
+    ax.set_title(chart)
+    fig.tight_layout()
+    return fig
+
+
+def bench_fast_charts(count=200, dpi=72, charts=None):
+    """Per-chart cost of the seaborn bar charts against fast_charts drawing straight on an Agg canvas."""
+    import io
+
+    import matplotlib.pyplot as plt
+
+    import fast_charts
+    import report_visualization as rv
+
+    plt.switch_backend('Agg')
+    rv.apply_theme()
+    datasets = [_jittered_page_data(i) for i in range(count)]
+    print(f"{count} charts of each kind at {dpi} dpi")
+    totals = [0, 0, 0]
+    for chart in charts or fast_charts.CHARTS:
+        start = time.perf_counter()
+        for data in datasets:
+            fig = _seaborn_chart(chart, data)
+            fig.savefig(io.BytesIO(), format='png', dpi=dpi)
+            plt.close(fig)
+        seaborn = (time.perf_counter() - start) / count
+
+        start = time.perf_counter()
+        for data in datasets:
+            fast_charts.render(fast_charts.CHARTS[chart](data), io.BytesIO(), dpi, 'png')
+        fast = (time.perf_counter() - start) / count
+
+        start = time.perf_counter()
+        fig = fast_charts.CHARTS[chart](datasets[0])  # what render_many does, without writing files
+        for data in datasets:
+            fast_charts.UPDATERS[chart](fig, data)
+            fast_charts.render(fig, io.BytesIO(), dpi, 'png')
+        batch = (time.perf_counter() - start) / count
+        for i, total in enumerate((seaborn, fast, batch)):
+            totals[i] += total
+        print(f"  {chart:14} seaborn {seaborn * 1000:6.1f}, fast {fast * 1000:6.1f} ({seaborn / fast:.1f}x), "
+              f"batch {batch * 1000:6.1f} ms/chart ({seaborn / batch:.1f}x)")
+    seaborn, fast, batch = totals
+    print(f"  {'all kinds':14} seaborn {seaborn * 1000:6.1f}, fast {fast * 1000:6.1f} ({seaborn / fast:.1f}x), "
+          f"batch {batch * 1000:6.1f} ms/set   ({seaborn / batch:.1f}x)")
+
+
+# --- Command-line startup ---
+
+def bench_startup(repeat=3):
+    """Wall time of report_cli.py subcommands (fresh interpreter each) against importing every module up front."""
+    import os
+    import subprocess
+    import sys
+    import tempfile
+
+    def run(*command):
+        def call():
+            subprocess.run([sys.executable, *command], check=True, stdout=subprocess.DEVNULL,
+                           stderr=subprocess.DEVNULL)
+        return time_call(call, repeat)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with open(os.path.join(tmp, 'highlights.html'), 'wb') as f:
+            f.write(synthetic_highlights_page(decoy_tables=20, copies=1))
+        server, base_url = _serve_directory(tmp)
+        try:
+            commands = [
+                ('python -c pass', ['-c', 'pass']),
+                ('eager: import all modules', ['-c', 'import crawler, generate_report, report_visualization, '
+                                                     'pdf_extractor']),
+                ('eager: generate_report.py --help', ['generate_report.py', '--help']),
+                ('eager: report_visualization.py --help', ['report_visualization.py', '--help']),
+                ('report_cli.py --help', ['report_cli.py', '--help']),
+                ('report_cli.py periods', ['report_cli.py', 'periods', 'aithucchien_1.csv']),
+                ('report_cli.py parse', ['report_cli.py', 'parse', 'aithucchien_1.csv']),
+                ('report_cli.py crawl', ['report_cli.py', 'crawl', f"{base_url}/highlights.html", '--no-cache',
+                                         '--output', os.path.join(tmp, 'crawled.csv')]),
+                ('report_cli.py render --pages 5', ['report_cli.py', 'render', '--pages', '5', '--output-dir', tmp]),
+                ('report_cli.py build', ['report_cli.py', 'build', '--output', os.path.join(tmp, 'report.pdf')]),
+            ]
+            for name, command in commands:
+                print(f"{name:38s} {run(*command) * 1000:8.0f} ms")
+        finally:
+            server.shutdown()
+
+
+# --- End-to-end suite ---
+
+def _serve_directory(directory):
+    """Serves a directory over HTTP on localhost from a daemon thread. Returns (server, base URL)."""
+    import functools
+    import http.server
+    import threading
+
+    class QuietHandler(http.server.SimpleHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+    handler = functools.partial(QuietHandler, directory=directory)
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def bench_suite(bank_counts=(1, 10, 100), quarters=4, sample=5, output='benchmark_results.json'):
+    """
+    Every pipeline stage on synthetic data for each bank count: crawl + parse
+    of saved HTML pages, CSV loading, each visualize_page_* render and the PDF
+    build. Rendering and PDF builds run on at most `sample` banks. Writes JSON.
+    """
+    import contextlib
+    import datetime
+    import io
+    import json
+    import os
+    import platform
+    import tempfile
+
+    import generate_report
+    import report_visualization as rv
+    from crawler import crawl_techcombank_financials, make_session
+    from highlights_loader import load_highlights
+    from report_metrics import ReportMetrics
+    from synthetic_data import generate
+
+    rv.plt.switch_backend('Agg')
+    results = []
+
+    def record(stage, banks, items, seconds):
+        results.append({'stage': stage, 'banks': banks, 'items': items, 'seconds': round(seconds, 4),
+                        'per_item_ms': round(seconds / items * 1000, 3) if items else None})
+        print(f"{stage:16s} {banks:5d} banks {items:6d} items {seconds:8.2f}s "
+              f"{seconds / max(items, 1) * 1000:9.2f} ms/item")
+
+    for banks in bank_counts:
+        with tempfile.TemporaryDirectory() as data_dir:
+            start = time.perf_counter()
+            snapshots = generate(data_dir, banks, quarters, html=True)
+            record('generate', banks, len(snapshots), time.perf_counter() - start)
+
+            server, base_url = _serve_directory(data_dir)
+            session = make_session()
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                for bank, period, path in snapshots:
+                    crawl_techcombank_financials(f"{base_url}/{bank}/{period}.html",
+                                                 os.path.join(data_dir, bank, f"{period}_crawled.csv"), session)
+            record('crawl_parse', banks, len(snapshots), time.perf_counter() - start)
+            server.shutdown()
+
+            start = time.perf_counter()
+            loaded = [load_highlights(path) for _, _, path in snapshots]
+            record('csv_load', banks, len(loaded), time.perf_counter() - start)
+
+            latest = [(bank, h) for (bank, _, _), h in zip(snapshots, loaded)][quarters - 1::quarters][:sample]
+            for page in sorted(rv.PAGES):
+                start = time.perf_counter()
+                for bank, h in latest:
+                    fig = rv.PAGES[page](rv.page_data(ReportMetrics(h, bank)))
+                    fig.savefig(io.BytesIO(), format='png', dpi=150, facecolor=fig.get_facecolor())
+                    rv.plt.close(fig)
+                record(f'render_page_{page}', banks, len(latest), time.perf_counter() - start)
+
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                for bank, h in latest:
+                    generate_report.build_report(generate_report.ReportSpec(bank), os.path.join(data_dir, f"{bank}.pdf"),
+                                                 ReportMetrics(h, bank))
+            record('pdf_build', banks, len(latest), time.perf_counter() - start)
+
+    report = {
+        'meta': {
+            'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'quarters': quarters,
+            'sample': sample,
+        },
+        'results': results,
+    }
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output}")
+    return report
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Project benchmarks.")
+    subparsers = parser.add_subparsers(dest='name', required=True)
+    extraction = subparsers.add_parser('extraction', help=bench_table_extraction.__doc__)
+    extraction.add_argument('pages', nargs='*', help="Saved HTML pages (default: a synthetic page)")
+    extraction.add_argument('--repeat', type=int, default=5)
+    templates = subparsers.add_parser('templates', help=bench_chart_templates.__doc__)
+    templates.add_argument('--counts', type=int, nargs='+', default=[1, 100])
+    reports = subparsers.add_parser('reports', help=bench_report_throughput.__doc__)
+    reports.add_argument('--count', type=int, default=24)
+    reports.add_argument('--workers', type=int)
+    subparsers.add_parser('fonts', help=bench_font_loading.__doc__)
+    assets = subparsers.add_parser('assets', help=bench_image_assets.__doc__)
+    assets.add_argument('--dpi', type=int, nargs='+', default=[150, 100])
+    charts = subparsers.add_parser('charts', help=bench_chart_embedding.__doc__)
+    charts.add_argument('--pages', type=int, nargs='+', default=[5, 7, 8])
+    book = subparsers.add_parser('book', help=bench_report_book.__doc__)
+    book.add_argument('--banks', type=int, nargs='+', default=[4, 16])
+    book.add_argument('--workers', type=int)
+    pdf_extraction = subparsers.add_parser('pdf-extraction', help=bench_pdf_extraction.__doc__)
+    pdf_extraction.add_argument('--pages', type=int, default=100)
+    pdf_extraction.add_argument('--workers', type=int)
+    analytics = subparsers.add_parser('analytics', help=bench_analytics.__doc__)
+    analytics.add_argument('--banks', type=int, default=1000)
+    analytics.add_argument('--quarters', type=int, default=40)
+    columnar = subparsers.add_parser('columnar', help=bench_columnar_store.__doc__)
+    columnar.add_argument('--banks', type=int, default=200)
+    columnar.add_argument('--quarters', type=int, default=20)
+    service = subparsers.add_parser('service', help=bench_report_service.__doc__)
+    service.add_argument('--banks', type=int, default=4)
+    service.add_argument('--workers', type=int)
+    appendix = subparsers.add_parser('appendix', help=bench_appendix.__doc__)
+    appendix.add_argument('--rows', type=int, nargs='+', default=[250, 1000, 2000, 4000])
+    appendix.add_argument('--single-limit', type=int, default=4000, help="Largest row count laid out as one Table")
+    history = subparsers.add_parser('history', help=bench_snapshot_history.__doc__)
+    history.add_argument('--quarters', type=int, default=12)
+    history.add_argument('--crawls', type=int, default=30, help="Crawls per quarter")
+    history.add_argument('--restated', type=int, default=2, help="Figures restated per crawl")
+    fast = subparsers.add_parser('fast-charts', help=bench_fast_charts.__doc__)
+    fast.add_argument('--count', type=int, default=200, help="Charts of each kind")
+    fast.add_argument('--dpi', type=int, default=72)
+    fast.add_argument('--charts', nargs='+', help="fast_charts.CHARTS names (default: all)")
+    startup = subparsers.add_parser('startup', help=bench_startup.__doc__)
+    startup.add_argument('--repeat', type=int, default=3)
+    suite = subparsers.add_parser('suite', help=bench_suite.__doc__)
+    suite.add_argument('--banks', type=int, nargs='+', default=[1, 10, 100], help="Bank counts, e.g. 1 10 100 1000")
+    suite.add_argument('--quarters', type=int, default=4)
+    suite.add_argument('--sample', type=int, default=5, help="Banks rendered and built as PDF per bank count")
+    suite.add_argument('--output', default='benchmark_results.json')
+    args = parser.parse_args()
+
+    if args.name == 'extraction':
+        bench_table_extraction(args.pages, args.repeat)
+    elif args.name == 'templates':
+        bench_chart_templates(args.counts)
+    elif args.name == 'reports':
+        bench_report_throughput(args.count, args.workers)
+    elif args.name == 'fonts':
+        bench_font_loading()
+    elif args.name == 'assets':
+        bench_image_assets(args.dpi)
+    elif args.name == 'charts':
+        bench_chart_embedding(args.pages)
+    elif args.name == 'book':
+        bench_report_book(args.banks, args.workers)
+    elif args.name == 'pdf-extraction':
+        bench_pdf_extraction(args.pages, args.workers)
+    elif args.name == 'analytics':
+        bench_analytics(args.banks, args.quarters)
+    elif args.name == 'columnar':
+        bench_columnar_store(args.banks, args.quarters)
+    elif args.name == 'service':
+        bench_report_service(args.banks, workers=args.workers)
+    elif args.name == 'appendix':
+        bench_appendix(args.rows, args.single_limit)
+    elif args.name == 'history':
+        bench_snapshot_history(args.quarters, args.crawls, args.restated)
+    elif args.name == 'fast-charts':
+        bench_fast_charts(args.count, args.dpi, args.charts)
+    elif args.name == 'startup':
+        bench_startup(args.repeat)
+    elif args.name == 'suite':
+        bench_suite(args.banks, args.quarters, args.sample, args.output)
@@ -0,0 +1,71 @@
+import io
+
+from reportlab.lib.utils import ImageReader
+from reportlab.platypus import Flowable
+
+try:
+    from svglib.svglib import svg2rlg
+    from reportlab.graphics import renderPDF
+except ImportError:  # optional: without svglib charts are embedded as in-memory PNGs
+    svg2rlg = None
+
+# --- Matplotlib figures as ReportLab flowables ---
+# A chart goes from the figure straight into the PDF: the figure is written to
+# an in-memory SVG and converted to a ReportLab Drawing, so it stays vector
+# graphics and no file is written or read. Text is exported as paths, so the
+# PDF needs no matplotlib fonts. Without svglib the figure is rasterised to an
+# in-memory PNG instead.
+
+
+class FigureFlowable(Flowable):
+    """
+    Embeds a matplotlib figure, or a function returning one (e.g.
+    report_visualization.visualize_page_5), scaled into width x height points
+    and centred there, keeping the figure's proportions. If only one of
+    width/height is given the other follows the figure's aspect ratio; with
+    neither the figure's own size is used.
+    """
+
+    def __init__(self, figure, width=None, height=None, vector=True, dpi=150, close=True):
+        super().__init__()
+        import matplotlib.pyplot as plt
+
+        fig = figure() if callable(figure) else figure
+        fig_width, fig_height = (v * 72 for v in fig.get_size_inches())
+        if width and not height:
+            height = width * fig_height / fig_width
+        elif height and not width:
+            width = height * fig_width / fig_height
+        self.width, self.height = width or fig_width, height or fig_height
+        self.vector = vector and svg2rlg is not None
+
+        buf = io.BytesIO()
+        facecolor = fig.get_facecolor()
+        if self.vector:
+            fig.savefig(buf, format='svg', facecolor=facecolor)
+            buf.seek(0)
+            self._drawing = svg2rlg(buf)
+            self._image = None
+        else:
+            fig.savefig(buf, format='png', dpi=dpi, facecolor=facecolor)
+            buf.seek(0)
+            self._drawing = None
+            self._image = ImageReader(buf)
+        if close:
+            plt.close(fig)
+
+    def wrap(self, availWidth, availHeight):
+        return self.width, self.height
+
+    def draw(self):
+        if self._drawing is not None:
+            scale = min(self.width / self._drawing.width, self.height / self._drawing.height)
+            self.canv.saveState()
+            self.canv.translate((self.width - self._drawing.width * scale) / 2,
+                                (self.height - self._drawing.height * scale) / 2)
+            self.canv.scale(scale, scale)
+            renderPDF.draw(self._drawing, self.canv, 0, 0)
+            self.canv.restoreState()
+        else:
+            self.canv.drawImage(self._image, 0, 0, self.width, self.height, mask='auto',
+                                preserveAspectRatio=True, anchor='c')
@@ -0,0 +1,102 @@
+import report_visualization as rv
+from fast_charts import pbt_title
+
+# --- Figure templates ---
+# Pages 4-6 have the same layout for every bank and period; only bar heights,
+# line data, labels and axis limits change. A template builds the figure once
+# with the regular page function and then only updates those artists.
+
+
+def _set_bars(ax, values, labels, fmt, headroom):
+    """Updates bar heights, their value annotations, tick labels and the y-limit."""
+    bars = ax.patches[:len(values)]
+    notes = [t for t in ax.texts if hasattr(t, 'xyann')][:len(values)]
+    for bar, note, value in zip(bars, notes, values):
+        bar.set_height(value)
+        note.xy = (bar.get_x() + bar.get_width() / 2., value)
+        note.set_text(fmt(value))
+    ax.set_xticks(range(len(labels)), labels)
+    ax.set_ylim(0, max(values) * headroom)
+
+
+def _update_page_4(fig, data):
+    table_ax, bar_ax = fig.axes[0], fig.axes[1]
+    kpi = data['kpi']
+    fig.suptitle(f"Trang 4: Tóm tắt Kết quả Tài chính năm {data['year']}")  # updates the existing title
+    cells = table_ax.tables[0].get_celld()
+    cells[0, 1].get_text().set_text(f"Giá trị {data['year']}")
+    for i, row in enumerate(zip(kpi['Metric'], kpi['Value'], kpi['Change']), start=1):
+        for col, text in enumerate(row):
+            cells[i, col].get_text().set_text(text)
+        change = cells[i, 2].get_text()
+        change.set_color('red' if row[2].startswith('-') else 'green' if row[2].startswith('+') else 'black')
+    _set_bars(bar_ax, data['pbt'], data['pbt_labels'], lambda v: f'{v:,.0f}', 1.1)
+    bar_ax.set_title(pbt_title(data['pbt_labels']))
+
+
+def _update_page_5(fig, data):
+    nim_ax, cc_ax, cof_ax = fig.axes[0], fig.axes[1], fig.axes[2]
+    for bar, value in zip(nim_ax.patches, data['nim']):
+        bar.set_height(value)
+    nim_ax.set_xticks(range(len(data['years'])), data['years'])
+    nim_ax.relim()
+    nim_ax.autoscale_view()
+    line = cof_ax.lines[0]
+    line.set_ydata(data['cof'])
+    cof_ax.relim()
+    cof_ax.autoscale_view()
+    _set_bars(cc_ax, data['credit_costs'], data['years'], lambda v: f'{v}%', 1.2)
+
+
+def _update_page_6(fig, data):
+    _set_bars(fig.axes[0], data['credit_growth'], data['years'], lambda v: f'{v}%', 1.2)
+
+
+_UPDATERS = {4: _update_page_4, 5: _update_page_5, 6: _update_page_6}
+
+
+class PageTemplate:
+    """
+    A page figure built once and re-rendered for many datasets.
+    With freeze_layout (the default) the constrained layout computed for the
+    first render is kept for later ones instead of being solved again on
+    every save.
+    """
+
+    def __init__(self, page, data=None, freeze_layout=True):
+        if page not in _UPDATERS:
+            raise ValueError(f"No template for page {page}; templates exist for pages {sorted(_UPDATERS)}")
+        self.page = page
+        self.fig = rv.PAGES[page](data)
+        self.freeze_layout = freeze_layout
+        self._update = _UPDATERS[page]
+        self._rendered = False
+
+    def update(self, data):
+        self._update(self.fig, data)
+        return self.fig
+
+    def render(self, data, output, dpi=150, fmt=None):
+        """Updates the figure with `data` and saves it to a path or file object."""
+        self.update(data)
+        self.fig.savefig(output, dpi=dpi, format=fmt, facecolor=self.fig.get_facecolor())
+        if self.freeze_layout and not self._rendered:
+            self.fig.set_layout_engine('none')
+        self._rendered = True
+
+    def close(self):
+        rv.plt.close(self.fig)
+
+
+def render_many(page, datasets, output_pattern, dpi=150, fmt=None):
+    """Renders one page for each dataset, e.g. output_pattern='charts/{bank}_page5.png'."""
+    template = PageTemplate(page)
+    try:
+        paths = []
+        for key, data in datasets.items():
+            path = output_pattern.format(bank=key)
+            template.render(data, path, dpi=dpi, fmt=fmt)
+            paths.append(path)
+        return paths
+    finally:
+        template.close()
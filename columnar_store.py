@@ -0,0 +1,251 @@
+import csv
+import json
+import os
+import shutil
+
+import numpy as np
+
+from analytics import FLOW_METRICS, bps_change, pct_change
+from highlights_loader import (UNIT_BPS, Highlights, format_rows, load_highlights, period_columns,
+                               quarter_key, quarter_label)
+
+# --- Columnar quarterly history ---
+# The highlights history of many banks as a directory of .npy arrays opened
+# with memory mapping, so reading one bank and a few quarters only touches
+# the pages holding them instead of parsing every CSV:
+#   meta.json     format version, the bank and metric dictionaries (array
+#                 index -> name), labels, sections, units and the quarter
+#                 index (first quarter key and count)
+#   values.npy    float64 [bank, metric, quarter]       quarter values
+#   ytd.npy       float64 [bank, metric, quarter]       YTD to that quarter
+#   changes.npy   float64 [bank, metric, quarter, 3]    the three "vs"
+#                 columns of the table reported at that quarter
+#   decimals.npy  int8 [bank, metric, quarter, 2]       decimals of the
+#                 quarter value and of the YTD figure in the table each
+#                 came from (-1: not printed)
+# Bank is the outer axis, so one bank's history is contiguous. Missing
+# figures are NaN. YTD and change figures are kept as printed; where no
+# imported table had them they are derived when a snapshot is read.
+
+FORMAT_VERSION = 2
+_ARRAYS = ('values', 'ytd', 'changes', 'decimals')
+
+
+def _fill_decimals(decimals):
+    """Per-cell decimals with the cells no table printed (-1) set to the largest of their row, or 1."""
+    row = decimals.max(axis=-1, keepdims=True)
+    return np.where(decimals < 0, np.where(row < 0, 1, row), decimals)
+
+
+def import_csvs(snapshots, path):
+    """
+    Writes the store at `path` from (bank, CSV path) pairs in the layout of
+    aithucchien_*.csv; where snapshots overlap the later reporting quarter
+    wins. Returns the opened ColumnarStore.
+    """
+    tables = [(bank, load_highlights(source)) for bank, source in snapshots]
+    if not tables:
+        raise ValueError("No snapshots to import")
+    banks = list(dict.fromkeys(bank for bank, _ in tables))
+    metrics, labels, units, change_units, sections, section_of = [], [], [], [], [], []
+    code = {}
+    for _, h in tables:
+        for i, metric in enumerate(h.metrics):
+            if metric not in code:
+                code[metric] = len(metrics)
+                metrics.append(metric)
+                labels.append(h.labels[i])
+                units.append(str(h.units[i]))
+                change_units.append(str(h.change_units[i, 0]))
+                section = h.sections[h.section_index[i]]
+                if section not in sections:
+                    sections.append(section)
+                section_of.append(sections.index(section))
+    keys = [quarter_key(q) for _, h in tables for q in h.quarters]
+    start, count = min(keys), max(keys) - min(keys) + 1
+
+    shape = (len(banks), len(metrics), count)
+    values, ytd = np.full(shape, np.nan), np.full(shape, np.nan)
+    changes = np.full(shape + (3,), np.nan)
+    decimals = np.full(shape + (2,), -1, dtype=np.int8)
+    bank_code = {bank: i for i, bank in enumerate(banks)}
+    for bank, h in sorted(tables, key=lambda t: quarter_key(t[1].quarters[-1])):
+        b = bank_code[bank]
+        rows = np.array([code[m] for m in h.metrics])
+        cols = np.array([quarter_key(q) - start for q in h.quarters])
+        values[b, rows[:, None], cols[None, :]] = h.values[:, h.quarter_cols]
+        end = cols[-1]
+        ytd[b, rows, end] = h.values[:, h.ytd_cols[-1]]
+        if end >= 4:
+            ytd[b, rows, end - 4] = h.values[:, h.ytd_cols[0]]
+        changes[b, rows, end] = h.values[:, h.change_cols[:3]]
+        printed = np.where(np.isnan(h.values), -1, h.decimals)
+        decimals[b, rows[:, None], cols[None, :], 0] = printed[:, h.quarter_cols]
+        decimals[b, rows, end, 1] = printed[:, h.ytd_cols[-1]]
+        if end >= 4:
+            decimals[b, rows, end - 4, 1] = printed[:, h.ytd_cols[0]]
+
+    meta = {
+        'version': FORMAT_VERSION,
+        'banks': banks,
+        'metrics': metrics,
+        'labels': labels,
+        'units': units,
+        'change_units': change_units,
+        'sections': sections,
+        'section_of': section_of,
+        'start': start,
+        'quarters': count,
+    }
+    tmp_path = path.rstrip('/\\') + '.tmp'
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+    for name, array in zip(_ARRAYS, (values, ytd, changes, decimals)):
+        np.save(os.path.join(tmp_path, f"{name}.npy"), array)
+    with open(os.path.join(tmp_path, 'meta.json'), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False, indent=1)
+    shutil.rmtree(path, ignore_errors=True)
+    os.replace(tmp_path, path)
+    return ColumnarStore(path)
+
+
+def scan_data_dir(data_dir):
+    """(bank, CSV path) pairs of a <data_dir>/<bank>/<period>.csv tree (the synthetic_data layout)."""
+    pairs = []
+    for bank in sorted(os.listdir(data_dir)):
+        bank_dir = os.path.join(data_dir, bank)
+        if os.path.isdir(bank_dir):
+            pairs += [(bank, os.path.join(bank_dir, name)) for name in sorted(os.listdir(bank_dir))
+                      if name.endswith('.csv')]
+    return pairs
+
+
+class ColumnarStore:
+    """Read-only, memory-mapped view of a store written by import_csvs()."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, 'meta.json'), encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta['version'] != FORMAT_VERSION:
+            raise ValueError(f"{path}: unsupported format version {meta['version']}")
+        self.banks = meta['banks']
+        self.metrics = meta['metrics']
+        self.labels = meta['labels']
+        self.units = np.array(meta['units'])
+        self.change_units = np.array(meta['change_units'])
+        self.sections = meta['sections']
+        self.section_of = np.array(meta['section_of'], dtype=np.intp)
+        self.start = meta['start']
+        self.quarter_count = meta['quarters']
+        self.values, self.ytd, self.changes, self.decimals = (
+            np.load(os.path.join(path, f"{name}.npy"), mmap_mode='r') for name in _ARRAYS)
+        self._bank_code = {bank: i for i, bank in enumerate(self.banks)}
+        self._metric_code = {metric: i for i, metric in enumerate(self.metrics)}
+
+    @property
+    def quarters(self):
+        return [quarter_label(self.start + i) for i in range(self.quarter_count)]
+
+    def bank_code(self, bank):
+        try:
+            return self._bank_code[bank]
+        except KeyError:
+            raise KeyError(f"Bank not in store: {bank}") from None
+
+    def quarter_index(self, quarter):
+        """Offset of a quarter label on the quarter axis."""
+        index = quarter_key(quarter) - self.start
+        if not 0 <= index < self.quarter_count:
+            raise KeyError(f"Quarter not in store: {quarter}")
+        return index
+
+    def series(self, bank, metric, since=None, until=None):
+        """([quarter labels], values) of one metric of one bank."""
+        lo = self.quarter_index(since) if since else 0
+        hi = self.quarter_index(until) + 1 if until else self.quarter_count
+        values = np.array(self.values[self.bank_code(bank), self._metric_code[metric], lo:hi])
+        return [quarter_label(self.start + i) for i in range(lo, hi)], values
+
+    def _window(self, array, b, lo, hi, fill=np.nan):
+        """array[b, :, lo:hi] padded with `fill` where the window starts before the first quarter."""
+        part = np.array(array[b, :, max(lo, 0):hi])
+        if lo < 0:
+            part = np.concatenate([np.full((part.shape[0], -lo) + part.shape[2:], fill, dtype=part.dtype), part],
+                                  axis=1)
+        return part
+
+    def snapshot(self, bank, quarter):
+        """The highlights table reported at `quarter` as a Highlights object."""
+        b, q = self.bank_code(bank), self.quarter_index(quarter)
+        quarters = self._window(self.values, b, q - 4, q + 1)
+        ytd = self._window(self.ytd, b, q - 4, q + 1)[:, [0, 4]]
+        changes = np.array(self.changes[b, :, q])
+
+        # Figures no imported table printed: YTD from the quarters, changes from the levels
+        is_flow = np.isin(self.metrics, FLOW_METRICS)
+        year_quarters = quarter_key(quarter) % 4 + 1
+        derived_ytd = np.where(is_flow, quarters[:, 5 - year_quarters:].sum(axis=1), quarters[:, 4])
+        ytd[:, 1] = np.where(np.isnan(ytd[:, 1]), derived_ytd, ytd[:, 1])
+        bps = (self.change_units == UNIT_BPS)[:, None]
+        derived = np.where(bps, bps_change(np.stack([ytd[:, 1], quarters[:, 4], quarters[:, 4]], axis=1),
+                                           np.stack([ytd[:, 0], quarters[:, 3], quarters[:, 0]], axis=1)),
+                           pct_change(np.stack([ytd[:, 1], quarters[:, 4], quarters[:, 4]], axis=1),
+                                      np.stack([ytd[:, 0], quarters[:, 3], quarters[:, 0]], axis=1)))
+        changes = np.where(np.isnan(changes), derived, changes)
+
+        # metrics grouped by section, in store order
+        order = np.argsort(self.section_of, kind='stable')
+        values = np.concatenate([quarters, ytd, changes], axis=1)[order]
+        return Highlights(period_columns(quarter_key(quarter)), self.sections, self.section_of[order],
+                          [self.labels[i] for i in order], values, self.units[order],
+                          np.repeat(self.change_units[order][:, None], 3, axis=1),
+                          lambda: self._snapshot_decimals(b, q)[order])
+
+    def _snapshot_decimals(self, b, q):
+        """Decimals of the cells of a snapshot, in store row order; the change columns get 1."""
+        quarters = self._window(self.decimals[..., 0], b, q - 4, q + 1, fill=-1)
+        ytd = self._window(self.decimals[..., 1], b, q - 4, q + 1, fill=-1)[:, [0, 4]]
+        levels = _fill_decimals(np.concatenate([quarters, ytd], axis=1))
+        return np.concatenate([levels, np.ones((len(levels), 3), dtype=levels.dtype)], axis=1)
+
+    def export_csv(self, bank, quarter, path):
+        """Writes the table reported at `quarter` in the layout of aithucchien_*.csv, with its printed decimals."""
+        h = self.snapshot(bank, quarter)
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            csv.writer(f).writerows(format_rows(h, h.decimals))
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Memory-mapped columnar store of the highlights history.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    import_parser = subparsers.add_parser('import', help="Build a store from highlights CSVs")
+    import_parser.add_argument('store')
+    import_parser.add_argument('csvs', nargs='*', help="CSVs of --bank")
+    import_parser.add_argument('--bank', help="Bank of the CSVs given on the command line")
+    import_parser.add_argument('--data-dir', help="Also import <data_dir>/<bank>/<period>.csv")
+    export_parser = subparsers.add_parser('export', help="Write one bank's table at one quarter as CSV")
+    export_parser.add_argument('store')
+    export_parser.add_argument('bank')
+    export_parser.add_argument('quarter')
+    export_parser.add_argument('output')
+    info_parser = subparsers.add_parser('info', help="Banks, metrics and quarters of a store")
+    info_parser.add_argument('store')
+    args = parser.parse_args()
+
+    if args.command == 'import':
+        if args.csvs and not args.bank:
+            parser.error("CSV files need --bank")
+        pairs = [(args.bank, path) for path in args.csvs] + (scan_data_dir(args.data_dir) if args.data_dir else [])
+        store = import_csvs(pairs, args.store)
+        print(f"{args.store}: {len(pairs)} snapshots, {len(store.banks)} banks, {len(store.metrics)} metrics, "
+              f"{store.quarters[0]}-{store.quarters[-1]}")
+    elif args.command == 'export':
+        ColumnarStore(args.store).export_csv(args.bank, args.quarter, args.output)
+        print(f"Wrote {args.output}")
+    else:
+        store = ColumnarStore(args.store)
+        print(f"{args.store}: {len(store.banks)} banks, {len(store.metrics)} metrics, "
+              f"{store.quarters[0]}-{store.quarters[-1]} ({store.quarter_count} quarters)")
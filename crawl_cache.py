@@ -0,0 +1,116 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+from collections import namedtuple
+
+# --- Conditional-GET cache and raw snapshot archive ---
+# Layout of the cache directory:
+#   meta/<sha1 of url>.json   validators (ETag, Last-Modified), fetch time and
+#                             the hash of the last body downloaded/parsed
+#   archive/ab/<sha256>.html  raw bodies, stored once per distinct content
+
+DEFAULT_CACHE_DIR = '.crawl_cache'
+DEFAULT_TTL = 6 * 3600
+
+CachedResponse = namedtuple('CachedResponse', ['body', 'sha256', 'source'])
+# source is one of 'network' (200), 'not-modified' (304) or 'fresh' (within TTL, no request)
+
+
+def _write_atomic(path, data):
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+class ResponseCache:
+    """On-disk HTTP cache keyed by URL, backed by a content-addressed body archive."""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, ttl=DEFAULT_TTL):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+
+    def _meta_path(self, url):
+        return os.path.join(self.cache_dir, 'meta', hashlib.sha1(url.encode('utf-8')).hexdigest() + '.json')
+
+    def archive_path(self, sha256):
+        return os.path.join(self.cache_dir, 'archive', sha256[:2], sha256 + '.html')
+
+    def _load_meta(self, url):
+        try:
+            with open(self._meta_path(url), encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _save_meta(self, url, meta):
+        _write_atomic(self._meta_path(url), json.dumps(meta, indent=2).encode('utf-8'))
+
+    def _read_archive(self, sha256):
+        try:
+            with open(self.archive_path(sha256), 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def archive(self, body):
+        """Stores a body under its SHA-256 (once) and returns the hash."""
+        sha256 = hashlib.sha256(body).hexdigest()
+        if not os.path.exists(self.archive_path(sha256)):
+            _write_atomic(self.archive_path(sha256), body)
+        return sha256
+
+    def lookup(self, url):
+        """
+        Returns (fresh_response, conditional_headers). A fresh response means the
+        entry is younger than the TTL and no request is needed; otherwise the
+        headers revalidate the archived body (empty if there is nothing cached).
+        """
+        meta = self._load_meta(url)
+        if not meta or self._read_archive(meta['sha256']) is None:
+            return None, {}
+        if time.time() - meta['fetched_at'] < self.ttl:
+            return CachedResponse(self._read_archive(meta['sha256']), meta['sha256'], 'fresh'), {}
+        headers = {}
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+        return None, headers
+
+    def store(self, url, response):
+        """Records a requests response (200 or 304) and returns a CachedResponse."""
+        meta = self._load_meta(url) or {}
+        if response.status_code == 304 and meta:
+            meta['fetched_at'] = time.time()
+            self._save_meta(url, meta)
+            return CachedResponse(self._read_archive(meta['sha256']), meta['sha256'], 'not-modified')
+
+        sha256 = self.archive(response.content)
+        meta.update({
+            'url': url,
+            'sha256': sha256,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'fetched_at': time.time(),
+        })
+        self._save_meta(url, meta)
+        return CachedResponse(response.content, sha256, 'network')
+
+    def is_parsed(self, url, sha256):
+        """True if the body with this hash was already parsed for the URL."""
+        meta = self._load_meta(url)
+        return bool(meta) and meta.get('parsed_sha256') == sha256
+
+    def mark_parsed(self, url, sha256):
+        meta = self._load_meta(url) or {'url': url}
+        meta['parsed_sha256'] = sha256
+        self._save_meta(url, meta)
@@ -1,30 +1,186 @@
+import asyncio
+import csv
+import io
+import os
+import random
+import time
+from collections import namedtuple
+from urllib.parse import urlsplit
+
 import requests
-from bs4 import BeautifulSoup
-import pandas as pd
+from requests.adapters import HTTPAdapter
+import lxml.html
+
+from crawl_cache import DEFAULT_CACHE_DIR, DEFAULT_TTL, ResponseCache
+from highlights_loader import parse_rows
+import tracing
+from tracing import span, traced
+
+DEFAULT_URL = "https://techcombank.com/en/investors/financial-information/highlights"
+DEFAULT_OUTPUT = 'techcombank_financial_data_default.csv'
+
+# (connect, read) timeout in seconds for every request
+REQUEST_TIMEOUT = (5, 30)
+# Status codes worth another attempt; everything else fails immediately.
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+def make_session(pool_size=10):
+    """Creates a requests session that keeps up to `pool_size` connections per host alive."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers['User-Agent'] = 'thucchienai-crawler/1.0'
+    return session
+
+
+def _request(session, url, timeout, headers=None, attempt=0):
+    """One GET, traced as an 'http.get' span."""
+    with span('http.get', url=url, attempt=attempt) as s:
+        response = session.get(url, timeout=timeout, headers=headers)
+        s.set(status=response.status_code, bytes_in=len(response.content))
+    return response
+
+
+def _get(session, url, timeout=REQUEST_TIMEOUT, retries=3, backoff=0.5, headers=None):
+    """GET with retries on connection errors and 429/5xx responses, using exponential backoff."""
+    for attempt in range(retries + 1):
+        try:
+            response = _request(session, url, timeout, headers, attempt)
+            if response.status_code not in RETRY_STATUSES or attempt == retries:
+                response.raise_for_status()
+                return response
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+            if attempt == retries:
+                raise
+        time.sleep(backoff * 2 ** attempt)
+
+
+def fetch_page(url, session=None, timeout=REQUEST_TIMEOUT, retries=3, backoff=0.5):
+    """Downloads a page and returns its body."""
+    session = session or make_session(pool_size=1)
+    return _get(session, url, timeout, retries, backoff).content
+
+
+def fetch_cached(url, cache, session=None, timeout=REQUEST_TIMEOUT, retries=3, backoff=0.5):
+    """
+    Downloads a page through a ResponseCache: no request while the entry is within
+    its TTL, otherwise a conditional GET (If-None-Match / If-Modified-Since).
+    Returns a CachedResponse.
+    """
+    fresh, headers = cache.lookup(url)
+    if fresh is not None:
+        return fresh
+    session = session or make_session(pool_size=1)
+    return cache.store(url, _get(session, url, timeout, retries, backoff, headers))
+
+
+@traced('parse.read_html')
+def parse_financials_html(content):
+    """
+    Returns the main table of a highlights page as a DataFrame: the one with the most data.
+    This is the original BeautifulSoup + pd.read_html path; it parses the page three
+    times and is kept for comparison with extract_main_table().
+    """
+    # imported here: only this comparison path needs bs4 and pandas
+    from bs4 import BeautifulSoup
+    import pandas as pd
+
+    soup = BeautifulSoup(content, 'html.parser')
+
+    tables = pd.read_html(io.StringIO(str(soup)))
+
+    # Heuristic to find the main table: the one with the most data
+    if not tables:
+        return None
+    return max(tables, key=lambda df: df.size)
+
+
+def _table_score(table):
+    """Rows x widest row, counted on the element tree without reading any text."""
+    widths = [sum(1 for cell in tr if cell.tag in ('td', 'th')) for tr in table.iter('tr')]
+    return len(widths) * max(widths, default=0)
+
+
+@traced('parse.extract_main_table')
+def extract_main_table(content, selector=None):
+    """
+    Parses the page once with lxml and returns the cell text of one table as a
+    list of rows. `selector` is an XPath expression picking the table (for
+    example "//table[@id='highlights']"); without it the table with the most
+    cells wins, matching the heuristic of parse_financials_html(). Only the
+    chosen table is materialized. Returns None if no table matches.
+    """
+    root = lxml.html.fromstring(content)
+    tables = root.xpath(selector) if selector else list(root.iter('table'))
+    if not tables:
+        return None
+    table = tables[0] if selector else max(tables, key=_table_score)
+
+    rows = []
+    for tr in table.iter('tr'):
+        row = []
+        for cell in tr:
+            if cell.tag not in ('td', 'th'):
+                continue
+            row.append(' '.join(cell.text_content().split()))
+            row.extend([''] * (int(cell.get('colspan', 1) or 1) - 1))
+        if row:
+            rows.append(row)
+    return rows
+
+
+def extract_highlights(content, selector=None):
+    """Extracts the main table and converts it straight into typed Highlights arrays."""
+    rows = extract_main_table(content, selector)
+    return None if rows is None else parse_rows(rows)
+
+
+def save_table(table, output_file):
+    """Writes a table returned by either extraction path to CSV."""
+    with span('save_table', path=output_file) as s:
+        if hasattr(table, 'to_csv'):
+            table.to_csv(output_file, index=False)
+        else:
+            with open(output_file, 'w', newline='', encoding='utf-8') as f:
+                csv.writer(f).writerows(table)
+        s.set(bytes_out=os.path.getsize(output_file))
 
-def crawl_techcombank_financials():
+
+def crawl_techcombank_financials(url=DEFAULT_URL, output_file=DEFAULT_OUTPUT, session=None, selector=None,
+                                 cache=None, history=None):
     """
     Crawls the Techcombank financial highlights page and saves the default data to a CSV file.
+    With a ResponseCache, unchanged pages cost a 304 (or nothing within the TTL)
+    and are not parsed or written again. With a SnapshotHistory, the changed
+    cells of every new table are recorded as a version of Techcombank.
     """
-    url = "https://techcombank.com/en/investors/financial-information/highlights"
     try:
-        response = requests.get(url)
-        response.raise_for_status()
-
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        tables = pd.read_html(str(soup))
-        
-        # Heuristic to find the main table: the one with the most data
-        if tables:
-            main_df = max(tables, key=lambda df: df.size)
-            
-            output_file = 'techcombank_financial_data_default.csv'
-            main_df.to_csv(output_file, index=False)
-            
+        if cache is None:
+            content, sha256 = fetch_page(url, session=session), None
+        else:
+            cached = fetch_cached(url, cache, session=session)
+            content, sha256 = cached.body, cached.sha256
+            if cache.is_parsed(url, sha256) and os.path.exists(output_file):
+                print(f"Page unchanged since the last run ({cached.source}); keeping {output_file}")
+                return
+        rows = extract_main_table(content, selector)
+
+        if rows is not None:
+            save_table(rows, output_file)
+            if cache is not None:
+                cache.mark_parsed(url, sha256)
+            if history is not None:
+                print(f"History: {history.record_rows(rows, 'Techcombank', url)}")
+
             print(f"Data successfully crawled and saved to {output_file}")
             print("Here is a preview of the data:")
-            print(main_df.head())
+            try:
+                print(parse_rows(rows).to_frame().head())
+            except ValueError:
+                for row in rows[:5]:
+                    print(row)
         else:
             print("No tables were found on the page.")
 
@@ -33,5 +189,176 @@ def crawl_techcombank_financials():
     except Exception as e:
         print(f"An error occurred: {e}")
 
+
+# --- Concurrent crawl ---
+# Many banks x many periods: pages are fetched over one pooled session from
+# worker threads driven by asyncio, so the total time is close to the slowest
+# page rather than the sum of all pages.
+
+CrawlTarget = namedtuple('CrawlTarget', ['bank', 'period', 'url'])
+CrawlResult = namedtuple('CrawlResult', ['target', 'table', 'error', 'elapsed', 'sha256', 'unchanged'],
+                         defaults=[None, False])
+
+
+class HostLimiter:
+    """Caps concurrent requests per host and spaces request starts to `rate` per second."""
+
+    def __init__(self, per_host=4, rate=None):
+        self.per_host = per_host
+        self.rate = rate
+        self._semaphores = {}
+        self._locks = {}
+        self._next_start = {}
+
+    def _host(self, url):
+        return urlsplit(url).netloc
+
+    def semaphore(self, url):
+        host = self._host(url)
+        if host not in self._semaphores:
+            self._semaphores[host] = asyncio.Semaphore(self.per_host)
+        return self._semaphores[host]
+
+    async def wait_turn(self, url):
+        if not self.rate:
+            return
+        host = self._host(url)
+        lock = self._locks.setdefault(host, asyncio.Lock())
+        async with lock:
+            now = time.monotonic()
+            start = max(now, self._next_start.get(host, now))
+            self._next_start[host] = start + 1.0 / self.rate
+        if start > now:
+            await asyncio.sleep(start - now)
+
+
+async def _fetch_async(session, url, limiter, timeout, retries, backoff, headers=None):
+    for attempt in range(retries + 1):
+        async with limiter.semaphore(url):
+            await limiter.wait_turn(url)
+            try:
+                response = await asyncio.to_thread(_request, session, url, timeout, headers, attempt)
+                if response.status_code not in RETRY_STATUSES or attempt == retries:
+                    response.raise_for_status()
+                    return response
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if attempt == retries:
+                    raise
+        # Back off outside the semaphore so other pages on the host keep flowing.
+        await asyncio.sleep(backoff * 2 ** attempt * (1 + random.random() / 2))
+
+
+async def crawl_many(targets, parse=extract_main_table, per_host=4, rate=None,
+                     timeout=REQUEST_TIMEOUT, retries=3, backoff=0.5, session=None, cache=None,
+                     is_current=None):
+    """
+    Fetches all targets concurrently and yields a CrawlResult for each one as soon
+    as its page has been downloaded and parsed, in completion order.
+    Failed targets are yielded with `error` set instead of raising. With a
+    ResponseCache, pages whose body was already parsed are yielded with
+    `unchanged` set and no table; `is_current(target, sha256)` can override
+    that check.
+    """
+    targets = list(targets)
+    limiter = HostLimiter(per_host=per_host, rate=rate)
+    hosts = {urlsplit(t.url).netloc for t in targets}
+    session = session or make_session(pool_size=per_host * max(len(hosts), 1))
+    if cache is not None and is_current is None:
+        is_current = lambda target, sha256: cache.is_parsed(target.url, sha256)
+
+    async def download(url):
+        if cache is None:
+            return (await _fetch_async(session, url, limiter, timeout, retries, backoff)).content, None
+        fresh, headers = await asyncio.to_thread(cache.lookup, url)
+        if fresh is None:
+            response = await _fetch_async(session, url, limiter, timeout, retries, backoff, headers)
+            fresh = await asyncio.to_thread(cache.store, url, response)
+        return fresh.body, fresh.sha256
+
+    async def run(target):
+        start = time.perf_counter()
+        try:
+            content, sha256 = await download(target.url)
+            if cache is not None and is_current(target, sha256):
+                return CrawlResult(target, None, None, time.perf_counter() - start, sha256, True)
+            table = await asyncio.to_thread(parse, content)
+            return CrawlResult(target, table, None, time.perf_counter() - start, sha256)
+        except Exception as e:
+            return CrawlResult(target, None, e, time.perf_counter() - start)
+
+    for next_done in asyncio.as_completed([run(t) for t in targets]):
+        yield await next_done
+
+
+def crawl_targets(targets, output_dir='.', cache=None, history=None, **options):
+    """
+    Runs crawl_many() and saves each table as <output_dir>/<bank>_<period>.csv,
+    recording its changed cells as a version of the bank in `history` if given.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+
+    def output_path(target):
+        return os.path.join(output_dir, f"{target.bank}_{target.period}.csv")
+
+    def is_current(target, sha256):
+        return cache.is_parsed(target.url, sha256) and os.path.exists(output_path(target))
+
+    async def run():
+        results = []
+        async for result in crawl_many(targets, cache=cache, is_current=is_current, **options):
+            target = result.target
+            if result.error is not None:
+                print(f"[{target.bank} {target.period}] failed after {result.elapsed:.2f}s: {result.error}")
+            elif result.unchanged:
+                print(f"[{target.bank} {target.period}] unchanged since the last run, skipped")
+            elif result.table is None:
+                print(f"[{target.bank} {target.period}] no tables found")
+            else:
+                output_file = output_path(target)
+                save_table(result.table, output_file)
+                if cache is not None:
+                    cache.mark_parsed(target.url, result.sha256)
+                if history is not None:
+                    history.record_rows(result.table, target.bank, target.url)
+                print(f"[{target.bank} {target.period}] saved to {output_file} ({result.elapsed:.2f}s)")
+            results.append(result)
+        return results
+
+    return asyncio.run(run())
+
+
+def read_targets(path):
+    """Reads crawl targets from a CSV file with bank, period and url columns."""
+    with open(path, newline='', encoding='utf-8') as f:
+        return [CrawlTarget(row['bank'], row['period'], row['url']) for row in csv.DictReader(f)]
+
+
 if __name__ == "__main__":
-    crawl_techcombank_financials()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Crawl bank financial highlights pages.")
+    parser.add_argument('--targets', help="CSV with bank, period, url columns for a concurrent crawl")
+    parser.add_argument('--output-dir', default='.')
+    parser.add_argument('--per-host', type=int, default=4, help="Concurrent requests per host")
+    parser.add_argument('--rate', type=float, help="Maximum requests per second per host")
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR, help="HTTP cache and raw page archive")
+    parser.add_argument('--ttl', type=float, default=DEFAULT_TTL, help="Seconds before a cached page is revalidated")
+    parser.add_argument('--no-cache', action='store_true', help="Always download and parse")
+    parser.add_argument('--selector', help="XPath of the table to extract, e.g. \"//table[@id='highlights']\"")
+    parser.add_argument('--history', help="Record the changed cells of each new table in this snapshot history")
+    parser.add_argument('--trace', help="Write a Chrome trace of requests and parsing to this file")
+    args = parser.parse_args()
+    if args.trace:
+        tracing.enable(args.trace)
+    cache = None if args.no_cache else ResponseCache(args.cache_dir, args.ttl)
+    history = None
+    if args.history:
+        from snapshot_history import SnapshotHistory
+        history = SnapshotHistory(args.history)
+
+    if args.targets:
+        crawl_targets(read_targets(args.targets), args.output_dir, cache=cache, history=history,
+                      per_host=args.per_host, rate=args.rate,
+                      parse=lambda content: extract_main_table(content, args.selector))
+    else:
+        crawl_techcombank_financials(selector=args.selector, cache=cache, history=history)
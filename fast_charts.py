@@ -0,0 +1,292 @@
+import colorsys
+import itertools
+
+import matplotlib
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.colors import to_rgb
+from matplotlib.figure import Figure
+
+# --- Fast bar charts ---
+# Most report charts are two to five labelled bars: PBT, credit costs and
+# credit growth (pages 4-6), the NIM/CoF twin-axis chart and the ROA/ROE
+# grouped bars. sns.barplot builds a DataFrame and runs its estimator and
+# categorical machinery for bars that have no error estimate; here the bars
+# are one ax.bar call and the value labels one annotation each. Standalone
+# charts are drawn on a plain Figure with its own Agg canvas (no pyplot
+# figure manager, nothing to close) under HOUSE_STYLE, the seaborn
+# "whitegrid" theme plus apply_theme()'s overrides, and use fixed margins
+# instead of tight/constrained layout. draw_bars() is also what pages 4-6
+# draw their bars with, so both paths look the same.
+
+HOUSE_STYLE = {
+    # seaborn whitegrid
+    'figure.facecolor': 'white',
+    'axes.facecolor': 'white',
+    'axes.edgecolor': '.8',
+    'axes.grid': True,
+    'axes.axisbelow': True,
+    'axes.labelcolor': '.15',
+    'text.color': '.15',
+    'xtick.color': '.15',
+    'ytick.color': '.15',
+    'xtick.bottom': False,
+    'ytick.left': False,
+    'grid.color': '.8',
+    'grid.linestyle': '-',
+    'patch.edgecolor': 'w',
+    'patch.force_edgecolor': True,
+    'lines.solid_capstyle': 'round',
+    # seaborn "notebook" context
+    'axes.linewidth': 1.25,
+    'grid.linewidth': 1,
+    'lines.linewidth': 1.5,
+    'lines.markersize': 6,
+    'patch.linewidth': 1,
+    'font.size': 12,
+    'axes.labelsize': 12,
+    'xtick.labelsize': 11,
+    'ytick.labelsize': 11,
+    'legend.fontsize': 11,
+    'legend.title_fontsize': 12,
+    # report_visualization.apply_theme()
+    'font.family': 'sans-serif',
+    'font.sans-serif': ['Arial', 'DejaVu Sans', 'Liberation Sans', 'sans-serif'],
+    'axes.labelweight': 'bold',
+    'axes.titleweight': 'bold',
+    'figure.titleweight': 'bold',
+    'axes.titlesize': 16,
+    'figure.titlesize': 20,
+}
+
+PALETTE = ('#a9a9a9', '#40466e')
+LINE_COLOR = '#ff7f0e'
+SATURATION = 0.75  # sns.barplot draws its palette at 75% saturation
+BAR_WIDTH = 0.8
+MARGINS = dict(left=0.12, right=0.95, top=0.88, bottom=0.1)
+TITLE_Y = 1.03  # a fixed title position; the automatic one measures every artist of the axes
+
+
+def _desaturate(color, prop=SATURATION):
+    h, l, s = colorsys.rgb_to_hls(*to_rgb(color))
+    return colorsys.hls_to_rgb(h, l, s * prop)
+
+
+def _bar_colors(colors, count):
+    return [_desaturate(c) for c in itertools.islice(itertools.cycle(colors), count)]
+
+
+def percent(value):
+    return f'{value}%'
+
+
+def thousands(value):
+    return f'{value:,.0f}'
+
+
+def _value_label(value, fmt):
+    """(text, height) of a bar's value label; a NaN bar (placeholder cell) gets no label."""
+    return ('', 0) if np.isnan(value) else (fmt(value), value)
+
+
+def _ylim_top(values, headroom):
+    """Top of the value axis above the highest bar, ignoring NaN bars."""
+    values = np.asarray(values, dtype=np.float64)
+    return np.nanmax(values) * headroom if not np.isnan(values).all() else 1
+
+
+def pbt_title(labels):
+    """'Lợi nhuận trước thuế (6T 2024 vs 6T 2025)' for the year-to-date labels of a snapshot."""
+    return f"Lợi nhuận trước thuế ({labels[0]} vs {labels[1]})"
+
+
+# --- Drawing on existing axes ---
+def draw_bars(ax, labels, values, colors=PALETTE, fmt=percent, headroom=1.2, xlabel='', ylabel=''):
+    """One bar per label with its value annotated above it, styled like sns.barplot."""
+    positions = range(len(values))
+    ax.bar(positions, values, width=BAR_WIDTH, color=_bar_colors(colors, len(values)))
+    for x, value in zip(positions, values):
+        text, y = _value_label(value, fmt)
+        ax.annotate(text, (x, y), ha='center', va='center', xytext=(0, 9), textcoords='offset points')
+    ax.set_xticks(positions, labels)
+    ax.set_xlim(-0.5, len(values) - 0.5)
+    ax.xaxis.grid(False)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel(ylabel)
+    ax.set_ylim(0, _ylim_top(values, headroom))
+    return ax
+
+
+def draw_grouped_bars(ax, labels, series, colors=PALETTE, fmt=percent, headroom=1.2, ylabel='', legend_title=None):
+    """Bars of several series ({name: values}) side by side for each label, with a legend."""
+    width = BAR_WIDTH / len(series)
+    for i, ((name, values), color) in enumerate(zip(series.items(), _bar_colors(colors, len(series)))):
+        positions = [x - BAR_WIDTH / 2 + width * (i + 0.5) for x in range(len(labels))]
+        ax.bar(positions, values, width=width, color=color, label=name)
+        for x, value in zip(positions, values):
+            text, y = _value_label(value, fmt)
+            ax.annotate(text, (x, y), ha='center', va='center', xytext=(0, 9), textcoords='offset points')
+    ax.set_xticks(range(len(labels)), labels)
+    ax.set_xlim(-0.5, len(labels) - 0.5)
+    ax.xaxis.grid(False)
+    ax.set_ylabel(ylabel)
+    ax.set_ylim(0, _ylim_top([v for values in series.values() for v in values], headroom))
+    ax.legend(title=legend_title)
+    return ax
+
+
+def draw_dual_axis(ax, labels, bars, line, bar_label, line_label, bar_color=PALETTE[1], line_color=LINE_COLOR):
+    """Bars on the left axis and a line with markers on a twin right axis. Returns the twin axes."""
+    ax.bar(labels, bars, color=bar_color, label=bar_label)
+    twin = ax.twinx()
+    twin.plot(labels, line, color=line_color, marker='o', label=line_label)
+    ax.set_ylabel(bar_label)
+    twin.set_ylabel(line_label)
+    return twin
+
+
+# --- Standalone charts ---
+def new_figure(figsize=(7, 5), margins=MARGINS):
+    """A Figure on its own Agg canvas, with fixed margins and one axes."""
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    fig.subplots_adjust(**margins)
+    return fig, fig.add_subplot()
+
+
+def bar_chart(labels, values, title, colors=PALETTE, fmt=percent, headroom=1.2, ylabel='', figsize=(7, 5)):
+    with matplotlib.rc_context(HOUSE_STYLE):
+        fig, ax = new_figure(figsize)
+        draw_bars(ax, labels, values, colors, fmt, headroom, ylabel=ylabel)
+        ax.set_title(title, y=TITLE_Y)
+    return fig
+
+
+def grouped_bar_chart(labels, series, title, colors=PALETTE, fmt=percent, headroom=1.2, ylabel='',
+                      legend_title=None, figsize=(8, 5)):
+    with matplotlib.rc_context(HOUSE_STYLE):
+        fig, ax = new_figure(figsize)
+        draw_grouped_bars(ax, labels, series, colors, fmt, headroom, ylabel, legend_title)
+        ax.set_title(title, y=TITLE_Y)
+    return fig
+
+
+def dual_axis_chart(labels, bars, line, title, bar_label, line_label, bar_color=PALETTE[1], line_color=LINE_COLOR,
+                    figsize=(8, 5)):
+    with matplotlib.rc_context(HOUSE_STYLE):
+        fig, ax = new_figure(figsize, dict(MARGINS, right=0.88))
+        twin = draw_dual_axis(ax, labels, bars, line, bar_label, line_label, bar_color, line_color)
+        ax.set_title(title, y=TITLE_Y)
+        fig.legend(loc='upper right', bbox_to_anchor=(0.86, 0.86))
+        twin.grid(False)
+    return fig
+
+
+# --- Report charts from page_data() ---
+CHARTS = {
+    'pbt': lambda data: bar_chart(data['pbt_labels'], data['pbt'], pbt_title(data['pbt_labels']),
+                                  fmt=thousands, headroom=1.1, ylabel='Tỷ VND'),
+    'credit_costs': lambda data: bar_chart(data['years'], data['credit_costs'], 'Chi phí tín dụng (Credit Costs)',
+                                           ylabel='Tỷ lệ (%)'),
+    'credit_growth': lambda data: bar_chart(data['years'], data['credit_growth'], 'Tăng trưởng tín dụng',
+                                            ylabel='Tỷ lệ (%)'),
+    'nim_cof': lambda data: dual_axis_chart(data['years'], data['nim'], data['cof'],
+                                            'Biên lãi ròng (NIM) và Chi phí vốn (CoF)', 'NIM (%)', 'Cost of Funds (%)'),
+    'roa_roe': lambda data: grouped_bar_chart(data['years'], {'ROA (%)': data['roa'], 'ROE (%)': data['roe']},
+                                              'So sánh ROA và ROE', ylabel='Tỷ lệ (%)', legend_title='Chỉ số'),
+}
+
+
+def render(fig, output, dpi=100, fmt=None):
+    """Saves a standalone chart to a path or file object."""
+    with matplotlib.rc_context(HOUSE_STYLE):  # fonts are looked up when the text is drawn
+        fig.savefig(output, dpi=dpi, format=fmt, facecolor=fig.get_facecolor())
+
+
+# --- Batches ---
+# A batch draws each chart kind once and then only moves its bars, value
+# labels, line and limits for the next dataset, as chart_templates does for
+# whole pages. Datasets of a batch have the same number of periods.
+def _update_bars(ax, labels, values, fmt, headroom):
+    notes = [t for t in ax.texts if hasattr(t, 'xyann')]
+    for bar, note, value in zip(ax.patches, notes, values):
+        bar.set_height(value)
+        text, y = _value_label(value, fmt)
+        note.xy = (bar.get_x() + bar.get_width() / 2., y)
+        note.set_text(text)
+    ax.set_xticks(range(len(labels)), labels)
+    ax.set_ylim(0, _ylim_top(values, headroom))
+
+
+def _update_dual_axis(fig, data):
+    ax, twin = fig.axes
+    for bar, value in zip(ax.patches, data['nim']):
+        bar.set_height(value)
+    ax.set_xticks(range(len(data['years'])), data['years'])
+    twin.lines[0].set_ydata(data['cof'])
+    for a in (ax, twin):
+        a.relim()
+        a.autoscale_view()
+
+
+def _update_pbt(fig, data):
+    _update_bars(fig.axes[0], data['pbt_labels'], data['pbt'], thousands, 1.1)
+    fig.axes[0].title.set_text(pbt_title(data['pbt_labels']))
+
+
+UPDATERS = {
+    'pbt': _update_pbt,
+    'credit_costs': lambda fig, data: _update_bars(fig.axes[0], data['years'], data['credit_costs'], percent, 1.2),
+    'credit_growth': lambda fig, data: _update_bars(fig.axes[0], data['years'], data['credit_growth'], percent, 1.2),
+    'nim_cof': _update_dual_axis,
+    # bars are stored series by series: every ROA bar, then every ROE bar
+    'roa_roe': lambda fig, data: _update_bars(fig.axes[0], data['years'], tuple(data['roa']) + tuple(data['roe']),
+                                              percent, 1.2),
+}
+
+
+def flowable(fig, width=None, height=None, vector=True, dpi=150):
+    """A standalone chart as a ReportLab flowable (chart_flowables.FigureFlowable)."""
+    from chart_flowables import FigureFlowable
+
+    with matplotlib.rc_context(HOUSE_STYLE):
+        return FigureFlowable(fig, width, height, vector=vector, dpi=dpi)
+
+
+def render_many(chart, datasets, output_pattern, dpi=100, fmt=None):
+    """Renders CHARTS[chart] for each dataset, e.g. output_pattern='charts/{bank}_nim_cof.png'."""
+    fig = None
+    paths = []
+    for key, data in datasets.items():
+        if fig is None:
+            fig = CHARTS[chart](data)
+        else:
+            UPDATERS[chart](fig, data)
+        path = output_pattern.format(bank=key)
+        render(fig, path, dpi, fmt)
+        paths.append(path)
+    return paths
+
+
+if __name__ == '__main__':
+    import argparse
+    import os
+
+    from report_metrics import ReportMetrics
+    from report_visualization import page_data
+
+    parser = argparse.ArgumentParser(description="Fast bar, grouped bar and dual-axis report charts.")
+    parser.add_argument('--source', default='aithucchien_1.csv', help="Highlights CSV")
+    parser.add_argument('--bank', default='Techcombank')
+    parser.add_argument('--charts', nargs='+', choices=sorted(CHARTS), help="Charts to render (default: all)")
+    parser.add_argument('--output-dir', default='.')
+    parser.add_argument('--dpi', type=int, default=100)
+    parser.add_argument('--format', default='png')
+    args = parser.parse_args()
+
+    data = page_data(ReportMetrics.from_csv(args.source, args.bank))
+    os.makedirs(args.output_dir, exist_ok=True)
+    for name in args.charts or CHARTS:
+        path = os.path.join(args.output_dir, f"{name}_chart.{args.format}")
+        render(CHARTS[name](data), path, args.dpi, args.format)
+        print(f"Wrote {path}")
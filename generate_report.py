@@ -3,111 +3,189 @@ from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
 from reportlab.lib.pagesizes import A4
 from reportlab.lib import colors
-from reportlab.pdfbase.ttfonts import TTFont
-from reportlab.pdfbase import pdfmetrics
+from reportlab.lib.utils import ImageReader
+import functools
 import os
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from report_assets import DEFAULT_DPI, ImageAssets
+from report_fonts import register_font
+from report_metrics import DEFAULT_BANK, DEFAULT_SOURCE, ReportMetrics, vn_number, vn_pct
+import tracing
+from tracing import span
 
 # --- Setup ---
 # Define corporate colors
 TCB_RED = colors.HexColor('#BE1E2D')
 TCB_BLUE = colors.HexColor('#00529B')
 
-# ReportLab needs a font that supports Vietnamese characters.
-# We will use Times New Roman as requested.
-def register_vietnamese_font():
-    """Tries to register a Vietnamese font, prioritizing Times New Roman."""
-    # Common path for Times New Roman on Windows
-    times_path_win = 'C:/Windows/Fonts/times.ttf'
-    # Fallback font path
-    roboto_path = 'Roboto-Regular.ttf'
-
-    if os.path.exists(times_path_win):
-        pdfmetrics.registerFont(TTFont('VietFont', times_path_win))
-        print("Successfully registered Times New Roman.")
-        return 'VietFont'
-    elif os.path.exists(roboto_path):
-        pdfmetrics.registerFont(TTFont('VietFont', roboto_path))
-        print("Times New Roman not found. Registered Roboto as a fallback.")
-        return 'VietFont'
-    else:
-        print("---")
-        print("WARNING: No suitable Vietnamese font found (Times New Roman or Roboto).")
-        print("The PDF may not render Vietnamese characters correctly.")
-        print("ACTION: Ensure 'times.ttf' is in C:/Windows/Fonts/ or download 'Roboto-Regular.ttf' and place it in this directory.")
-        print("---")
-        return 'Helvetica' # Default fallback
+# Define Styles
+@functools.lru_cache(maxsize=None)
+def get_styles(font_name):
+    """
+    Returns the report stylesheet for a font, built once per process.
+    The page builders only read styles, so every report can share it.
+    """
+    styles = getSampleStyleSheet()
 
-FONT_NAME = register_vietnamese_font()
+    # Modify existing styles, which is the correct approach
+    styles['Title'].fontName = font_name
+    styles['Title'].fontSize = 24
+    styles['Title'].alignment = TA_CENTER
+    styles['Title'].spaceAfter = 20
 
+    styles['Heading1'].fontName = font_name
+    styles['Heading1'].fontSize = 16
+    styles['Heading1'].spaceAfter = 12
+    styles['Heading1'].textColor = TCB_RED
+
+    styles['Heading2'].fontName = font_name
+    styles['Heading2'].fontSize = 14
+    styles['Heading2'].spaceAfter = 10
+    styles['Heading2'].textColor = TCB_BLUE
+
+    # Use the 'Normal' style for body text
+    styles['Normal'].fontName = font_name
+    styles['Normal'].fontSize = 11
+    styles['Normal'].alignment = TA_LEFT
+    styles['Normal'].leading = 14
+
+    styles['Bullet'].fontName = font_name
+    styles['Bullet'].fontSize = 11
+    styles['Bullet'].leftIndent = 20
+    styles['Bullet'].leading = 16
+
+    styles['Italic'].fontName = font_name
+    styles['Italic'].fontSize = 10
+    styles['Italic'].textColor = colors.gray
+    styles['Italic'].leading = 12
+
+    # Add a new *custom* style that doesn't conflict with defaults
+    styles.add(ParagraphStyle(name='SubTitle', fontName=font_name, fontSize=18, alignment=TA_CENTER, spaceAfter=40))
+    return styles
+
+
+# --- Report specs ---
+# One spec per board pack: which bank, which highlights snapshot, and where
+# the chart images for it live. All state of a build hangs off a ReportContext
+# created by build_report, so reports can be built repeatedly and in parallel.
+
+ReportSpec = namedtuple('ReportSpec', ['bank', 'source', 'assets_dir', 'image_dpi', 'live_charts', 'charts_dir'],
+                        defaults=[DEFAULT_BANK, DEFAULT_SOURCE, '.', DEFAULT_DPI, False, None])
+# image_dpi=None embeds images as they are, without the asset pipeline.
+# live_charts draws pages 5, 7 and 8 from the spec's metrics as vector charts
+# instead of embedding the pre-rendered images, and page 4's profit chart as
+# vector graphics instead of an in-memory PNG.
+# charts_dir embeds page<N>.png from that directory for pages 5, 7 and 8 and
+# pbt_chart.png for page 4, the charts rendered for this spec by pipeline.py.
+
+
+@functools.lru_cache(maxsize=None)
+def get_image_assets(dpi):
+    """One image pipeline per dpi and process, so source hashes are computed once per worker."""
+    return ImageAssets(dpi=dpi)
+
+
+class ReportContext:
+    """Per-build state shared by the page builders."""
+
+    def __init__(self, spec, metrics=None):
+        self.spec = spec
+        self.metrics = metrics or ReportMetrics.from_csv(spec.source, spec.bank)
+        self.font_name = register_font()
+        self.styles = get_styles(self.font_name)
+        self.title = f"Báo cáo Hội đồng Quản trị – {self.metrics.bank} {self.metrics.year} Insights"
+        self.story = []
+
+    def asset(self, name):
+        return os.path.join(self.spec.assets_dir, name)
+
+    def image(self, name, width, height):
+        """An Image flowable for an asset, downsampled to its placed size unless image_dpi is None."""
+        return self._image(self.asset(name), width, height)
+
+    def _fitted_image(self, path, width, height):
+        """_image() of a rendered chart, scaled into the width x height box (or to one side) keeping its proportions."""
+        image_width, image_height = ImageReader(path).getSize()
+        scale = min(width / image_width if width else float('inf'), height / image_height if height else float('inf'))
+        if scale == float('inf'):
+            scale = 1
+        return self._image(path, image_width * scale, image_height * scale)
+
+    def _image(self, path, width, height):
+        if self.spec.image_dpi:
+            path = get_image_assets(self.spec.image_dpi).prepare(path, width, height)
+        return Image(path, width=width, height=height)
+
+    def chart(self, page, name, width, height):
+        """
+        The chart of a report_visualization page: rendered for this spec into
+        charts_dir, drawn live from the metrics, or the image `name`.
+        """
+        if self.spec.charts_dir:
+            return self._fitted_image(os.path.join(self.spec.charts_dir, f"page{page}.png"), width, height)
+        if not self.spec.live_charts:
+            return self.image(name, width, height)
+        import report_visualization as rv
+        from chart_flowables import FigureFlowable
+
+        rv.plt.switch_backend('Agg')
+        return FigureFlowable(rv.PAGES[page](rv.page_data(self.metrics)), width, height)
+
+    def pbt_chart(self, width=None, height=None):
+        """
+        Page 4's profit before tax bars (fast_charts 'pbt'): charts_dir/pbt_chart.png,
+        or drawn from the metrics, as vector graphics with live_charts.
+        """
+        if self.spec.charts_dir:
+            return self._fitted_image(os.path.join(self.spec.charts_dir, 'pbt_chart.png'), width, height)
+        import fast_charts
+
+        m = self.metrics
+        fig = fast_charts.CHARTS['pbt']({'pbt_labels': m.ytd_labels, 'pbt': m.pbt})
+        return fast_charts.flowable(fig, width, height, vector=self.spec.live_charts,
+                                    dpi=self.spec.image_dpi or 150)
 
-# Define Styles
-styles = getSampleStyleSheet()
-
-# Modify existing styles, which is the correct approach
-styles['Title'].fontName = FONT_NAME
-styles['Title'].fontSize = 24
-styles['Title'].alignment = TA_CENTER
-styles['Title'].spaceAfter = 20
-
-styles['Heading1'].fontName = FONT_NAME
-styles['Heading1'].fontSize = 16
-styles['Heading1'].spaceAfter = 12
-styles['Heading1'].textColor = TCB_RED
-
-styles['Heading2'].fontName = FONT_NAME
-styles['Heading2'].fontSize = 14
-styles['Heading2'].spaceAfter = 10
-styles['Heading2'].textColor = TCB_BLUE
-
-# Use the 'Normal' style for body text
-styles['Normal'].fontName = FONT_NAME
-styles['Normal'].fontSize = 11
-styles['Normal'].alignment = TA_LEFT
-styles['Normal'].leading = 14
-
-styles['Bullet'].fontName = FONT_NAME
-styles['Bullet'].fontSize = 11
-styles['Bullet'].leftIndent = 20
-styles['Bullet'].leading = 16
-
-styles['Italic'].fontName = FONT_NAME
-styles['Italic'].fontSize = 10
-styles['Italic'].textColor = colors.gray
-styles['Italic'].leading = 12
-
-# Add a new *custom* style that doesn't conflict with defaults
-styles.add(ParagraphStyle(name='SubTitle', fontName=FONT_NAME, fontSize=18, alignment=TA_CENTER, spaceAfter=40))
-
-# Document setup
-doc = SimpleDocTemplate("Techcombank_Report_2025.pdf", pagesize=A4,
-                        rightMargin=60, leftMargin=60,
-                        topMargin=80, bottomMargin=60)
-story = []
 
 # --- Header and Footer ---
-def header_footer(canvas, doc):
-    """Adds a header and footer to each page."""
-    canvas.saveState()
-    # Header
-    header_text = "Báo cáo Hội đồng Quản trị – Techcombank 2025 Insights"
-    canvas.setFont(FONT_NAME, 9)
+def draw_page_number(canvas, font_name, number):
+    canvas.setFont(font_name, 9)
     canvas.setFillColor(colors.gray)
-    canvas.drawString(60, A4[1] - 40, header_text)
-    canvas.line(60, A4[1] - 50, A4[0] - 60, A4[1] - 50)
+    canvas.drawRightString(A4[0] - 60, 40, f"Trang {number}")
+
+
+def make_header_footer(ctx, page_numbers=True):
+    """
+    Returns the page callback that adds the report header and footer to each page.
+    Without page_numbers the "Trang N" label is left out (sharded builds stamp it when merging).
+    """
+    def header_footer(canvas, doc):
+        canvas.saveState()
+        # Header
+        header_text = ctx.title
+        canvas.setFont(ctx.font_name, 9)
+        canvas.setFillColor(colors.gray)
+        canvas.drawString(60, A4[1] - 40, header_text)
+        canvas.line(60, A4[1] - 50, A4[0] - 60, A4[1] - 50)
     
-    # Footer
-    footer_text = "Dẫn dắt Tương lai Số - Vững chắc Nền tảng"
-    canvas.drawString(60, 40, footer_text)
-    canvas.drawRightString(A4[0] - 60, 40, f"Trang {doc.page}")
-    canvas.restoreState()
+        # Footer
+        footer_text = "Dẫn dắt Tương lai Số - Vững chắc Nền tảng"
+        canvas.drawString(60, 40, footer_text)
+        if page_numbers:
+            draw_page_number(canvas, ctx.font_name, doc.page)
+        canvas.restoreState()
+
+    return header_footer
 
 # --- Content Definitions ---
 
 # Page 1: Cover
-def build_cover():
-    logo_path = "logo.png" # Placeholder for the logo
+def build_cover(ctx):
+    story, styles, m = ctx.story, ctx.styles, ctx.metrics
     try:
-        logo = Image(logo_path, width=200, height=100)
+        logo = ctx.image("logo.png", width=200, height=100) # Placeholder for the logo
         logo.hAlign = 'CENTER'
         story.append(logo)
         story.append(Spacer(1, 100))
@@ -115,41 +193,43 @@ def build_cover():
         story.append(Paragraph("<i>[Không tìm thấy logo.png]</i>", styles['Italic']))
         story.append(Spacer(1, 100))
 
-    story.append(Paragraph("Báo cáo Hội đồng Quản trị – Techcombank 2025 Insights", styles['Title']))
+    story.append(Paragraph(ctx.title, styles['Title']))
     story.append(Paragraph("Dẫn dắt Tương lai Số - Vững chắc Nền tảng", styles['SubTitle']))
     story.append(Spacer(1, 200))
-    story.append(Paragraph("Tháng 10 năm 2025", styles['Normal']))
+    story.append(Paragraph(m.report_month, styles['Normal']))
     story.append(PageBreak())
 
 # Page 3: Foreword
-def build_foreword():
+def build_foreword(ctx):
+    story, styles, m = ctx.story, ctx.styles, ctx.metrics
     story.append(Paragraph("Trang 3: Thư ngỏ từ Ban Lãnh đạo", styles['Heading1']))
     story.append(Spacer(1, 24))
     story.append(Paragraph("Kính gửi Hội đồng Quản trị,", styles['Normal']))
     story.append(Spacer(1, 12))
-    story.append(Paragraph("Năm 2025 là một năm thể hiện sự vững vàng và năng lực quản trị rủi ro hiệu quả của Techcombank trong bối cảnh thị trường đầy thách thức, qua đó khẳng định vị thế dẫn đầu về niềm tin khách hàng.", styles['Normal']))
+    story.append(Paragraph(f"Năm {m.year} là một năm thể hiện sự vững vàng và năng lực quản trị rủi ro hiệu quả của {m.bank} trong bối cảnh thị trường đầy thách thức, qua đó khẳng định vị thế dẫn đầu về niềm tin khách hàng.", styles['Normal']))
     story.append(Spacer(1, 12))
-    story.append(Paragraph("Báo cáo này sẽ tóm tắt những kết quả tài chính chính, phân tích các xu hướng, và đề xuất định hướng chiến lược cho năm 2026, tập trung vào tăng trưởng bền vững, đa dạng hóa nguồn thu và khai thác sâu hơn hệ sinh thái số.", styles['Normal']))
+    story.append(Paragraph(f"Báo cáo này sẽ tóm tắt những kết quả tài chính chính, phân tích các xu hướng, và đề xuất định hướng chiến lược cho năm {m.plan_year}, tập trung vào tăng trưởng bền vững, đa dạng hóa nguồn thu và khai thác sâu hơn hệ sinh thái số.", styles['Normal']))
     story.append(PageBreak())
 
 # Page 4: Financial Summary
-def build_financial_summary():
-    story.append(Paragraph("Trang 4: Tóm tắt Kết quả Tài chính năm 2025", styles['Heading1']))
-    story.append(Paragraph("<i>Năm 2025 cho thấy khả năng duy trì nền tảng kinh doanh vững chắc và quản trị rủi ro hiệu quả, dù lợi nhuận chịu áp lực từ bối cảnh kinh tế vĩ mô, thể hiện qua sự sụt giảm nhẹ so với cùng kỳ.</i>", styles['Italic']))
+def build_financial_summary(ctx):
+    story, styles, m = ctx.story, ctx.styles, ctx.metrics
+    story.append(Paragraph(f"Trang 4: Tóm tắt Kết quả Tài chính năm {m.year}", styles['Heading1']))
+    story.append(Paragraph(f"<i>Năm {m.year} cho thấy khả năng duy trì nền tảng kinh doanh vững chắc và quản trị rủi ro hiệu quả, dù lợi nhuận chịu áp lực từ bối cảnh kinh tế vĩ mô, thể hiện qua sự sụt giảm nhẹ so với cùng kỳ.</i>", styles['Italic']))
     story.append(Spacer(1, 24))
     
     # Using a table for side-by-side layout
     left_col_text = [
         Paragraph("<b>Các chỉ số chính (Infographic):</b>", styles['Heading2']),
         Spacer(1, 12),
-        Paragraph("• Lợi nhuận trước thuế (6T2025): <b>15.135 tỷ VND (-3,2%)</b>", styles['Bullet']),
-        Paragraph("• Tổng tài sản: <b>1.037.645 tỷ VND (+6,0%)</b>", styles['Bullet']),
-        Paragraph("• Tiền gửi khách hàng: <b>589.078 tỷ VND (+4,3%)</b>", styles['Bullet']),
-        Paragraph("• Tỷ lệ CASA: <b>41,1% (Duy trì vị thế dẫn đầu)</b>", styles['Bullet']),
-        Paragraph("• Tỷ lệ nợ xấu (NPL): <b>1,32% (Trong tầm kiểm soát)</b>", styles['Bullet'])
+        Paragraph(f"• Lợi nhuận trước thuế ({m.ytd_span}): <b>{vn_number(m.pbt[1])} tỷ VND ({vn_pct(m.pbt_change)})</b>", styles['Bullet']),
+        Paragraph(f"• Tổng tài sản: <b>{vn_number(m.total_assets[1])} tỷ VND ({vn_pct(m.change_pct(m.total_assets), signed=True)})</b>", styles['Bullet']),
+        Paragraph(f"• Tiền gửi khách hàng: <b>{vn_number(m.deposits[1])} tỷ VND ({vn_pct(m.change_pct(m.deposits), signed=True)})</b>", styles['Bullet']),
+        Paragraph(f"• Tỷ lệ CASA: <b>{vn_pct(m.casa[1])} (Duy trì vị thế dẫn đầu)</b>", styles['Bullet']),
+        Paragraph(f"• Tỷ lệ nợ xấu (NPL): <b>{vn_pct(m.npl[1], 2)} (Trong tầm kiểm soát)</b>", styles['Bullet'])
     ]
     
-    table_data = [[left_col_text, Image('pbt_chart.png', width=250, height=188)]]
+    table_data = [[left_col_text, ctx.pbt_chart(width=250)]]
     
     table = Table(table_data, colWidths=[250, 260])
     table.setStyle(TableStyle([('VALIGN', (0,0), (-1,-1), 'TOP')]))
@@ -158,7 +238,8 @@ def build_financial_summary():
     story.append(PageBreak())
 
 # Page 5: Performance Analysis
-def build_performance_analysis():
+def build_performance_analysis(ctx):
+    story, styles, m = ctx.story, ctx.styles, ctx.metrics
     story.append(Paragraph("Trang 5: Phân tích Chuyên sâu về Hiệu quả Hoạt động", styles['Heading1']))
     story.append(Paragraph("<i>Việc quản lý rủi ro tín dụng hiệu quả, thể hiện qua chi phí tín dụng giảm, đã giúp bù đắp một phần cho sự sụt giảm của biên lãi ròng (NIM) trong bối cảnh tăng trưởng tín dụng chậm lại.</i>", styles['Italic']))
     story.append(Spacer(1, 12))
@@ -166,15 +247,15 @@ def build_performance_analysis():
     # Using a table for a two-column layout
     col1_text = [
         Paragraph("<b>Phân tích Hiệu quả Sinh lời:</b>", styles['Heading2']),
-        Paragraph("• NIM (Biên lãi ròng): 3,7%", styles['Bullet']),
-        Paragraph("• Chi phí vốn (Cost of Funds): 3,5%", styles['Bullet']),
-        Paragraph("• Chi phí tín dụng (Credit Costs): 0.6%", styles['Bullet']),
+        Paragraph(f"• NIM (Biên lãi ròng): {vn_pct(m.nim[1])}", styles['Bullet']),
+        Paragraph(f"• Chi phí vốn (Cost of Funds): {vn_pct(m.cof[1])}", styles['Bullet']),
+        Paragraph(f"• Chi phí tín dụng (Credit Costs): {vn_pct(m.credit_costs[1])}", styles['Bullet']),
     ]
     
     col2_text = [
          Paragraph("<b>Phân tích Hiệu quả Quản lý:</b>", styles['Heading2']),
-         Paragraph("• ROA (LTM): 2,2%", styles['Bullet']),
-         Paragraph("• ROE (LTM): 14,5%", styles['Bullet']),
+         Paragraph(f"• ROA (LTM): {vn_pct(m.roa[1])}", styles['Bullet']),
+         Paragraph(f"• ROE (LTM): {vn_pct(m.roe[1])}", styles['Bullet']),
     ]
     
     data = [[col1_text, col2_text]]
@@ -184,21 +265,22 @@ def build_performance_analysis():
     
     story.append(Spacer(1, 24))
     try:
-        story.append(Image('page5.jpg', width=450, height=225))
+        story.append(ctx.chart(5, 'page5.jpg', width=450, height=225))
     except:
         story.append(Paragraph("<i>[Không tìm thấy page5.jpg]</i>", styles['Italic']))
     story.append(PageBreak())
 
 # Page 6: Trends, Risks, Opportunities
-def build_trends_analysis():
+def build_trends_analysis(ctx):
+    story, styles, m = ctx.story, ctx.styles, ctx.metrics
     story.append(Paragraph("Trang 6: Phân tích Xu hướng, Rủi ro và Cơ hội", styles['Heading1']))
-    story.append(Paragraph("<i>Trong bối cảnh kinh tế vĩ mô còn nhiều thách thức, vị thế dẫn đầu về số hóa và dữ liệu mang lại cho Techcombank cơ hội vàng để bứt phá.</i>", styles['Italic']))
+    story.append(Paragraph(f"<i>Trong bối cảnh kinh tế vĩ mô còn nhiều thách thức, vị thế dẫn đầu về số hóa và dữ liệu mang lại cho {m.bank} cơ hội vàng để bứt phá.</i>", styles['Italic']))
     story.append(Spacer(1, 12))
     
     # Table layout for better structure
     trends_text = [
         Paragraph("<b>Xu hướng chính:</b>", styles['Heading2']),
-        Paragraph("• Tăng trưởng tín dụng toàn ngành được kỳ vọng ở mức 15%, trong khi TCB ghi nhận 10,6%, phản ánh sự thận trọng và tập trung vào chất lượng.", styles['Bullet']),
+        Paragraph(f"• Tăng trưởng tín dụng toàn ngành được kỳ vọng ở mức 15%, trong khi {m.bank} ghi nhận {vn_pct(m.credit_growth[1])}, phản ánh sự thận trọng và tập trung vào chất lượng.", styles['Bullet']),
     ]
     
     risks_text = [
@@ -225,8 +307,9 @@ def build_trends_analysis():
     story.append(PageBreak())
 
 # Page 7: Strategy
-def build_strategy():
-    story.append(Paragraph("Trang 7: Đề xuất Chiến lược Trọng tâm năm 2026", styles['Heading1']))
+def build_strategy(ctx):
+    story, styles, m = ctx.story, ctx.styles, ctx.metrics
+    story.append(Paragraph(f"Trang 7: Đề xuất Chiến lược Trọng tâm năm {m.plan_year}", styles['Heading1']))
     story.append(Paragraph("Ba Trụ cột Chiến lược cho Tăng trưởng Bền vững", styles['SubTitle']))
     
     strategy_data = [
@@ -236,7 +319,7 @@ def build_strategy():
     ]
     table = Table(strategy_data, colWidths=[180, 280], rowHeights=60)
     table.setStyle(TableStyle([
-        ('FONT', (0,0), (-1,-1), FONT_NAME, 11),
+        ('FONT', (0,0), (-1,-1), ctx.font_name, 11),
         ('TEXTCOLOR', (0,0), (0,-1), TCB_RED),
         ('VALIGN', (0,0), (-1,-1), 'TOP'),
         ('GRID', (0,0), (-1,-1), 1, colors.lightgrey),
@@ -246,17 +329,18 @@ def build_strategy():
         ('BOTTOMPADDING', (0,0), (-1,-1), 10),
     ]))
     story.append(table)
-    logo = Image("C:/Users/Tran Thai Hoa/thucchienai/z7150693321576_13d597e2d6652cc836a9f14e97bb1466.jpg" , width=400, height=300)
+    logo = ctx.chart(7, "z7150693321576_13d597e2d6652cc836a9f14e97bb1466.jpg", width=400, height=300)
     logo.hAlign = 'CENTER'
     story.append(logo)
     story.append(PageBreak())
     
 # Page 8: Roadmap
-def build_roadmap():
+def build_roadmap(ctx):
+    story, styles, m = ctx.story, ctx.styles, ctx.metrics
     story.append(Paragraph("Trang 8: Kế hoạch hành động & Lộ trình", styles['Heading1']))
     story.append(Spacer(1, 24))
     try:
-        story.append(Image('timeline.jpg', width=500, height=250))
+        story.append(ctx.chart(8, 'timeline.jpg', width=500, height=250))
     except:
         story.append(Paragraph("<i>[Không tìm thấy timeline.jpg]</i>", styles['Italic']))
     story.append(PageBreak())
@@ -265,37 +349,143 @@ def build_roadmap():
 # For simplicity, we'll combine the rest.
 
 # Page 9: Conclusion
-def build_conclusion():
+def build_conclusion(ctx):
+    story, styles, m = ctx.story, ctx.styles, ctx.metrics
     story.append(Paragraph("Trang 9: Kết luận và Phụ lục", styles['Heading1']))
     story.append(Spacer(1, 24))
     story.append(Paragraph("<b>Kết luận:</b>", styles['Heading2']))
-    story.append(Paragraph("2025 là một năm thể hiện năng lực quản trị và sự vững vàng của Techcombank. Dù đối mặt với áp lực thu hẹp biên lãi ròng và tăng trưởng tín dụng chậm hơn so với thị trường chung, ngân hàng vẫn duy trì hiệu quả sinh lời và chất lượng tài sản vượt trội. Nền tảng số hóa và vị thế dẫn đầu về CASA là bệ phóng vững chắc để nắm bắt các cơ hội từ xu hướng thanh toán số và thị trường bán lẻ, qua đó đa dạng hóa nguồn thu trong năm 2026.", styles['Normal']))
+    story.append(Paragraph(f"{m.year} là một năm thể hiện năng lực quản trị và sự vững vàng của {m.bank}. Dù đối mặt với áp lực thu hẹp biên lãi ròng và tăng trưởng tín dụng chậm hơn so với thị trường chung, ngân hàng vẫn duy trì hiệu quả sinh lời và chất lượng tài sản vượt trội. Nền tảng số hóa và vị thế dẫn đầu về CASA là bệ phóng vững chắc để nắm bắt các cơ hội từ xu hướng thanh toán số và thị trường bán lẻ, qua đó đa dạng hóa nguồn thu trong năm {m.plan_year}.", styles['Normal']))
     story.append(Spacer(1, 24))
     story.append(Paragraph("<b>Kêu gọi hành động:</b>", styles['Heading2']))
     story.append(Paragraph("Đề nghị HĐQT thông qua 3 định hướng chiến lược và phân bổ nguồn lực cần thiết.", styles['Normal']))
     story.append(PageBreak())
     
 # Page 10: Contact
-def build_contact():
+def build_contact(ctx):
+    story, styles, m = ctx.story, ctx.styles, ctx.metrics
     story.append(Paragraph("Trang 10: Thông tin liên hệ", styles['Heading1']))
     story.append(Spacer(1, 48))
     story.append(Paragraph("<b>Đơn vị thực hiện:</b> Ban Phân tích Tài chính & Chiến lược", styles['Normal']))
     story.append(Paragraph("<b>Thông tin liên hệ:</b> [Tên người phụ trách], [Email], [Số điện thoại]", styles['Normal']))
+    story.append(PageBreak())
+
+# Appendix: every figure of the highlights table, in splittable chunks
+def build_appendix(ctx):
+    from report_appendix import data_tables, highlights_sections
+
+    story, styles, m = ctx.story, ctx.styles, ctx.metrics
+    story.append(Paragraph(f"Phụ lục: Số liệu chi tiết {m.quarter}", styles['Heading1']))
+    story.append(Paragraph(f"<i>Toàn bộ số liệu nổi bật của {m.bank} theo quý, lũy kế và so sánh, như công bố.</i>", styles['Italic']))
+    story.append(Spacer(1, 12))
+    story.extend(data_tables(*highlights_sections(m.highlights), ctx.font_name))
 
 
 # --- Build the PDF ---
-print("Building PDF report...")
-build_cover()
-# Skipping Page 2 (TOC) for simplicity
-build_foreword()
-build_financial_summary()
-build_performance_analysis()
-build_trends_analysis()
-build_strategy()
-build_roadmap()
-# Skipping Page 8 (Roadmap)
-build_conclusion()
-build_contact()
-
-doc.build(story, onFirstPage=header_footer, onLaterPages=header_footer)
-print("Successfully generated Techcombank_Report_2025.pdf")
+PAGE_BUILDERS = [
+    build_cover,
+    # Skipping Page 2 (TOC) for simplicity
+    build_foreword,
+    build_financial_summary,
+    build_performance_analysis,
+    build_trends_analysis,
+    build_strategy,
+    build_roadmap,
+    build_conclusion,
+    build_contact,
+    build_appendix,
+]
+
+
+def build_report(spec=None, output=None, metrics=None):
+    """
+    Builds one board pack PDF for `spec` and returns the output path.
+    Every call gets its own document and story.
+    """
+    spec = spec or ReportSpec()
+    ctx = ReportContext(spec, metrics)
+    output = output or f"{ctx.metrics.bank}_Report_{ctx.metrics.year}.pdf"
+    doc = SimpleDocTemplate(output, pagesize=A4,
+                            rightMargin=60, leftMargin=60,
+                            topMargin=80, bottomMargin=60)
+    for build_page in PAGE_BUILDERS:
+        with span(build_page.__name__, bank=ctx.metrics.bank):
+            build_page(ctx)
+    header_footer = make_header_footer(ctx)
+    with span('doc.build', bank=ctx.metrics.bank, flowables=len(ctx.story)) as s:
+        doc.build(ctx.story, onFirstPage=header_footer, onLaterPages=header_footer)
+        s.set(pages=doc.page, bytes_out=os.path.getsize(output))
+    return output
+
+
+def _build_timed(spec, output):
+    start = time.perf_counter()
+    return spec, build_report(spec, output), time.perf_counter() - start
+
+
+def build_reports(specs, output_dir='reports', workers=None):
+    """
+    Builds one report per spec in a process pool, to <output_dir>/<bank>_<snapshot>.pdf.
+    Returns {spec: (path, seconds)}; a failed spec is reported and skipped.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    results = {}
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        futures = {}
+        for spec in specs:
+            snapshot = os.path.splitext(os.path.basename(spec.source))[0]
+            output = os.path.join(output_dir, f"{spec.bank}_{snapshot}.pdf")
+            futures[pool.submit(_build_timed, spec, output)] = spec
+        for future in as_completed(futures):
+            try:
+                spec, path, seconds = future.result()
+            except Exception as e:
+                print(f"Failed {futures[future].bank} ({futures[future].source}): {e}")
+                continue
+            results[spec] = (path, seconds)
+    elapsed = time.perf_counter() - start
+    print(f"Built {len(results)}/{len(futures)} reports in {elapsed:.2f}s "
+          f"({len(results) / elapsed * 60:.0f} reports/min)")
+    return results
+
+
+def read_specs(path):
+    """Reads report specs from a CSV with bank,source[,assets_dir,image_dpi,live_charts] columns."""
+    import csv
+
+    specs = []
+    with open(path, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            fields = {k: v for k, v in row.items() if v}
+            if 'image_dpi' in fields:
+                fields['image_dpi'] = int(fields['image_dpi'])
+            if 'live_charts' in fields:
+                fields['live_charts'] = fields['live_charts'].lower() in ('1', 'true', 'yes')
+            specs.append(ReportSpec(**fields))
+    return specs
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Board report PDF builder.")
+    parser.add_argument('--bank', default=DEFAULT_BANK)
+    parser.add_argument('--source', default=DEFAULT_SOURCE, help="Highlights CSV of the reporting quarter")
+    parser.add_argument('--output', help="Output PDF (default: <bank>_Report_<year>.pdf)")
+    parser.add_argument('--live-charts', action='store_true', help="Draw the page 4, 5, 7 and 8 charts from --source as vector graphics")
+    parser.add_argument('--image-dpi', type=int, default=DEFAULT_DPI, help="Resolution of embedded images; 0 embeds the sources as they are")
+    parser.add_argument('--batch', help="CSV of report specs (bank,source[,assets_dir,image_dpi,live_charts]) to build in parallel")
+    parser.add_argument('--output-dir', default='reports', help="Output directory for --batch")
+    parser.add_argument('--workers', type=int, help="Worker processes for --batch (default: CPU count)")
+    parser.add_argument('--trace', help="Write a Chrome trace of the build (all workers) to this file")
+    args = parser.parse_args()
+    if args.trace:
+        tracing.enable(args.trace)
+
+    if args.batch:
+        build_reports(read_specs(args.batch), args.output_dir, args.workers)
+    else:
+        print("Building PDF report...")
+        spec = ReportSpec(args.bank, args.source, image_dpi=args.image_dpi or None, live_charts=args.live_charts)
+        output = build_report(spec, args.output)
+        print(f"Successfully generated {output}")
@@ -0,0 +1,301 @@
+import csv
+import io
+import re
+
+import numpy as np
+
+# --- Layout of the investor-highlights tables ---
+# Each section starts with a header row such as
+#   "Balance sheet (VND Bn),2Q24,3Q24,4Q24,1Q25,2Q25,6M24,6M25,6M25 vs 6M24,2Q25 vs 1Q25,2Q25 vs 2Q24"
+# followed by one row per metric. The first five period columns are quarters,
+# the next two are year-to-date totals and the last three are changes.
+QUARTER_RE = re.compile(r'^[1-4]Q\d{2}$')
+YTD_RE = re.compile(r'^(?:\d{1,2}M|FY)\d{2}$')
+CHANGE_RE = re.compile(r'\bvs\.?\s', re.IGNORECASE)
+
+UNIT_VND_BN = 'VND bn'
+UNIT_PCT = '%'
+UNIT_BPS = 'bps'
+
+# Footnote markers are glued to some labels ("Credit growth1", "LDR2", "NFI/TOI3").
+_FOOTNOTE_RE = re.compile(r'(?<=[A-Za-z)])\d$')
+
+# Everything that is not part of the number itself. Stripping these in one
+# str.translate call over the joined file is what keeps parsing vectorized.
+_STRIP_TABLE = str.maketrans('', '', ',()%bps +')
+_CELL_SEP = '\x1f'
+
+
+def is_period_label(cell):
+    """Returns True if a cell looks like a period column header."""
+    cell = cell.strip()
+    return bool(QUARTER_RE.match(cell) or YTD_RE.match(cell) or CHANGE_RE.search(cell))
+
+
+def is_section_header(row):
+    """A section header repeats the period labels after the section name."""
+    labels = [cell for cell in row[1:] if cell.strip()]
+    return bool(labels) and all(is_period_label(cell) for cell in labels)
+
+
+def quarter_key(label):
+    """Maps a quarter label such as '2Q25' to a sortable integer (year * 4 + quarter - 1)."""
+    label = label.strip()
+    if not QUARTER_RE.match(label):
+        raise ValueError(f"Not a quarter label: {label}")
+    return (2000 + int(label[2:])) * 4 + int(label[0]) - 1
+
+
+def quarter_label(key):
+    """Inverse of quarter_key()."""
+    year, q = divmod(int(key), 4)
+    return f"{q + 1}Q{year % 100:02d}"
+
+
+def ytd_label(key):
+    """Year-to-date label of the period ending in quarter `key`: '6M25', '9M25' or 'FY25'."""
+    year, q = divmod(int(key), 4)
+    return f"FY{year % 100:02d}" if q == 3 else f"{3 * (q + 1)}M{year % 100:02d}"
+
+
+def period_columns(key):
+    """
+    Period columns of the table reported at quarter `key`: the last five
+    quarters, the year to date and a year earlier, and the three changes.
+    """
+    quarter = quarter_label(key)
+    return ([quarter_label(key - 4 + i) for i in range(5)]
+            + [ytd_label(key - 4), ytd_label(key)]
+            + [f"{ytd_label(key)} vs {ytd_label(key - 4)}",
+               f"{quarter} vs {quarter_label(key - 1)}",
+               f"{quarter} vs {quarter_label(key - 4)}"])
+
+
+def clean_metric_name(label):
+    """Strips footnote markers, e.g. 'Credit growth1' -> 'Credit growth'."""
+    return _FOOTNOTE_RE.sub('', label.strip())
+
+
+class Highlights:
+    """Typed view of one investor-highlights table.
+
+    `values` is a float64 array with one row per metric and one column per
+    period label in `columns`. Percentages are kept in percent points (14.2 for
+    14.2%) and changes quoted in bps stay in bps, as printed in the source.
+    `units` tags the period values of each row, `change_units` tags each of the
+    "vs" columns. `decimals` (or a function returning it, called on first
+    use) gives the decimals each value was printed with, where known.
+    """
+
+    def __init__(self, columns, sections, section_index, labels, values, units, change_units, decimals=None):
+        self.columns = list(columns)
+        self.sections = list(sections)
+        self.section_index = section_index
+        self.labels = labels
+        self.metrics = [clean_metric_name(label) for label in labels]
+        self.values = values
+        self.units = units
+        self.change_units = change_units
+        self._decimals = decimals
+
+        self.quarter_cols = [i for i, c in enumerate(self.columns) if QUARTER_RE.match(c)]
+        self.ytd_cols = [i for i, c in enumerate(self.columns) if YTD_RE.match(c)]
+        self.change_cols = [i for i, c in enumerate(self.columns) if CHANGE_RE.search(c)]
+        self._row_of = {}
+        for i, metric in enumerate(self.metrics):
+            self._row_of.setdefault(metric, i)
+
+    @property
+    def decimals(self):
+        """Decimals of each value as printed (int array shaped like `values`), or None."""
+        if callable(self._decimals):
+            self._decimals = self._decimals()
+        return self._decimals
+
+    @property
+    def quarters(self):
+        return [self.columns[i] for i in self.quarter_cols]
+
+    @property
+    def ytd_periods(self):
+        return [self.columns[i] for i in self.ytd_cols]
+
+    @property
+    def change_periods(self):
+        return [self.columns[i] for i in self.change_cols]
+
+    def row_index(self, metric):
+        """Returns the row number of a metric (footnote markers optional)."""
+        try:
+            return self._row_of[clean_metric_name(metric)]
+        except KeyError:
+            raise KeyError(f"Metric not found: {metric}") from None
+
+    def get(self, metric, period):
+        """Returns the value of a metric for a period label such as '2Q25' or '6M25'."""
+        return float(self.values[self.row_index(metric), self.columns.index(period)])
+
+    def section_of(self, metric):
+        return self.sections[self.section_index[self.row_index(metric)]]
+
+    def to_frame(self):
+        """Returns the table as a pandas DataFrame indexed by metric."""
+        import pandas as pd
+        frame = pd.DataFrame(self.values, index=self.metrics, columns=self.columns)
+        frame.insert(0, 'unit', self.units)
+        frame.insert(0, 'section', [self.sections[i] for i in self.section_index])
+        return frame
+
+
+def split_sections(rows):
+    """
+    Splits raw CSV rows into sections.
+    Returns the period columns of the first header and a list of
+    (section name, header row, metric rows) tuples. Rows before the first
+    section header (such as the 'Column1,...' line) and blank rows are dropped.
+    """
+    columns = None
+    sections = []
+    for row in rows:
+        if not row or not any(cell.strip() for cell in row):
+            continue
+        if is_section_header(row):
+            if columns is None:
+                columns = [cell.strip() for cell in row[1:]]
+            sections.append((row[0].strip(), row, []))
+        elif sections:
+            sections[-1][2].append(row)
+    if columns is None:
+        raise ValueError("No section header with period columns found.")
+    return columns, sections
+
+
+def _printed_decimals(text, shape):
+    """Digits after the decimal point of each stripped cell, e.g. 2 for '4.30'."""
+    text = np.asarray(text, dtype=str)
+    point = np.char.rfind(text, '.')
+    return np.where(point >= 0, np.char.str_len(text) - point - 1, 0).reshape(shape)
+
+
+def _to_float(cell):
+    """float(cell), or NaN for a cell that is not a number."""
+    try:
+        return float(cell)
+    except ValueError:
+        return np.nan
+
+
+def parse_rows(rows):
+    """Converts raw table rows (lists of cell strings) into a Highlights object."""
+    columns, sections = split_sections(rows)
+    width = len(columns)
+
+    section_names = []
+    section_index = []
+    labels = []
+    cells = []
+    for s, (name, _, metric_rows) in enumerate(sections):
+        section_names.append(name)
+        for row in metric_rows:
+            section_index.append(s)
+            labels.append(row[0].strip())
+            row_cells = row[1:width + 1]
+            if len(row_cells) < width:
+                row_cells = row_cells + [''] * (width - len(row_cells))
+            cells.extend(row_cells)
+
+    n_rows = len(labels)
+    raw = np.array(cells, dtype=str).reshape(n_rows, width)
+    raw = np.char.strip(raw)
+
+    # One pass over all cells at once: strip formatting, then let NumPy parse.
+    if n_rows:
+        stripped = _CELL_SEP.join(raw.ravel().tolist()).translate(_STRIP_TABLE)
+        numbers = np.array(stripped.split(_CELL_SEP), dtype=object)
+        numbers[numbers == ''] = 'nan'
+        try:
+            values = numbers.astype(np.float64)
+        except ValueError:
+            # placeholder cells such as '-', 'n/a' or 'N/M': the slow path, cell by cell
+            values = np.array([_to_float(cell) for cell in numbers], dtype=np.float64)
+        values = values.reshape(n_rows, width)
+        decimals = lambda: _printed_decimals(numbers, (n_rows, width))  # only counted when asked for
+    else:
+        # section headers only; ''.split() would still give one cell
+        values = np.empty((0, width), dtype=np.float64)
+        decimals = np.zeros((0, width), dtype=int)
+
+    negative = np.char.startswith(raw, '(') | np.char.startswith(raw, '-')
+    values = np.where(negative, -np.abs(values), values)
+
+    is_pct = np.char.endswith(raw, '%')
+    is_bps = np.char.endswith(raw, 'bps')
+
+    change_mask = np.array([bool(CHANGE_RE.search(c)) for c in columns])
+    level_pct = is_pct[:, ~change_mask].any(axis=1)
+    units = np.where(level_pct, UNIT_PCT, UNIT_VND_BN)
+    change_units = np.where(is_bps[:, change_mask], UNIT_BPS, UNIT_PCT)
+
+    return Highlights(columns, section_names, np.array(section_index, dtype=np.intp),
+                      labels, values, units, change_units, decimals)
+
+
+def _format_cell(value, unit, decimals):
+    if np.isnan(value):
+        return ''
+    if unit == UNIT_BPS:
+        bps = round(value)
+        return f"{'-' if bps < 0 else '+'}{abs(bps):,} bps"
+    if unit == UNIT_PCT:
+        return f"{value:.{decimals}f}%"
+    text = f"{abs(value):,.0f}"
+    return f"({text})" if round(value) < 0 else text
+
+
+def format_rows(highlights, decimals=None, junk_header=True):
+    """
+    Inverse of parse_rows(): the table as CSV rows in the layout of
+    aithucchien_*.csv. `decimals` gives the decimals of each percentage row
+    (default 1), or of each cell as a rows x columns array; changes in % are
+    printed with one decimal.
+    """
+    h = highlights
+    change_mask = np.array([bool(CHANGE_RE.search(c)) for c in h.columns])
+    width = len(h.columns)
+    rows = [[f"Column{i}" for i in range(1, width + 2)]] if junk_header else []
+    for s, section in enumerate(h.sections):
+        rows.append([section] + h.columns)
+        for i in np.flatnonzero(h.section_index == s):
+            row_decimals = 1 if decimals is None else decimals[i]
+            cells, k = [h.labels[i]], 0
+            for j in range(width):
+                if change_mask[j]:
+                    cells.append(_format_cell(h.values[i, j], h.change_units[i, k], 1))
+                    k += 1
+                else:
+                    cells.append(_format_cell(h.values[i, j], h.units[i],
+                                              row_decimals[j] if np.ndim(row_decimals) else row_decimals))
+            rows.append(cells)
+    if junk_header:
+        rows.append([''] * (width + 1))
+    return rows
+
+
+def parse_text(text):
+    """Parses the CSV text of an investor-highlights table."""
+    return parse_rows(list(csv.reader(io.StringIO(text))))
+
+
+def load_highlights(path):
+    """Loads an investor-highlights CSV (aithucchien_*.csv, techcombank_financial_data*.csv)."""
+    with open(path, newline='', encoding='utf-8') as f:
+        return parse_rows(list(csv.reader(f)))
+
+
+if __name__ == '__main__':
+    import sys
+
+    for path in sys.argv[1:] or ['aithucchien_1.csv']:
+        highlights = load_highlights(path)
+        print(f"{path}: {len(highlights.metrics)} metrics, periods {', '.join(highlights.columns)}")
+        print(highlights.to_frame())
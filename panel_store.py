@@ -0,0 +1,240 @@
+import hashlib
+import math
+import sqlite3
+import time
+
+from highlights_loader import load_highlights, quarter_key, quarter_label
+
+# --- Quarterly panel store ---
+# Each highlights snapshot (aithucchien_*.csv) holds a rolling five-quarter
+# window, so consecutive snapshots mostly repeat each other. The store keeps a
+# single value per (bank, metric, quarter), remembers which snapshot it came
+# from and records every disagreement between snapshots as a restatement.
+
+DEFAULT_STORE = 'panel_store.sqlite'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS observations (
+    bank TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    quarter_key INTEGER NOT NULL,
+    value REAL,
+    unit TEXT NOT NULL,
+    section TEXT NOT NULL,
+    source TEXT NOT NULL,
+    as_of INTEGER NOT NULL,
+    restated INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (bank, metric, quarter_key)
+);
+CREATE INDEX IF NOT EXISTS observations_by_metric ON observations (metric, quarter_key);
+CREATE TABLE IF NOT EXISTS restatements (
+    bank TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    quarter_key INTEGER NOT NULL,
+    old_value REAL,
+    new_value REAL,
+    old_source TEXT NOT NULL,
+    new_source TEXT NOT NULL,
+    recorded_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS restatements_by_key ON restatements (bank, metric, quarter_key);
+CREATE TABLE IF NOT EXISTS snapshots (
+    sha256 TEXT NOT NULL,
+    bank TEXT NOT NULL,
+    source TEXT NOT NULL,
+    as_of INTEGER NOT NULL,
+    ingested_at REAL NOT NULL,
+    PRIMARY KEY (sha256, bank)
+);
+"""
+
+# Values are printed with at most two decimals, so anything closer than this
+# is the same figure.
+_TOLERANCE = 1e-6
+
+
+def _same_value(a, b):
+    if a is None or b is None:
+        return a is None and b is None
+    return abs(a - b) <= _TOLERANCE
+
+
+def _to_db(value):
+    return None if math.isnan(value) else float(value)
+
+
+class PanelStore:
+    """SQLite-backed store of quarterly highlight values keyed by (bank, metric, quarter)."""
+
+    def __init__(self, path=DEFAULT_STORE):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(_SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # --- Ingestion ---
+
+    def ingest(self, path, bank):
+        """
+        Merges one highlights CSV into the store.
+        Files that were already ingested for this bank are skipped by content
+        hash. Returns a dict with the number of added, changed, restated,
+        unchanged and empty cells.
+        """
+        with open(path, 'rb') as f:
+            digest = hashlib.sha256(f.read()).hexdigest()
+        seen = self.conn.execute(
+            "SELECT 1 FROM snapshots WHERE sha256 = ? AND bank = ?", (digest, bank)).fetchone()
+        if seen:
+            return {'added': 0, 'changed': 0, 'restated': 0, 'unchanged': 0, 'empty': 0, 'skipped': True}
+        summary = self.ingest_highlights(load_highlights(path), bank, str(path))
+        self.conn.execute("INSERT INTO snapshots VALUES (?, ?, ?, ?, ?)",
+                          (digest, bank, str(path), summary.pop('as_of'), time.time()))
+        self.conn.commit()
+        return summary
+
+    def ingest_highlights(self, highlights, bank, source):
+        """
+        Merges the quarter columns of a Highlights object.
+        A snapshot only overrides values from snapshots that are not newer than
+        itself (judged by the latest quarter each one covers); older snapshots
+        that disagree are still recorded as restatements. Empty cells (NaN,
+        e.g. '-' or 'n/a' placeholders) are skipped, so they never replace a value.
+        """
+        keys = [quarter_key(q) for q in highlights.quarters]
+        as_of = max(keys)
+        existing = {
+            (metric, qk): (value, src, old_as_of)
+            for metric, qk, value, src, old_as_of in self.conn.execute(
+                f"SELECT metric, quarter_key, value, source, as_of FROM observations "
+                f"WHERE bank = ? AND quarter_key IN ({','.join('?' * len(keys))})",
+                [bank, *keys])
+        }
+
+        inserts, updates, restatements = [], [], []
+        changed = unchanged = empty = 0
+        now = time.time()
+        for row, metric in enumerate(highlights.metrics):
+            unit = str(highlights.units[row])
+            section = highlights.sections[highlights.section_index[row]]
+            for col, qk in zip(highlights.quarter_cols, keys):
+                value = _to_db(highlights.values[row, col])
+                if value is None:
+                    empty += 1
+                    continue
+                old = existing.get((metric, qk))
+                if old is None:
+                    inserts.append((bank, metric, qk, value, unit, section, source, as_of))
+                    existing[(metric, qk)] = (value, source, as_of)
+                    continue
+                old_value, old_source, old_as_of = old
+                if _same_value(old_value, value):
+                    unchanged += 1
+                    continue
+                restatements.append((bank, metric, qk, old_value, value, old_source, source, now))
+                if as_of >= old_as_of:
+                    updates.append((value, unit, section, source, as_of, bank, metric, qk))
+                    existing[(metric, qk)] = (value, source, as_of)
+                    changed += 1
+                else:
+                    updates.append((old_value, unit, section, old_source, old_as_of, bank, metric, qk))
+
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO observations (bank, metric, quarter_key, value, unit, section, source, as_of) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", inserts)
+            self.conn.executemany(
+                "UPDATE observations SET value = ?, unit = ?, section = ?, source = ?, as_of = ?, restated = 1 "
+                "WHERE bank = ? AND metric = ? AND quarter_key = ?", updates)
+            self.conn.executemany("INSERT INTO restatements VALUES (?, ?, ?, ?, ?, ?, ?, ?)", restatements)
+        return {'added': len(inserts), 'changed': changed,
+                'restated': len(restatements), 'unchanged': unchanged, 'empty': empty, 'as_of': as_of}
+
+    # --- Queries ---
+
+    def series(self, bank, metric, since=None, until=None):
+        """Returns [(quarter, value), ...] for one bank and metric in quarter order."""
+        return [(quarter, value) for _, quarter, value, _ in
+                self.query(metric, since=since, until=until, bank=bank)]
+
+    def query(self, metric, since=None, until=None, bank=None):
+        """
+        Returns [(bank, quarter, value, restated), ...] for a metric, e.g.
+        store.query('NIM (LTM)', since='1Q21'). Served from the
+        (metric, quarter) index.
+        """
+        sql = "SELECT bank, quarter_key, value, restated FROM observations WHERE metric = ?"
+        params = [metric]
+        if bank is not None:
+            sql += " AND bank = ?"
+            params.append(bank)
+        if since is not None:
+            sql += " AND quarter_key >= ?"
+            params.append(quarter_key(since))
+        if until is not None:
+            sql += " AND quarter_key <= ?"
+            params.append(quarter_key(until))
+        sql += " ORDER BY bank, quarter_key"
+        return [(b, quarter_label(qk), value, bool(restated))
+                for b, qk, value, restated in self.conn.execute(sql, params)]
+
+    def restatements(self, bank=None, metric=None):
+        """Returns every recorded restatement as a list of dicts, oldest first."""
+        sql = ("SELECT bank, metric, quarter_key, old_value, new_value, old_source, new_source, recorded_at "
+               "FROM restatements WHERE 1 = 1")
+        params = []
+        if bank is not None:
+            sql += " AND bank = ?"
+            params.append(bank)
+        if metric is not None:
+            sql += " AND metric = ?"
+            params.append(metric)
+        sql += " ORDER BY rowid"
+        keys = ('bank', 'metric', 'quarter', 'old_value', 'new_value', 'old_source', 'new_source', 'recorded_at')
+        rows = []
+        for row in self.conn.execute(sql, params):
+            entry = dict(zip(keys, row))
+            entry['quarter'] = quarter_label(entry['quarter'])
+            rows.append(entry)
+        return rows
+
+    def banks(self):
+        return [b for (b,) in self.conn.execute("SELECT DISTINCT bank FROM observations ORDER BY bank")]
+
+    def metrics(self, bank):
+        """Returns (section, metric, unit) tuples for a bank in first-seen order."""
+        return list(self.conn.execute(
+            "SELECT section, metric, unit FROM observations WHERE bank = ? "
+            "GROUP BY metric ORDER BY min(rowid)", (bank,)))
+
+    def quarters(self, bank):
+        return [quarter_label(qk) for (qk,) in self.conn.execute(
+            "SELECT DISTINCT quarter_key FROM observations WHERE bank = ? ORDER BY quarter_key", (bank,))]
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Merge highlight snapshots into the quarterly panel store.")
+    parser.add_argument('files', nargs='*', help="Highlights CSV files to ingest")
+    parser.add_argument('--bank', default='Techcombank')
+    parser.add_argument('--store', default=DEFAULT_STORE)
+    parser.add_argument('--query', help="Metric to print, e.g. 'NIM (LTM)'")
+    parser.add_argument('--since', help="First quarter of the query, e.g. 1Q21")
+    args = parser.parse_args()
+
+    with PanelStore(args.store) as store:
+        for path in args.files:
+            print(f"{path}: {store.ingest(path, args.bank)}")
+        if args.query:
+            for bank, quarter, value, restated in store.query(args.query, since=args.since):
+                text = '-' if value is None else f"{value:,.2f}"
+                print(f"{bank:15} {quarter}  {text:>12}{'  (restated)' if restated else ''}")
@@ -0,0 +1,178 @@
+import csv
+import functools
+import hashlib
+import json
+import os
+import re
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from highlights_loader import is_section_header, parse_rows
+from tracing import span
+
+try:
+    from pypdf import PdfReader
+except ImportError:  # optional, only needed to read PDFs
+    PdfReader = None
+
+# --- Highlights tables from investor PDFs ---
+# Investor decks print the same tables as the highlights pages. Read with
+# pypdf's layout mode, each table row is one text line whose columns are
+# separated by runs of spaces:
+#   Balance sheet (VND Bn)   2Q24   3Q24  ...  6M25 vs 6M24   2Q25 vs 1Q25
+#   Total assets          908,307 927,053 ...  14.2%          4.9%
+# Pages are read in a worker pool and turned back into CSV rows, which go
+# through the same parser as aithucchien_*.csv. The rows found on a page are
+# cached under the hash of its content stream, so a re-run of a deck only
+# reads new or changed pages.
+# Layout of the cache directory:
+#   <sha256 of page content>.json   rows extracted from that page
+
+DEFAULT_CACHE_DIR = '.pdf_cache'
+EXTRACTOR_VERSION = 2  # part of the page hash: bump when extraction changes
+
+_CELL_GAP_RE = re.compile(r'\s{2,}')
+_NUMBER_RE = re.compile(r'^(?:[+-]?\(?\d[\d,]*(?:\.\d+)?\)?%?|[+-]?\d[\d,]* ?bps|n/?a|-)$', re.IGNORECASE)
+_PLACEHOLDER_RE = re.compile(r'^(?:n/?a|-)$', re.IGNORECASE)  # no value: written as an empty cell
+
+
+def split_cells(line):
+    """Cells of a layout-mode text line: columns are separated by runs of two or more spaces."""
+    return _CELL_GAP_RE.split(line.strip())
+
+
+def _split_tokens(line):
+    """Fallback for lines whose columns are single-space separated: numbers are taken from the right."""
+    merged = []
+    for token in line.split():
+        if token.lower() == 'bps' and merged:
+            merged[-1] += ' bps'  # "-95 bps" is printed as two tokens
+        else:
+            merged.append(token)
+    cells = []
+    while len(merged) > 1 and _NUMBER_RE.match(merged[-1]):
+        cells.append(merged.pop())
+    return [' '.join(merged)] + cells[::-1]
+
+
+def metric_row(line, width):
+    """'Total assets   908,307 ...   14.2%' -> ['Total assets', '908,307', ..., '14.2%'] or None."""
+    cells = split_cells(line)
+    if len(cells) - 1 != width:
+        cells = _split_tokens(line)
+        if len(cells) - 1 > width:
+            # labels can end in a number ("Tier 1"): extra leading cells belong to the label
+            extra = len(cells) - 1 - width
+            cells = [' '.join(cells[:extra + 1])] + cells[extra + 1:]
+    if len(cells) - 1 != width or not all(_NUMBER_RE.match(c) for c in cells[1:]):
+        return None
+    return [cells[0]] + ['' if _PLACEHOLDER_RE.match(c) else c for c in cells[1:]]
+
+
+def extract_rows(text):
+    """Highlights rows in the text of one page: section headers and the metric rows under them."""
+    rows = []
+    width = None
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        cells = split_cells(line)
+        if len(cells) > 3 and is_section_header(cells):
+            rows.append(cells)
+            width = len(cells) - 1
+        elif width is not None:
+            row = metric_row(line, width)
+            if row:
+                rows.append(row)
+    return rows
+
+
+def page_hashes(path):
+    """SHA-256 of each page's content stream (plus the extractor version)."""
+    reader = PdfReader(path)
+    hashes = []
+    for page in reader.pages:
+        h = hashlib.sha256(f"v{EXTRACTOR_VERSION}:".encode())
+        contents = page.get_contents()
+        if contents is not None:
+            h.update(contents.get_data())
+        hashes.append(h.hexdigest())
+    return hashes
+
+
+@functools.lru_cache(maxsize=4)
+def _open(path):
+    """One reader per PDF and worker process."""
+    return PdfReader(path)
+
+
+def _extract_page(path, index):
+    return index, extract_rows(_open(path).pages[index].extract_text(extraction_mode='layout') or '')
+
+
+def _cache_path(cache_dir, page_hash):
+    return os.path.join(cache_dir, page_hash + '.json')
+
+
+def extract_pdf_rows(path, cache_dir=DEFAULT_CACHE_DIR, workers=None):
+    """
+    Returns the highlights rows of a PDF in page order. Only pages whose
+    content hash is not cached are read, in a process pool.
+    """
+    if PdfReader is None:
+        raise ImportError("Reading PDFs needs pypdf: pip install pypdf")
+    with span('pdf.extract', path=path) as s:
+        hashes = page_hashes(path)
+        page_rows = {}
+        todo = []
+        for index, page_hash in enumerate(hashes):
+            try:
+                with open(_cache_path(cache_dir, page_hash), encoding='utf-8') as f:
+                    page_rows[index] = json.load(f)
+            except FileNotFoundError:
+                todo.append(index)
+        s.set(pages=len(hashes), read=len(todo))
+
+        if todo:
+            os.makedirs(cache_dir, exist_ok=True)
+            with ProcessPoolExecutor(max_workers=workers or min(len(todo), os.cpu_count() or 1)) as pool:
+                for index, rows in pool.map(_extract_page, [path] * len(todo), todo, chunksize=8):
+                    page_rows[index] = rows
+                    fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+                    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                        json.dump(rows, f)
+                    os.replace(tmp_path, _cache_path(cache_dir, hashes[index]))
+
+    return [row for index in range(len(hashes)) for row in page_rows[index]]
+
+
+def extract_highlights_pdf(path, cache_dir=DEFAULT_CACHE_DIR, workers=None):
+    """Parses the highlights tables of an investor PDF into a Highlights object."""
+    return parse_rows(extract_pdf_rows(path, cache_dir, workers))
+
+
+def save_rows(rows, path):
+    """Writes rows in the sectioned CSV layout of aithucchien_*.csv."""
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        csv.writer(f).writerows(rows)
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Extract highlights tables from investor PDFs.")
+    parser.add_argument('pdf')
+    parser.add_argument('--output', help="CSV to write (default: <pdf name>.csv)")
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR)
+    parser.add_argument('--workers', type=int, help="Worker processes (default: CPU count)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    rows = extract_pdf_rows(args.pdf, args.cache_dir, args.workers)
+    print(f"{args.pdf}: {len(rows)} rows in {time.perf_counter() - start:.2f}s")
+    output = args.output or os.path.splitext(args.pdf)[0] + '.csv'
+    save_rows(rows, output)
+    highlights = parse_rows(rows)
+    print(f"{output}: {len(highlights.metrics)} metrics in {len(highlights.sections)} sections, "
+          f"periods {', '.join(highlights.columns)}")
@@ -0,0 +1,333 @@
+import csv
+import hashlib
+import json
+import os
+import tempfile
+import time
+from collections import defaultdict, deque, namedtuple
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+import generate_report as gr
+import report_visualization as rv
+from crawl_cache import DEFAULT_CACHE_DIR, DEFAULT_TTL, ResponseCache
+from crawler import extract_main_table, fetch_cached, save_table
+from report_assets import file_sha256
+from report_metrics import ReportMetrics
+import tracing
+from tracing import span
+
+# --- Incremental report pipeline ---
+# crawl -> parse -> metrics -> charts -> PDF for many banks, run as one
+# dependency graph. Every node lists the files it reads and writes; its
+# fingerprint hashes the node's arguments, the source of the modules it runs,
+# its input files and the output hashes of the nodes it depends on. A node
+# whose fingerprint matches the last run (and whose outputs still exist) is
+# skipped, so a rerun only redoes what changed:
+# - crawl nodes always run, but through the HTTP cache; an unchanged page
+#   gives the same raw.html hash and nothing downstream runs;
+# - the metrics node writes the data of each chart to its own file, so a
+#   changed number re-renders only the charts that plot it, plus the PDF.
+# Nodes run as soon as their dependencies are done: downloads in a thread
+# pool, everything else in a process pool, so one bank's charts render while
+# the next bank is still being crawled.
+#
+# Layout of the work directory:
+#   state.json                      fingerprint and output hashes per node
+#   <bank>_<period>/raw.html        downloaded highlights page
+#   <bank>_<period>/highlights.csv  parsed table (or the job's own CSV)
+#   <bank>_<period>/data/page<N>.json   page_data() keys of chart N
+#   <bank>_<period>/charts/page<N>.png  rendered chart N
+#   <bank>_<period>/charts/pbt_chart.png  page 4's profit chart of the PDF
+
+DEFAULT_WORK_DIR = '.pipeline'
+
+Job = namedtuple('Job', ['bank', 'period', 'url', 'source'], defaults=[None, None, None])
+# A job starts from `url` (crawled) or from a highlights CSV `source`.
+
+Node = namedtuple('Node', ['name', 'func', 'args', 'deps', 'inputs', 'outputs', 'code', 'kind', 'volatile'],
+                  defaults=[(), (), (), (), 'cpu', False])
+# kind 'io' runs in the thread pool, 'cpu' in the process pool. A volatile
+# node runs every time; its dependents still skip if its outputs are unchanged.
+
+# Modules whose source is part of each stage's fingerprint
+STAGE_CODE = {
+    'crawl': ('crawler.py', 'crawl_cache.py'),
+    'parse': ('crawler.py', 'highlights_loader.py'),
+    'metrics': ('report_metrics.py', 'highlights_loader.py', 'report_visualization.py'),
+    'chart': ('report_visualization.py', 'fast_charts.py'),
+    'pdf': ('generate_report.py', 'report_metrics.py', 'highlights_loader.py', 'report_fonts.py',
+            'report_assets.py', 'report_appendix.py'),
+}
+# Images the PDF embeds from the assets directory (the rest come from charts/)
+REPORT_ASSETS = ('logo.png',)
+# Charts embedded in the PDF; pages 4 and 6 are rendered for the deck only
+REPORT_CHARTS = (5, 7, 8)
+
+_CODE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+# --- Stage functions (run in the worker pools) ---
+def _write_atomic(path, data):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.', suffix='.tmp')
+    with os.fdopen(fd, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def crawl_stage(url, output, cache_dir=DEFAULT_CACHE_DIR, ttl=DEFAULT_TTL):
+    """Downloads a highlights page through the HTTP cache to `output`."""
+    body = fetch_cached(url, ResponseCache(cache_dir, ttl)).body
+    _write_atomic(output, body)
+
+
+def parse_stage(page, output, selector=None):
+    """Extracts the highlights table of a downloaded page to CSV."""
+    with open(page, 'rb') as f:
+        rows = extract_main_table(f.read(), selector)
+    if rows is None:
+        raise ValueError(f"No tables found in {page}")
+    save_table(rows, output)
+
+
+def metrics_stage(source, bank, data_dir):
+    """Writes the page_data() keys of every chart page to <data_dir>/page<N>.json."""
+    data = rv.page_data(ReportMetrics.from_csv(source, bank))
+    for page, keys in rv.PAGE_INPUTS.items():
+        text = json.dumps({key: data[key] for key in keys}, ensure_ascii=False, sort_keys=True)
+        _write_atomic(os.path.join(data_dir, f"page{page}.json"), text.encode('utf-8'))
+
+
+def chart_stage(page, data_path, output, dpi=150):
+    """Renders one chart page from its data file."""
+    with open(data_path, encoding='utf-8') as f:
+        fig = rv.PAGES[page](json.load(f))
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    fig.savefig(output, dpi=dpi, facecolor=fig.get_facecolor())
+    rv.plt.close(fig)
+
+
+def pbt_chart_stage(data_path, output, dpi=150):
+    """Renders page 4's profit before tax chart of the PDF (fast_charts 'pbt') from page 4's data file."""
+    import fast_charts
+
+    with open(data_path, encoding='utf-8') as f:
+        fig = fast_charts.CHARTS['pbt'](json.load(f))
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    fast_charts.render(fig, output, dpi)
+
+
+def pdf_stage(spec, output):
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    gr.build_report(spec, output)
+
+
+def _run_node(name, func, args):
+    start = time.perf_counter()
+    with span(name):
+        func(*args)
+    return time.perf_counter() - start
+
+
+# --- Graph ---
+def job_key(job):
+    period = job.period or os.path.splitext(os.path.basename(job.source))[0]
+    return f"{job.bank}_{period}"
+
+
+def build_graph(jobs, work_dir=DEFAULT_WORK_DIR, output_dir='reports', assets_dir='.', dpi=150,
+                image_dpi=gr.DEFAULT_DPI, cache_dir=DEFAULT_CACHE_DIR, ttl=DEFAULT_TTL, selector=None):
+    """The nodes of every job, in job order."""
+    nodes = []
+    for job in jobs:
+        key = job_key(job)
+        job_dir = os.path.join(work_dir, key)
+        if job.url:
+            raw = os.path.join(job_dir, 'raw.html')
+            source = os.path.join(job_dir, 'highlights.csv')
+            nodes.append(Node(f"crawl:{key}", crawl_stage, (job.url, raw, cache_dir, ttl),
+                              outputs=(raw,), code=STAGE_CODE['crawl'], kind='io', volatile=True))
+            nodes.append(Node(f"parse:{key}", parse_stage, (raw, source, selector), deps=(f"crawl:{key}",),
+                              outputs=(source,), code=STAGE_CODE['parse']))
+            source_deps, source_inputs = (f"parse:{key}",), ()
+        else:
+            source = job.source
+            source_deps, source_inputs = (), (source,)
+
+        data_dir = os.path.join(job_dir, 'data')
+        nodes.append(Node(f"metrics:{key}", metrics_stage, (source, job.bank, data_dir),
+                          deps=source_deps, inputs=source_inputs,
+                          outputs=tuple(os.path.join(data_dir, f"page{p}.json") for p in rv.PAGE_INPUTS),
+                          code=STAGE_CODE['metrics']))
+
+        charts_dir = os.path.join(job_dir, 'charts')
+        for page in rv.PAGE_INPUTS:
+            # Depends on its own data file only, not on the whole metrics node
+            data_path = os.path.join(data_dir, f"page{page}.json")
+            nodes.append(Node(f"chart{page}:{key}", chart_stage,
+                              (page, data_path, os.path.join(charts_dir, f"page{page}.png"), dpi),
+                              deps=(f"metrics:{key}",), inputs=(data_path,),
+                              outputs=(os.path.join(charts_dir, f"page{page}.png"),), code=STAGE_CODE['chart']))
+        pbt_data = os.path.join(data_dir, 'page4.json')
+        pbt_chart = os.path.join(charts_dir, 'pbt_chart.png')
+        nodes.append(Node(f"pbt_chart:{key}", pbt_chart_stage, (pbt_data, pbt_chart, dpi),
+                          deps=(f"metrics:{key}",), inputs=(pbt_data,), outputs=(pbt_chart,),
+                          code=STAGE_CODE['chart']))
+
+        spec = gr.ReportSpec(job.bank, source, assets_dir, image_dpi, charts_dir=charts_dir)
+        output = os.path.join(output_dir, f"{key}.pdf")
+        nodes.append(Node(f"pdf:{key}", pdf_stage, (spec, output),
+                          deps=source_deps + tuple(f"chart{p}:{key}" for p in REPORT_CHARTS) + (f"pbt_chart:{key}",),
+                          inputs=source_inputs + tuple(os.path.join(assets_dir, a) for a in REPORT_ASSETS),
+                          outputs=(output,), code=STAGE_CODE['pdf']))
+    return nodes
+
+
+# --- Fingerprints ---
+_code_hashes = {}
+
+
+def _code_hash(module_file):
+    if module_file not in _code_hashes:
+        _code_hashes[module_file] = file_sha256(os.path.join(_CODE_DIR, module_file))
+    return _code_hashes[module_file]
+
+
+def _input_hash(path):
+    return file_sha256(path) if os.path.exists(path) else None
+
+
+def fingerprint(node, output_hashes):
+    """Hash of everything a node's outputs depend on."""
+    parts = {
+        'func': f"{node.func.__module__}.{node.func.__qualname__}",
+        'args': repr(node.args),
+        'code': {m: _code_hash(m) for m in node.code},
+        'inputs': {p: _input_hash(p) for p in node.inputs},
+        # a node that lists some outputs of a dependency as inputs only depends on those
+        'deps': {d: output_hashes[d] for d in node.deps if not set(output_hashes[d]) & set(node.inputs)},
+    }
+    return hashlib.sha256(json.dumps(parts, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def _load_state(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def _save_state(path, state):
+    _write_atomic(path, json.dumps(state, indent=1, sort_keys=True).encode('utf-8'))
+
+
+# --- Scheduler ---
+def run_graph(nodes, state_path, workers=None, io_workers=8, force=False):
+    """
+    Runs the nodes in dependency order, independent nodes concurrently.
+    Returns {node name: 'ran' | 'cached' | 'failed' | 'blocked'}; nodes that
+    depend on a failed node are 'blocked'.
+    """
+    by_name = {node.name: node for node in nodes}
+    waiting = {node.name: set(node.deps) for node in nodes}
+    dependents = defaultdict(list)
+    for node in nodes:
+        for dep in node.deps:
+            if dep not in by_name:
+                raise ValueError(f"{node.name} depends on unknown node {dep}")
+            dependents[dep].append(node.name)
+
+    state = _load_state(state_path)
+    status, output_hashes, running = {}, {}, {}
+    ready = deque(name for name, deps in waiting.items() if not deps)
+
+    def finish(name, result):
+        status[name] = result
+        for child in dependents[name]:
+            waiting[child].discard(name)
+            if not waiting[child]:
+                ready.append(child)
+
+    rv._use_agg()  # before the process pool forks
+    start = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(io_workers) as threads, ProcessPoolExecutor(workers or os.cpu_count()) as procs:
+            while ready or running:
+                while ready:
+                    node = by_name[ready.popleft()]
+                    if any(status[dep] in ('failed', 'blocked') for dep in node.deps):
+                        finish(node.name, 'blocked')
+                        continue
+                    fp = fingerprint(node, output_hashes)
+                    previous = state.get(node.name)
+                    if (not force and not node.volatile and previous and previous['fingerprint'] == fp
+                            and all(os.path.exists(path) for path in node.outputs)):
+                        output_hashes[node.name] = previous['outputs']
+                        finish(node.name, 'cached')
+                        continue
+                    pool = threads if node.kind == 'io' else procs
+                    running[pool.submit(_run_node, node.name, node.func, node.args)] = (node, fp)
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    node, fp = running.pop(future)
+                    try:
+                        seconds = future.result()
+                    except Exception as e:
+                        print(f"{node.name} failed: {e}")
+                        state.pop(node.name, None)
+                        finish(node.name, 'failed')
+                        continue
+                    output_hashes[node.name] = {path: file_sha256(path) for path in node.outputs}
+                    state[node.name] = {'fingerprint': fp, 'outputs': output_hashes[node.name]}
+                    print(f"{node.name} done in {seconds:.2f}s")
+                    finish(node.name, 'ran')
+    finally:
+        _save_state(state_path, state)
+
+    unfinished = set(by_name) - set(status)
+    if unfinished:
+        raise ValueError(f"Dependency cycle among {sorted(unfinished)}")
+    counts = {s: sum(1 for v in status.values() if v == s) for s in ('ran', 'cached', 'failed', 'blocked')}
+    print(f"Pipeline: {len(nodes)} nodes, " + ', '.join(f"{n} {s}" for s, n in counts.items())
+          + f" in {time.perf_counter() - start:.2f}s")
+    return status
+
+
+def run_pipeline(jobs, work_dir=DEFAULT_WORK_DIR, output_dir='reports', workers=None, force=False, **options):
+    """Builds the graph of `jobs` and runs it with the state kept in <work_dir>/state.json."""
+    nodes = build_graph(jobs, work_dir, output_dir, **options)
+    return run_graph(nodes, os.path.join(work_dir, 'state.json'), workers, force=force)
+
+
+def read_jobs(path):
+    """Reads jobs from a CSV with bank, period and url or source columns."""
+    with open(path, newline='', encoding='utf-8') as f:
+        return [Job(**{k: v for k, v in row.items() if v}) for row in csv.DictReader(f)]
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Incremental crawl -> parse -> metrics -> charts -> PDF pipeline.")
+    parser.add_argument('jobs', nargs='?', help="CSV with bank, period and url or source columns "
+                                                "(default: the default bank and snapshot)")
+    parser.add_argument('--work-dir', default=DEFAULT_WORK_DIR)
+    parser.add_argument('--output-dir', default='reports')
+    parser.add_argument('--assets-dir', default='.')
+    parser.add_argument('--workers', type=int, help="Worker processes (default: CPU count)")
+    parser.add_argument('--dpi', type=int, default=150, help="Chart render resolution")
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR, help="HTTP cache for crawl nodes")
+    parser.add_argument('--ttl', type=float, default=DEFAULT_TTL, help="Seconds before a cached page is revalidated")
+    parser.add_argument('--selector', help="XPath of the highlights table on crawled pages")
+    parser.add_argument('--force', action='store_true', help="Run every node regardless of fingerprints")
+    parser.add_argument('--trace', help="Write a Chrome trace of the run (all workers) to this file")
+    args = parser.parse_args()
+    if args.trace:
+        tracing.enable(args.trace)
+
+    jobs = read_jobs(args.jobs) if args.jobs else [Job(gr.DEFAULT_BANK, source=gr.DEFAULT_SOURCE)]
+    run_pipeline(jobs, args.work_dir, args.output_dir, args.workers, args.force, assets_dir=args.assets_dir,
+                 dpi=args.dpi, cache_dir=args.cache_dir, ttl=args.ttl, selector=args.selector)
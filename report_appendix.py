@@ -0,0 +1,158 @@
+import functools
+import os
+import time
+
+import numpy as np
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.platypus import PageBreak, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+from columnar_store import _fill_decimals
+from highlights_loader import Highlights, format_rows, split_sections
+
+# --- Data appendix ---
+# The highlights tables as printed in the CSVs: the report's own snapshot
+# (build_appendix in generate_report) or the whole quarterly history of many
+# banks from a columnar store. Long tables are cut into chunks of CHUNK_ROWS
+# metric rows, each its own Table starting with the period header and the
+# section band, and both rows repeat when a chunk splits across pages.
+# ReportLab re-measures every remaining row of a Table each time it splits
+# it, so one big Table lays out in O(rows^2 / rows per page); fixed-height
+# chunks with plain string cells keep it linear (benchmarks.py appendix).
+
+CHUNK_ROWS = 40
+QUARTERS_PER_TABLE = 10
+LABEL_WIDTH = 105
+ROW_HEIGHT = 11
+HEADER_HEIGHT = 18
+FONT_SIZE = 6.5
+CONTENT_WIDTH = A4[0] - 120  # the report margins
+
+HEADER_COLOR = colors.HexColor('#BE1E2D')
+BAND_COLOR = colors.HexColor('#D9E4F0')
+STRIPE_COLOR = colors.HexColor('#F4F4F4')
+
+
+@functools.lru_cache(maxsize=None)
+def _table_style(font_name):
+    """Style of a chunk: the period header row, the section band, then the metric rows."""
+    return TableStyle([
+        ('FONT', (0, 0), (-1, -1), font_name, FONT_SIZE),
+        ('LEADING', (0, 0), (-1, 0), FONT_SIZE + 1),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('ALIGN', (1, 0), (-1, -1), 'RIGHT'),
+        ('BACKGROUND', (0, 0), (-1, 0), HEADER_COLOR),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+        ('SPAN', (0, 1), (-1, 1)),
+        ('BACKGROUND', (0, 1), (-1, 1), BAND_COLOR),
+        ('ALIGN', (0, 1), (-1, 1), 'LEFT'),
+        ('ROWBACKGROUNDS', (0, 2), (-1, -1), [colors.white, STRIPE_COLOR]),
+        ('LINEBELOW', (0, -1), (-1, -1), 0.5, colors.lightgrey),
+        ('TOPPADDING', (0, 0), (-1, -1), 1),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 1),
+    ])
+
+
+def data_tables(columns, sections, font_name, chunk_rows=CHUNK_ROWS):
+    """
+    Splittable tables for [(section name, metric rows)], the rows being
+    [label, cell, ...] strings under the period `columns`. Returns a list of
+    Table flowables of at most `chunk_rows` metric rows each.
+    """
+    header = [''] + [c.replace(' vs', '\nvs') for c in columns]
+    value_width = (CONTENT_WIDTH - LABEL_WIDTH) / len(columns)
+    col_widths = [LABEL_WIDTH] + [value_width] * len(columns)
+    tables = []
+    for name, rows in sections:
+        for start in range(0, len(rows), chunk_rows):
+            chunk = rows[start:start + chunk_rows]
+            band = name if start == 0 else f"{name} (tiếp)"
+            data = [header, [band] + [''] * len(columns)] + chunk
+            heights = [HEADER_HEIGHT] + [ROW_HEIGHT] * (len(chunk) + 1)
+            tables.append(Table(data, colWidths=col_widths, rowHeights=heights, repeatRows=2,
+                                style=_table_style(font_name)))
+    return tables
+
+
+def highlights_sections(highlights, decimals=None):
+    """(columns, [(section name, metric rows)]) of a Highlights table, formatted as in the CSVs."""
+    columns, sections = split_sections(format_rows(highlights, decimals, junk_header=False))
+    return columns, [(name, rows) for name, _, rows in sections]
+
+
+def history_blocks(store, bank):
+    """
+    The quarterly history of one bank in a ColumnarStore as Highlights
+    tables of QUARTERS_PER_TABLE quarters each, oldest first, with the
+    printed decimals of each cell. Yields (Highlights, decimals).
+    """
+    b = store.bank_code(bank)
+    order = np.argsort(store.section_of, kind='stable')
+    values = np.array(store.values[b])[order]
+    decimals = _fill_decimals(np.array(store.decimals[b, :, :, 0])[order])
+    quarters = store.quarters
+    for lo in range(0, len(quarters), QUARTERS_PER_TABLE):
+        block = values[:, lo:lo + QUARTERS_PER_TABLE]
+        keep = ~np.isnan(block).all(axis=1)  # metrics the bank did not report in these quarters
+        rows = order[keep]
+        if not len(rows):
+            continue
+        h = Highlights(quarters[lo:lo + QUARTERS_PER_TABLE], store.sections, store.section_of[rows],
+                       [store.labels[i] for i in rows], block[keep], store.units[rows],
+                       np.empty((len(rows), 0), dtype=store.change_units.dtype))
+        yield h, decimals[keep, lo:lo + QUARTERS_PER_TABLE]
+
+
+def history_story(store, banks, styles, font_name):
+    """Appendix flowables with the full history of each bank, one bank per page."""
+    story = []
+    for i, bank in enumerate(banks):
+        if i:
+            story.append(PageBreak())
+        story.append(Paragraph(f"Phụ lục: Số liệu chi tiết – {bank}", styles['Heading1']))
+        for h, decimals in history_blocks(store, bank):
+            story.append(Paragraph(f"{h.columns[0]} – {h.columns[-1]}", styles['Heading2']))
+            story += data_tables(*highlights_sections(h, decimals), font_name)
+            story.append(Spacer(1, 12))
+    return story
+
+
+def build_history_appendix(store, output, banks=None):
+    """Lays out the history appendix of `banks` (default: all in the store) to a PDF. Returns the page count."""
+    import generate_report as gr
+
+    font_name = gr.register_font()
+    styles = gr.get_styles(font_name)
+    banks = banks or store.banks
+    story = history_story(store, banks, styles, font_name)
+    doc = SimpleDocTemplate(output, pagesize=A4,
+                            rightMargin=60, leftMargin=60,
+                            topMargin=80, bottomMargin=60)
+    tables = sum(isinstance(flowable, Table) for flowable in story)
+    start = time.perf_counter()
+    doc.build(story)
+    print(f"Built {output}: {len(banks)} banks, {tables} tables, {doc.page} pages "
+          f"in {time.perf_counter() - start:.2f}s")
+    return doc.page
+
+
+if __name__ == '__main__':
+    import argparse
+    import tempfile
+
+    from columnar_store import ColumnarStore, import_csvs, scan_data_dir
+
+    parser = argparse.ArgumentParser(description="Data appendix with the quarterly history of many banks.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--store', help="Columnar history store (columnar_store.py)")
+    source.add_argument('--data-dir', help="<data_dir>/<bank>/<period>.csv tree")
+    parser.add_argument('--banks', nargs='+', help="Banks to include (default: all)")
+    parser.add_argument('--output', default='appendix.pdf')
+    args = parser.parse_args()
+
+    if args.store:
+        build_history_appendix(ColumnarStore(args.store), args.output, args.banks)
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            store = import_csvs(scan_data_dir(args.data_dir), os.path.join(tmp, 'store'))
+            build_history_appendix(store, args.output, args.banks)
@@ -0,0 +1,90 @@
+import hashlib
+import io
+import os
+import tempfile
+
+from PIL import Image as PILImage
+
+# --- Image asset pipeline ---
+# Images are embedded at the size they are placed on the page, not at their
+# source resolution. Each (source content, placed size, dpi) is processed once
+# and cached on disk under a content hash, so identical sources (even under
+# different file names) become one file and one image object in the PDF.
+# Layout of the cache directory:
+#   ab/<sha256 of source hash, size, dpi>.jpg|png
+
+DEFAULT_CACHE_DIR = '.asset_cache'
+DEFAULT_DPI = 150
+JPEG_QUALITY = 85
+POINTS_PER_INCH = 72
+
+
+def file_sha256(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _is_opaque(img):
+    return 'A' not in img.getbands() or img.getchannel('A').getextrema()[0] == 255
+
+
+class ImageAssets:
+    """Resizes and re-encodes report images for their placed size, with an on-disk cache."""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, dpi=DEFAULT_DPI, quality=JPEG_QUALITY):
+        self.cache_dir = cache_dir
+        self.dpi = dpi
+        self.quality = quality
+        self._hashes = {}  # (path, mtime, size) -> sha256, so unchanged sources are hashed once
+
+    def source_hash(self, path):
+        st = os.stat(path)
+        key = (os.path.abspath(path), st.st_mtime_ns, st.st_size)
+        if key not in self._hashes:
+            self._hashes[key] = file_sha256(path)
+        return self._hashes[key]
+
+    def _cache_key(self, source_hash, width, height):
+        return hashlib.sha256(f"{source_hash}:{width}x{height}@{self.dpi}:q{self.quality}".encode()).hexdigest()
+
+    def _cached(self, key):
+        for ext in ('.jpg', '.png'):
+            path = os.path.join(self.cache_dir, key[:2], key + ext)
+            if os.path.exists(path):
+                return path
+        return None
+
+    def prepare(self, path, width, height):
+        """
+        Returns the path of `path` processed for a width x height (points) box:
+        downsampled to the target dpi (never upsampled), opaque images as JPEG,
+        images with transparency as optimised PNG.
+        """
+        key = self._cache_key(self.source_hash(path), width, height)
+        cached = self._cached(key)
+        if cached:
+            return cached
+
+        with PILImage.open(path) as img:
+            img.load()
+            size = (round(width / POINTS_PER_INCH * self.dpi), round(height / POINTS_PER_INCH * self.dpi))
+            if size[0] < img.width or size[1] < img.height:
+                img = img.resize((min(size[0], img.width), min(size[1], img.height)), PILImage.LANCZOS)
+            buf = io.BytesIO()
+            if _is_opaque(img):
+                img.convert('RGB').save(buf, format='JPEG', quality=self.quality, optimize=True)
+                ext = '.jpg'
+            else:
+                img.save(buf, format='PNG', optimize=True)
+                ext = '.png'
+
+        output = os.path.join(self.cache_dir, key[:2], key + ext)
+        os.makedirs(os.path.dirname(output), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(output), suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(buf.getvalue())
+        os.replace(tmp_path, output)
+        return output
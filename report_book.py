@@ -0,0 +1,273 @@
+import hashlib
+import io
+import itertools
+import os
+import re
+import shutil
+import tempfile
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from reportlab.lib.pagesizes import A4
+from reportlab.platypus import SimpleDocTemplate
+from reportlab.pdfgen import canvas as pdf_canvas
+
+import generate_report as gr
+import tracing
+from tracing import span
+
+try:
+    from pypdf import PdfReader
+    from pypdf.generic import (ArrayObject, DictionaryObject, EncodedStreamObject, IndirectObject, NameObject,
+                               NumberObject, StreamObject, create_string_object)
+except ImportError:  # optional, only needed to merge the shards
+    PdfReader = None
+
+# --- Sharded report books ---
+# A book is one report section (cover, financial summary, trends, ...) per
+# bank, for many banks. Every section is laid out as its own small PDF (a
+# shard) in a worker process, so no process ever holds more than one section
+# of flowables. The shards are then merged in book order, one at a time:
+# the "Trang N" footer is stamped with the page number in the book and each
+# bank and section gets an outline entry.
+# The merge streams: each shard's pages are written to the book file as soon
+# as the shard is merged and then dropped, so the merging process only keeps
+# the cross-reference offsets, the page list and the outline (a few numbers
+# per object), not the pages themselves.
+
+Shard = namedtuple('Shard', ['index', 'spec', 'section'])
+ShardResult = namedtuple('ShardResult', ['shard', 'path', 'pages', 'title', 'seconds'])
+
+_HEADING_NUMBER_RE = re.compile(r'^Trang \d+:\s*')
+
+
+def section_names(builders=None):
+    return [b.__name__ for b in builders or gr.PAGE_BUILDERS]
+
+
+def _section_title(ctx):
+    """Outline title of a section: its first Heading1 without the "Trang N:" prefix."""
+    for flowable in ctx.story:
+        if getattr(getattr(flowable, 'style', None), 'name', None) == 'Heading1':
+            return _HEADING_NUMBER_RE.sub('', flowable.getPlainText())
+    return 'Trang bìa'
+
+
+def build_shard(shard, shard_dir):
+    """Lays out one section of one bank to <shard_dir>/<index>.pdf without page numbers."""
+    start = time.perf_counter()
+    ctx = gr.ReportContext(shard.spec)
+    with span(shard.section, bank=shard.spec.bank):
+        getattr(gr, shard.section)(ctx)
+    title = _section_title(ctx)
+    path = os.path.join(shard_dir, f"{shard.index:06d}.pdf")
+    doc = SimpleDocTemplate(path, pagesize=A4,
+                            rightMargin=60, leftMargin=60,
+                            topMargin=80, bottomMargin=60)
+    header_footer = gr.make_header_footer(ctx, page_numbers=False)
+    with span('doc.build', bank=shard.spec.bank, section=shard.section) as s:
+        doc.build(ctx.story, onFirstPage=header_footer, onLaterPages=header_footer)
+        s.set(pages=doc.page, bytes_out=os.path.getsize(path))
+    return ShardResult(shard, path, doc.page, title, time.perf_counter() - start)
+
+
+def _page_number_overlay(first, count, font_name):
+    """A PDF with only the "Trang N" labels of `count` pages starting at `first`."""
+    buf = io.BytesIO()
+    c = pdf_canvas.Canvas(buf, pagesize=A4)
+    for number in range(first, first + count):
+        gr.draw_page_number(c, font_name, number)
+        c.showPage()
+    c.save()
+    buf.seek(0)
+    return PdfReader(buf)
+
+
+class StreamingPdfWriter:
+    """
+    Writes a PDF page by page to an open binary file. The objects of each
+    added page are renumbered and written at once; objects with identical
+    bytes (the logo, shared fonts) are written only once.
+    """
+
+    _PAGES = 1
+    _CATALOG = 2
+
+    def __init__(self, f):
+        self.f = f
+        self.offsets = [None, None, None]  # by object number; 0 is the free-list head
+        self.pages = []
+        self.outline = []  # [[title, page number, parent index or None]]
+        self._written = {}  # sha256 of an object's bytes -> object number
+        f.write(b'%PDF-1.7\n%\xe2\xe3\xcf\xd3\n')
+
+    def _reserve(self):
+        self.offsets.append(None)
+        return len(self.offsets) - 1
+
+    def _write(self, number, obj):
+        buf = io.BytesIO()
+        obj.write_to_stream(buf)
+        self.offsets[number] = self.f.tell()
+        self.f.write(b'%d 0 obj\n%s\nendobj\n' % (number, buf.getvalue()))
+
+    def _copy(self, obj, memo):
+        """`obj` with every reference renumbered, writing the referenced objects first."""
+        if isinstance(obj, IndirectObject):
+            if obj.idnum not in memo:
+                memo[obj.idnum] = self._add(obj.get_object(), memo)
+            return IndirectObject(memo[obj.idnum], 0, None)
+        if isinstance(obj, StreamObject):
+            if not isinstance(obj, EncodedStreamObject):
+                obj = obj.flate_encode()  # e.g. a content stream rewritten by merge_page()
+            copy = StreamObject()
+            copy._data = obj._data
+            for key, value in obj.items():
+                if key != '/Length':
+                    copy[key] = self._copy(value, memo)
+            return copy
+        if isinstance(obj, DictionaryObject):
+            # /Parent and /P point back up the page tree; pages get their new parent in add_page()
+            return DictionaryObject({key: self._copy(value, memo) for key, value in obj.items()
+                                     if key not in ('/Parent', '/P')})
+        if isinstance(obj, ArrayObject):
+            return ArrayObject(self._copy(value, memo) for value in obj)
+        return obj
+
+    def _add(self, obj, memo):
+        copy = self._copy(obj, memo)
+        buf = io.BytesIO()
+        copy.write_to_stream(buf)
+        digest = hashlib.sha256(buf.getvalue()).digest()
+        if digest not in self._written:
+            self._written[digest] = number = self._reserve()
+            self._write(number, copy)
+        return self._written[digest]
+
+    def add_pages(self, pages):
+        """Writes the pages of one source PDF. Returns the index of its first page."""
+        first = len(self.pages)
+        memo = {}  # object numbers of the source PDF -> book
+        for page in pages:
+            copy = self._copy(page, memo)
+            copy[NameObject('/Parent')] = IndirectObject(self._PAGES, 0, None)
+            number = self._reserve()
+            self._write(number, copy)
+            self.pages.append(number)
+        return first
+
+    def add_outline_item(self, title, page_index, parent=None):
+        """Adds an outline entry for a page; returns its index, to be used as a parent."""
+        self.outline.append([title, page_index, parent])
+        return len(self.outline) - 1
+
+    def close(self):
+        """Writes the page tree, the outline, the catalog and the cross-reference table."""
+        def ref(number):
+            return IndirectObject(number, 0, None)
+
+        self._write(self._PAGES, DictionaryObject({
+            NameObject('/Type'): NameObject('/Pages'),
+            NameObject('/Kids'): ArrayObject(ref(n) for n in self.pages),
+            NameObject('/Count'): NumberObject(len(self.pages)),
+        }))
+        root = self._reserve()
+        numbers = [self._reserve() for _ in self.outline]
+        children = {None: []}
+        for i, (_, _, parent) in enumerate(self.outline):
+            children.setdefault(parent, []).append(i)
+        for parent, kids in children.items():
+            for k, i in enumerate(kids):
+                title, page_index, _ = self.outline[i]
+                item = DictionaryObject({
+                    NameObject('/Title'): create_string_object(title),
+                    NameObject('/Parent'): ref(root if parent is None else numbers[parent]),
+                    NameObject('/Dest'): ArrayObject([ref(self.pages[page_index]), NameObject('/Fit')]),
+                })
+                if k:
+                    item[NameObject('/Prev')] = ref(numbers[kids[k - 1]])
+                if k + 1 < len(kids):
+                    item[NameObject('/Next')] = ref(numbers[kids[k + 1]])
+                if children.get(i):
+                    item[NameObject('/First')] = ref(numbers[children[i][0]])
+                    item[NameObject('/Last')] = ref(numbers[children[i][-1]])
+                    item[NameObject('/Count')] = NumberObject(-len(children[i]))  # closed
+                self._write(numbers[i], item)
+        top = children[None]
+        outlines = DictionaryObject({NameObject('/Type'): NameObject('/Outlines'),
+                                     NameObject('/Count'): NumberObject(len(top))})
+        if top:
+            outlines[NameObject('/First')] = ref(numbers[top[0]])
+            outlines[NameObject('/Last')] = ref(numbers[top[-1]])
+        self._write(root, outlines)
+        self._write(self._CATALOG, DictionaryObject({
+            NameObject('/Type'): NameObject('/Catalog'),
+            NameObject('/Pages'): ref(self._PAGES),
+            NameObject('/Outlines'): ref(root),
+            NameObject('/PageMode'): NameObject('/UseOutlines'),
+        }))
+        xref = self.f.tell()
+        self.f.write(b'xref\n0 %d\n0000000000 65535 f \n' % len(self.offsets))
+        for offset in self.offsets[1:]:
+            self.f.write(b'%010d 00000 n \n' % offset)
+        self.f.write(b'trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n'
+                     % (len(self.offsets), self._CATALOG, xref))
+
+
+def build_book(specs, output, sections=None, workers=None):
+    """
+    Builds one PDF with the given sections (default: every report page
+    builder) for each spec, laid out in parallel and merged in order.
+    Returns the number of pages.
+    """
+    if PdfReader is None:
+        raise ImportError("Merging a sharded book needs pypdf: pip install pypdf")
+    sections = sections or section_names()
+    shards = [Shard(i, spec, section) for i, (spec, section) in enumerate(itertools.product(specs, sections))]
+    shard_dir = tempfile.mkdtemp(prefix='report_book_')
+    font_name = gr.register_font()
+    page_count = 0
+    bank_item = None
+    start = time.perf_counter()
+    try:
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool, open(output, 'wb') as f:
+            writer = StreamingPdfWriter(f)
+            # map() yields in book order, so shard k is merged while later ones are still laid out
+            for result in pool.map(build_shard, shards, [shard_dir] * len(shards)):
+                reader = PdfReader(result.path)
+                overlay = _page_number_overlay(page_count + 1, len(reader.pages), font_name)
+                pages = []
+                for page, numbers in zip(reader.pages, overlay.pages):
+                    page.merge_page(numbers)
+                    pages.append(page)
+                writer.add_pages(pages)
+                if result.shard.section == sections[0]:
+                    bank_item = writer.add_outline_item(result.shard.spec.bank, page_count)
+                writer.add_outline_item(result.title, page_count, parent=bank_item)
+                page_count += len(reader.pages)
+                os.remove(result.path)
+            with span('book.write', pages=page_count) as s:
+                writer.close()
+                s.set(bytes_out=f.tell())
+    finally:
+        shutil.rmtree(shard_dir, ignore_errors=True)
+    print(f"Built {output}: {len(specs)} banks, {len(shards)} sections, {page_count} pages "
+          f"in {time.perf_counter() - start:.2f}s")
+    return page_count
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Combined report book for many banks, built in shards.")
+    parser.add_argument('specs', help="CSV of report specs (bank,source[,assets_dir,image_dpi,live_charts])")
+    parser.add_argument('--output', default='report_book.pdf')
+    parser.add_argument('--sections', nargs='+', choices=section_names(), help="Sections per bank (default: all)")
+    parser.add_argument('--workers', type=int, help="Worker processes (default: CPU count)")
+    parser.add_argument('--trace', help="Write a Chrome trace of the build (all workers) to this file")
+    args = parser.parse_args()
+    if args.trace:
+        tracing.enable(args.trace)
+
+    build_book(gr.read_specs(args.specs), args.output, args.sections, args.workers)
@@ -0,0 +1,226 @@
+import argparse
+import os
+import re
+import sys
+
+from crawl_cache import DEFAULT_CACHE_DIR, DEFAULT_TTL
+
+# --- Report command line ---
+# One entry point for the crawl, parse, render and build steps:
+#   python report_cli.py crawl [URL] [--targets targets.csv]
+#   python report_cli.py parse page.html|table.pdf|table.csv [--output out.csv]
+#   python report_cli.py periods [table.csv ...] [--data-dir DIR] [--store DIR]
+#   python report_cli.py render [--pages 5 7]
+#   python report_cli.py build [--bank X --source Y | --batch specs.csv]
+#   python report_cli.py draft [--html] [--watch]
+# Only the standard library (and crawl_cache) is imported at startup. Each subcommand imports
+# what it needs when it runs, so `crawl` never loads matplotlib or reportlab
+# and `periods --data-dir` loads nothing heavy at all. The plot theme is
+# applied on the first chart (report_visualization.apply_theme) and the
+# report font on the first build (report_fonts.register_font).
+
+
+def cmd_crawl(args):
+    from crawl_cache import ResponseCache
+    import crawler
+
+    cache = None if args.no_cache else ResponseCache(args.cache_dir, args.ttl)
+    history = None
+    if args.history:
+        from snapshot_history import SnapshotHistory
+        history = SnapshotHistory(args.history)
+    if args.targets:
+        crawler.crawl_targets(crawler.read_targets(args.targets), args.output_dir, cache=cache, history=history,
+                              per_host=args.per_host, rate=args.rate,
+                              parse=lambda content: crawler.extract_main_table(content, args.selector))
+    else:
+        crawler.crawl_techcombank_financials(args.url or crawler.DEFAULT_URL, args.output or crawler.DEFAULT_OUTPUT,
+                                             selector=args.selector, cache=cache, history=history)
+
+
+def _read_rows(path, selector=None):
+    """Raw table rows of a highlights CSV, HTML page or investor PDF."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.pdf':
+        from pdf_extractor import extract_pdf_rows
+        return extract_pdf_rows(path)
+    if ext in ('.html', '.htm'):
+        from crawler import extract_main_table
+        with open(path, 'rb') as f:
+            rows = extract_main_table(f.read(), selector)
+        if rows is None:
+            raise SystemExit(f"{path}: no tables found")
+        return rows
+    import csv
+    with open(path, newline='', encoding='utf-8') as f:
+        return list(csv.reader(f))
+
+
+def cmd_parse(args):
+    from highlights_loader import parse_rows
+
+    for path in args.files:
+        rows = _read_rows(path, args.selector)
+        highlights = parse_rows(rows)
+        print(f"{path}: {len(highlights.metrics)} metrics in {len(highlights.sections)} sections, "
+              f"periods {', '.join(highlights.columns)}")
+        if args.output:
+            import csv
+            with open(args.output, 'w', newline='', encoding='utf-8') as f:
+                csv.writer(f).writerows(rows)
+            print(f"Wrote {args.output}")
+        elif args.show:
+            print(highlights.to_frame())
+
+
+_PERIOD_RE = re.compile(r'^(?:([1-4])Q|(\d{1,2})M|(FY))(\d{2})$')
+
+
+def _period_key(period):
+    """
+    Sort key of a period label, as highlights_loader.quarter_key without
+    importing it: by the quarter it ends in, each quarter before its
+    year-to-date label ('2Q24' < '6M24' < '3Q24' < '4Q24' < 'FY24'). Other
+    names sort last.
+    """
+    match = _PERIOD_RE.match(period)
+    if not match:
+        return (1, 0, 0, period)
+    quarter, months, fy, year = match.groups()
+    if quarter:
+        return (0, int(year) * 4 + int(quarter) - 1, 0, period)
+    return (0, int(year) * 4 + (12 if fy else int(months)) // 3 - 1, 1, period)
+
+
+def cmd_periods(args):
+    if args.data_dir:
+        # <data_dir>/<bank>/<period>.csv: listing the tree is enough
+        for bank in sorted(os.listdir(args.data_dir)):
+            bank_dir = os.path.join(args.data_dir, bank)
+            if os.path.isdir(bank_dir):
+                periods = sorted((name[:-4] for name in os.listdir(bank_dir) if name.endswith('.csv')),
+                                 key=_period_key)
+                print(f"{bank}: {' '.join(periods)}")
+    if args.store:
+        from columnar_store import ColumnarStore
+
+        store = ColumnarStore(args.store)
+        quarters = store.quarters
+        span = f"quarters {quarters[0]}-{quarters[-1]}" if quarters else "no quarters"
+        print(f"{args.store}: {len(store.banks)} banks, {span}")
+    if args.files:
+        import csv
+        from highlights_loader import is_section_header
+
+        for path in args.files:
+            with open(path, newline='', encoding='utf-8') as f:
+                header = next((row for row in csv.reader(f) if row and is_section_header(row)), None)
+            print(f"{path}: {', '.join(c.strip() for c in header[1:]) if header else 'no period header'}")
+
+
+def cmd_render(args):
+    import report_visualization as rv
+
+    rv.render_pages(args.pages, args.output_dir, args.dpi, args.format, args.workers)
+
+
+def cmd_build(args):
+    import generate_report as gr
+
+    if args.batch:
+        gr.build_reports(gr.read_specs(args.batch), args.output_dir, args.workers)
+        return
+    print("Building PDF report...")
+    image_dpi = gr.DEFAULT_DPI if args.image_dpi is None else args.image_dpi or None
+    spec = gr.ReportSpec(args.bank or gr.DEFAULT_BANK, args.source or gr.DEFAULT_SOURCE, image_dpi=image_dpi,
+                         live_charts=args.live_charts)
+    print(f"Successfully generated {gr.build_report(spec, args.output)}")
+
+
+def cmd_draft(args):
+    import generate_report as gr
+    import report_draft
+
+    spec = gr.ReportSpec(args.bank or gr.DEFAULT_BANK, args.source or gr.DEFAULT_SOURCE)
+    fmt = 'html' if args.html else 'pdf'
+    if args.watch:
+        try:
+            report_draft.watch(spec, args.output, fmt=fmt)
+        except KeyboardInterrupt:
+            pass
+        return
+    path, rebuilt = report_draft.build_draft(spec, args.output, fmt=fmt)
+    print(f"{path}: {len(rebuilt)} sections laid out")
+
+
+def make_parser():
+    parser = argparse.ArgumentParser(description="Bank highlights: crawl, parse, render and build reports.")
+    parser.add_argument('--trace', help="Write a Chrome trace of the command (all workers) to this file")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    crawl = subparsers.add_parser('crawl', help="Download highlights pages and save their tables as CSV")
+    crawl.add_argument('url', nargs='?', help="Page to crawl (default: the Techcombank highlights page)")
+    crawl.add_argument('--output', help="CSV for a single page")
+    crawl.add_argument('--targets', help="CSV with bank, period, url columns for a concurrent crawl")
+    crawl.add_argument('--output-dir', default='.')
+    crawl.add_argument('--per-host', type=int, default=4, help="Concurrent requests per host")
+    crawl.add_argument('--rate', type=float, help="Maximum requests per second per host")
+    crawl.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR, help="HTTP cache and raw page archive")
+    crawl.add_argument('--ttl', type=float, default=DEFAULT_TTL, help="Seconds before a cached page is revalidated")
+    crawl.add_argument('--no-cache', action='store_true', help="Always download and parse")
+    crawl.add_argument('--selector', help="XPath of the table to extract")
+    crawl.add_argument('--history', help="Record the changed cells of each new table in this snapshot history")
+    crawl.set_defaults(func=cmd_crawl)
+
+    parse = subparsers.add_parser('parse', help="Read highlights tables from CSV, HTML or PDF files")
+    parse.add_argument('files', nargs='+')
+    parse.add_argument('--output', help="Write the table rows of the (last) file as CSV")
+    parse.add_argument('--show', action='store_true', help="Print the parsed tables")
+    parse.add_argument('--selector', help="XPath of the table in HTML files")
+    parse.set_defaults(func=cmd_parse)
+
+    periods = subparsers.add_parser('periods', help="List the periods available")
+    periods.add_argument('files', nargs='*', help="Highlights CSVs")
+    periods.add_argument('--data-dir', help="<data_dir>/<bank>/<period>.csv tree")
+    periods.add_argument('--store', help="Columnar history store")
+    periods.set_defaults(func=cmd_periods)
+
+    render = subparsers.add_parser('render', help="Render report pages to image files")
+    render.add_argument('--pages', type=int, nargs='+', choices=[4, 5, 6, 7, 8], help="Pages (default: all)")
+    render.add_argument('--output-dir', default='.')
+    render.add_argument('--dpi', type=int, default=150)
+    render.add_argument('--format', default='png', help="Image format, e.g. png, jpg, svg, pdf")
+    render.add_argument('--workers', type=int, help="Worker processes (default: one per page, up to the CPU count)")
+    render.set_defaults(func=cmd_render)
+
+    build = subparsers.add_parser('build', help="Build board report PDFs")
+    build.add_argument('--bank', help="Bank name (default: Techcombank)")
+    build.add_argument('--source', help="Highlights CSV of the reporting quarter (default: aithucchien_1.csv)")
+    build.add_argument('--output', help="Output PDF (default: <bank>_Report_<year>.pdf)")
+    build.add_argument('--live-charts', action='store_true', help="Draw the page 4, 5, 7 and 8 charts as vector graphics")
+    build.add_argument('--image-dpi', type=int, help="Resolution of embedded images; 0 embeds the sources as they are")
+    build.add_argument('--batch', help="CSV of report specs to build in parallel")
+    build.add_argument('--output-dir', default='reports', help="Output directory for --batch")
+    build.add_argument('--workers', type=int, help="Worker processes for --batch (default: CPU count)")
+    build.set_defaults(func=cmd_build)
+
+    draft = subparsers.add_parser('draft', help="Fast low-resolution preview, laying out only changed sections")
+    draft.add_argument('--bank', help="Bank name (default: Techcombank)")
+    draft.add_argument('--source', help="Highlights CSV of the reporting quarter (default: aithucchien_1.csv)")
+    draft.add_argument('--output', help="Output file (default: draft.pdf or draft.html)")
+    draft.add_argument('--html', action='store_true', help="Write an HTML preview instead of a PDF")
+    draft.add_argument('--watch', action='store_true', help="Rebuild on every save of generate_report.py or --source")
+    draft.set_defaults(func=cmd_draft)
+    return parser
+
+
+def main(argv=None):
+    args = make_parser().parse_args(argv)
+    if args.trace:
+        import tracing
+        tracing.enable(args.trace)
+    args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
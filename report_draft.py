@@ -0,0 +1,237 @@
+import hashlib
+import html
+import importlib
+import inspect
+import os
+import pathlib
+import time
+
+from reportlab.lib.pagesizes import A4
+from reportlab.platypus import SimpleDocTemplate
+
+import generate_report as gr
+from report_assets import file_sha256
+from report_book import _page_number_overlay, _section_title
+
+try:
+    from pypdf import PdfReader, PdfWriter
+except ImportError:  # optional, only needed for PDF drafts
+    PdfReader = PdfWriter = None
+
+# --- Draft previews ---
+# A fast preview of the board pack while its text is being edited:
+#   python report_draft.py --watch            rebuild draft.pdf on every save
+#   python report_draft.py --html --watch     draft.html, no PDF layout at all
+# Images go through the asset pipeline at DRAFT_DPI and the chart pages are
+# rendered once per data version at DRAFT_DPI, so a rebuild only reads
+# cached thumbnails. Each page builder is laid out as its own small PDF (or
+# HTML fragment), cached under a key made of the builder's source code, the
+# rest of generate_report.py, the highlights CSV and the spec; after an edit
+# only the sections whose key changed are laid out again (and only their
+# glyphs subset), then the cached sections are merged and page numbered as in
+# report_book.py. With --watch the process stays up and reloads
+# generate_report on save, so imports, the parsed font and the stylesheet
+# are reused.
+# Layout of the cache directory:
+#   charts/<CSV hash>/page<N>.png, pbt_chart.png
+#   sections/<key>.pdf|html
+
+DEFAULT_CACHE_DIR = '.draft_cache'
+DRAFT_DPI = 50
+DRAFT_CHARTS = (5, 7, 8)
+DRAFT_VERSION = 1
+
+
+def draft_spec(spec, cache_dir=DEFAULT_CACHE_DIR):
+    """`spec` with low-resolution images and the chart pages rendered at DRAFT_DPI (once per CSV content)."""
+    charts_dir = os.path.join(cache_dir, 'charts', file_sha256(spec.source)[:16])
+    missing = [page for page in DRAFT_CHARTS if not os.path.exists(os.path.join(charts_dir, f"page{page}.png"))]
+    pbt_chart = os.path.join(charts_dir, 'pbt_chart.png')
+    if missing or not os.path.exists(pbt_chart):
+        import fast_charts
+        import report_visualization as rv
+        from report_metrics import ReportMetrics
+
+        rv._use_agg()
+        data = rv.page_data(ReportMetrics.from_csv(spec.source, spec.bank))
+        os.makedirs(charts_dir, exist_ok=True)
+        for page in missing:
+            fig = rv.PAGES[page](data)
+            fig.savefig(os.path.join(charts_dir, f"page{page}.png"), dpi=DRAFT_DPI, facecolor=fig.get_facecolor())
+            rv.plt.close(fig)
+        fast_charts.render(fast_charts.CHARTS['pbt'](data), pbt_chart, DRAFT_DPI)
+    return spec._replace(image_dpi=DRAFT_DPI, live_charts=False, charts_dir=charts_dir)
+
+
+def section_keys(spec, builders=None):
+    """{builder name: cache key}; a key changes when the builder, the shared code or the data does."""
+    builders = builders or gr.PAGE_BUILDERS
+    module_source = inspect.getsource(gr)
+    sources = {b.__name__: inspect.getsource(b) for b in builders}
+    shared = module_source
+    for source in sources.values():
+        shared = shared.replace(source, '')
+    base = f"{DRAFT_VERSION}\0{shared}\0{file_sha256(spec.source)}\0{tuple(spec)}"
+    return {name: hashlib.sha256(f"{base}\0{source}".encode('utf-8')).hexdigest()[:32]
+            for name, source in sources.items()}
+
+
+# --- HTML fragments ---
+def _html(flowable):
+    """HTML for one flowable of a page builder's story (images by absolute file URI)."""
+    kind = type(flowable).__name__
+    if kind == 'Paragraph':
+        # ReportLab paragraph markup (<b>, <i>, <br/>) is already HTML
+        return f'<p class="{flowable.style.name}">{flowable.text}</p>'
+    if kind == 'Spacer':
+        return f'<div style="height:{flowable.height:.0f}px"></div>'
+    if kind == 'PageBreak':
+        return '<hr class="page-break">'
+    if kind == 'Image':
+        src = html.escape(pathlib.Path(os.path.abspath(flowable.filename)).as_uri())
+        return f'<img src="{src}" width="{flowable.drawWidth:.0f}" height="{flowable.drawHeight:.0f}">'
+    if kind == 'Table':
+        rows = []
+        for row in flowable._cellvalues:
+            cells = []
+            for cell in row:
+                if isinstance(cell, (list, tuple)):
+                    cells.append(''.join(_html(f) for f in cell))
+                elif hasattr(cell, 'wrap'):
+                    cells.append(_html(cell))
+                else:
+                    cells.append(html.escape(str(cell)))
+            rows.append('<tr>' + ''.join(f'<td>{c}</td>' for c in cells) + '</tr>')
+        return '<table>' + ''.join(rows) + '</table>'
+    return f'<!-- {kind} -->'
+
+
+_HTML_PAGE = """<!DOCTYPE html>
+<html lang="vi"><head><meta charset="utf-8"><title>{title}</title>
+<style>
+body {{ font-family: serif; max-width: 595px; margin: 2em auto; }}
+.Title, .SubTitle {{ text-align: center; }}
+.Heading1 {{ color: #BE1E2D; }} .Heading2 {{ color: #00529B; }}
+.Italic {{ color: gray; font-style: italic; }} .Bullet {{ margin-left: 20px; }}
+td {{ vertical-align: top; }} hr.page-break {{ border: 0; border-top: 1px dashed #ccc; margin: 2em 0; }}
+</style></head><body>
+{body}
+</body></html>
+"""
+
+
+# --- Building ---
+def _layout_section(ctx, builder, path, fmt):
+    """Lays out one page builder to `path`: a PDF without page numbers, or an HTML fragment."""
+    ctx.story = []
+    builder(ctx)
+    title = _section_title(ctx)
+    if fmt == 'html':
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(_html(flowable) for flowable in ctx.story))
+        return
+    doc = SimpleDocTemplate(path, pagesize=A4,
+                            rightMargin=60, leftMargin=60,
+                            topMargin=80, bottomMargin=60)
+    doc.title = title
+    header_footer = gr.make_header_footer(ctx, page_numbers=False)
+    doc.build(ctx.story, onFirstPage=header_footer, onLaterPages=header_footer)
+
+
+def build_draft(spec=None, output=None, cache_dir=DEFAULT_CACHE_DIR, fmt='pdf'):
+    """
+    Builds a draft of the report for `spec` to `output` (draft.pdf or
+    draft.html) from cached sections, laying out only the changed ones.
+    Returns (output, [rebuilt builder names]).
+    """
+    if fmt == 'pdf' and PdfWriter is None:
+        raise ImportError("PDF drafts need pypdf: pip install pypdf (or use --html)")
+    spec = draft_spec(spec or gr.ReportSpec(), cache_dir)
+    output = output or f"draft.{fmt}"
+    section_dir = os.path.join(cache_dir, 'sections')
+    os.makedirs(section_dir, exist_ok=True)
+
+    ctx = None
+    sections, rebuilt = [], []
+    for name, key in section_keys(spec).items():
+        path = os.path.join(section_dir, f"{key}.{fmt}")
+        if not os.path.exists(path):
+            ctx = ctx or gr.ReportContext(spec)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            _layout_section(ctx, getattr(gr, name), tmp_path, fmt)
+            os.replace(tmp_path, path)
+            rebuilt.append(name)
+        sections.append(path)
+
+    if fmt == 'html':
+        parts = []
+        for path in sections:
+            with open(path, encoding='utf-8') as f:
+                parts.append(f.read())
+        title = html.escape(f"{spec.bank} – draft")
+        with open(output, 'w', encoding='utf-8') as f:
+            f.write(_HTML_PAGE.format(title=title, body='\n'.join(parts)))
+        return output, rebuilt
+
+    font_name = gr.register_font()
+    writer = PdfWriter()
+    page_count = 0
+    for path in sections:
+        reader = PdfReader(path)
+        overlay = _page_number_overlay(page_count + 1, len(reader.pages), font_name)
+        for page, numbers in zip(reader.pages, overlay.pages):
+            page.merge_page(numbers)
+            writer.add_page(page)
+        writer.add_outline_item(reader.metadata.title or os.path.basename(path), page_count)
+        page_count += len(reader.pages)
+    with open(output, 'wb') as f:
+        writer.write(f)
+    return output, rebuilt
+
+
+def watch(spec=None, output=None, cache_dir=DEFAULT_CACHE_DIR, fmt='pdf', interval=0.2):
+    """Rebuilds the draft whenever generate_report.py or the highlights CSV is saved (Ctrl+C to stop)."""
+    spec = spec or gr.ReportSpec()
+    watched = [gr.__file__, spec.source]
+    seen = None
+    while True:
+        stamps = [os.stat(path).st_mtime_ns for path in watched]
+        if stamps != seen:
+            start = time.perf_counter()
+            try:
+                if seen is not None and stamps[0] != seen[0]:
+                    importlib.reload(gr)
+                path, rebuilt = build_draft(spec, output, cache_dir, fmt)
+                print(f"{path}: {len(rebuilt)} sections laid out ({', '.join(rebuilt) or 'none'}) "
+                      f"in {time.perf_counter() - start:.2f}s")
+            except Exception as e:
+                # most likely a half-saved edit; try again on the next save
+                print(f"Draft failed: {type(e).__name__}: {e}")
+            seen = stamps
+        time.sleep(interval)
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Fast draft preview of the board report.")
+    parser.add_argument('--bank', default=gr.DEFAULT_BANK)
+    parser.add_argument('--source', default=gr.DEFAULT_SOURCE, help="Highlights CSV of the reporting quarter")
+    parser.add_argument('--assets-dir', default='.')
+    parser.add_argument('--output', help="Output file (default: draft.pdf or draft.html)")
+    parser.add_argument('--html', action='store_true', help="Write an HTML preview instead of a PDF")
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR)
+    parser.add_argument('--watch', action='store_true', help="Rebuild on every save of generate_report.py or --source")
+    args = parser.parse_args()
+
+    spec = gr.ReportSpec(args.bank, args.source, args.assets_dir)
+    fmt = 'html' if args.html else 'pdf'
+    if args.watch:
+        try:
+            watch(spec, args.output, args.cache_dir, fmt)
+        except KeyboardInterrupt:
+            pass
+    else:
+        start = time.perf_counter()
+        path, rebuilt = build_draft(spec, args.output, args.cache_dir, fmt)
+        print(f"{path}: {len(rebuilt)} sections laid out in {time.perf_counter() - start:.2f}s")
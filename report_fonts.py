@@ -0,0 +1,64 @@
+import functools
+import importlib.util
+import os
+
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+
+# --- Font registry ---
+# ReportLab needs a TrueType font that covers Vietnamese. The font file is
+# resolved and parsed once per process (i.e. once per batch worker) and every
+# later report reuses the registered font. TTFont embeds only the glyphs a
+# document actually draws, so each PDF carries a small subset, not the file.
+
+FONT_NAME = 'VietFont'
+FALLBACK_FONT = 'Helvetica'
+
+
+def _matplotlib_font(filename):
+    """Path of a font bundled with matplotlib (DejaVu covers Vietnamese), without importing it."""
+    spec = importlib.util.find_spec('matplotlib')
+    if spec is None or not spec.origin:
+        return None
+    return os.path.join(os.path.dirname(spec.origin), 'mpl-data', 'fonts', 'ttf', filename)
+
+
+# (label, path) in order of preference
+FONT_CANDIDATES = [
+    ('Times New Roman', 'C:/Windows/Fonts/times.ttf'),
+    ('Times New Roman', '/usr/share/fonts/truetype/msttcorefonts/Times_New_Roman.ttf'),
+    ('Roboto', 'Roboto-Regular.ttf'),
+    ('DejaVu Serif', _matplotlib_font('DejaVuSerif.ttf')),
+]
+
+
+def resolve_font(candidates=None):
+    """Returns the (label, path) of the first font file that exists, or None."""
+    for label, path in candidates or FONT_CANDIDATES:
+        if path and os.path.exists(path):
+            return label, path
+    return None
+
+
+@functools.lru_cache(maxsize=None)
+def register_font(path=None, name=FONT_NAME):
+    """
+    Registers a Vietnamese font under `name` and returns the name to use in
+    styles. Only the first call in a process parses the TTF; if no font file
+    is found the PDF falls back to Helvetica.
+    """
+    if path:
+        label = os.path.basename(path)
+    else:
+        found = resolve_font()
+        if found is None:
+            print("---")
+            print("WARNING: No suitable Vietnamese font found (Times New Roman, Roboto or DejaVu Serif).")
+            print("The PDF may not render Vietnamese characters correctly.")
+            print("ACTION: Ensure 'times.ttf' is in C:/Windows/Fonts/ or download 'Roboto-Regular.ttf' and place it in this directory.")
+            print("---")
+            return FALLBACK_FONT
+        label, path = found
+    pdfmetrics.registerFont(TTFont(name, path))
+    print(f"Registered {label} as the report font.")
+    return name
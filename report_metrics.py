@@ -0,0 +1,130 @@
+import functools
+import re
+
+from highlights_loader import load_highlights, quarter_key, quarter_label
+
+# --- Report metrics context ---
+# Every number that appears in the charts and paragraphs of a report, derived
+# from one highlights snapshot. A new quarter or a new bank is a new CSV, not
+# a code edit.
+
+DEFAULT_SOURCE = 'aithucchien_1.csv'
+DEFAULT_BANK = 'Techcombank'
+
+_YTD_RE = re.compile(r'^(\d{1,2}M|FY)(\d{2})$')
+
+
+def vn_number(value, decimals=0):
+    """Formats a number the Vietnamese way: 15135 -> '15.135', 1.32 -> '1,32'."""
+    text = f"{value:,.{decimals}f}"
+    return text.replace(',', '\0').replace('.', ',').replace('\0', '.')
+
+
+def vn_pct(value, decimals=1, signed=False):
+    """Formats a percentage the Vietnamese way: -3.2 -> '-3,2%'."""
+    text = vn_number(abs(value), decimals)
+    sign = '-' if value < 0 else '+' if signed else ''
+    return f"{sign}{text}%"
+
+
+def _ytd_label(period):
+    """'6M24' -> '6T 2024', 'FY24' -> 'Năm 2024'."""
+    span, yy = _YTD_RE.match(period).groups()
+    return f"Năm 20{yy}" if span == 'FY' else f"{span[:-1]}T 20{yy}"
+
+
+def _ytd_label_en(period):
+    """'6M24' -> '6M 2024', 'FY24' -> 'FY 2024'."""
+    span, yy = _YTD_RE.match(period).groups()
+    return f"{span} 20{yy}"
+
+
+class ReportMetrics:
+    """
+    Values of one bank at one reporting quarter.
+
+    Pairs are (comparison, current). Balance-sheet style comparisons are made
+    against the previous year end ("vs 2024"), profit and credit growth
+    against the same year-to-date period of the previous year ("vs 6M 2024").
+    """
+
+    def __init__(self, highlights, bank=DEFAULT_BANK, source=None):
+        h = highlights
+        self.highlights = h
+        self.bank = bank
+        self.source = source
+
+        self.quarter = h.quarters[-1]
+        qk = quarter_key(self.quarter)
+        self.year = qk // 4
+        self.year_end = quarter_label(self.year * 4 - 1)  # 4Q of the previous year
+        self.ytd_prev, self.ytd_cur = h.ytd_periods[:2]
+        self.ytd_change = h.change_periods[0]
+        self.ytd_labels = (_ytd_label(self.ytd_prev), _ytd_label(self.ytd_cur))
+        self.year_labels = (str(self.year - 1), str(self.year))
+
+        def at(metric, period):
+            return h.get(metric, period)
+
+        def vs_year_end(metric):
+            return at(metric, self.year_end), at(metric, self.quarter)
+
+        def ytd(metric):
+            return at(metric, self.ytd_prev), at(metric, self.ytd_cur)
+
+        self.pbt = ytd('Profit before tax')
+        self.pbt_change = at('Profit before tax', self.ytd_change)
+        self.total_assets = vs_year_end('Total assets')
+        self.deposits = vs_year_end('Deposits from customers')
+        self.casa = vs_year_end('CASA')
+        self.npl = vs_year_end('NPL')
+        self.nim = vs_year_end('NIM (LTM)')
+        self.cof = vs_year_end('Cost of funds')
+        self.credit_costs = vs_year_end('Credit costs (LTM)')
+        self.roa = vs_year_end('ROA (LTM)')
+        self.roe = vs_year_end('ROE (LTM)')
+        self.credit_growth = ytd('Credit growth')
+
+    @classmethod
+    def from_csv(cls, path=DEFAULT_SOURCE, bank=DEFAULT_BANK):
+        return cls(load_highlights(path), bank=bank, source=path)
+
+    @staticmethod
+    def change_pct(pair):
+        prev, cur = pair
+        return (cur / prev - 1) * 100
+
+    @property
+    def plan_year(self):
+        return self.year + 1
+
+    @property
+    def report_month(self):
+        """'Tháng 6 năm 2025': the last month of the reporting quarter."""
+        return f"Tháng {3 * (quarter_key(self.quarter) % 4 + 1)} năm {self.year}"
+
+    @property
+    def ytd_span(self):
+        """'6T2025' style label of the current year-to-date period."""
+        return self.ytd_labels[1].replace(' ', '')
+
+    def kpi_table(self):
+        """KPI rows for the page 4 infographic."""
+        prev_ytd = _ytd_label_en(self.ytd_prev)
+        return {
+            'Metric': [f'Pre-Tax Profit ({self.ytd_cur[:-2]})', 'Total Assets', 'Customer Deposits',
+                       'CASA Ratio', 'NPL Ratio'],
+            'Value': [f'{self.pbt[1]:,.0f} tỷ', f'{self.total_assets[1]:,.0f} tỷ', f'{self.deposits[1]:,.0f} tỷ',
+                      f'{self.casa[1]:.1f}%', f'{self.npl[1]:.2f}%'],
+            'Change': [f'{self.pbt_change:+.1f}% vs {prev_ytd}',
+                       f'{self.change_pct(self.total_assets):+.1f}% vs {self.year - 1}',
+                       f'{self.change_pct(self.deposits):+.1f}% vs {self.year - 1}',
+                       'Leading',
+                       f'{self.npl[1] - self.npl[0]:+.2f} p.p.'],
+        }
+
+
+@functools.lru_cache(maxsize=None)
+def default_metrics():
+    """Metrics of the default snapshot, loaded on first use."""
+    return ReportMetrics.from_csv(DEFAULT_SOURCE, DEFAULT_BANK)
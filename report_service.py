@@ -0,0 +1,274 @@
+import functools
+import io
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import generate_report as gr
+import report_visualization as rv
+from report_metrics import DEFAULT_BANK, DEFAULT_SOURCE, ReportMetrics
+
+# --- Report service ---
+# A long-running HTTP server for reports and charts, so the imports, fonts,
+# parsed highlights and rendered output of earlier requests are reused:
+#   GET /report?bank=X&period=2Q25           board pack PDF
+#   GET /chart?bank=X&period=2Q25&page=5     chart page (&format=svg for SVG)
+#   GET /data?bank=X&period=2Q25             page_data() as JSON
+#   GET /stats                               cache sizes and hit rates
+# Parsed metrics are kept per process in an lru_cache; chart and PDF bytes in
+# size-bounded LRU caches in the server. Every key includes the data version
+# of the bank's CSV (mtime and size), so an updated file is picked up by the
+# next request and old entries simply age out. Charts and PDFs are built in a
+# process pool (pyplot is not thread safe); concurrent requests for the same
+# missing entry wait for one build.
+#
+# Sources: <data_dir>/<bank>/<period>.csv (the synthetic_data layout), plus
+# the default bank and snapshot.
+
+DEFAULT_PORT = 8000
+_NAME_RE = re.compile(r'^[\w.-]+$')
+
+
+class LRUCache:
+    """Thread-safe LRU mapping bounded by the total size of its values."""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = self.misses = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._items.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        if len(value) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self.bytes -= len(old)
+            self._items[key] = value
+            self.bytes += len(value)
+            while self.bytes > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self.bytes -= len(evicted)
+
+    def stats(self):
+        with self._lock:
+            return {'items': len(self._items), 'bytes': self.bytes, 'max_bytes': self.max_bytes,
+                    'hits': self.hits, 'misses': self.misses}
+
+
+def data_version(path):
+    """Changes whenever the file is rewritten."""
+    st = os.stat(path)
+    return f"{st.st_mtime_ns:x}-{st.st_size:x}"
+
+
+@functools.lru_cache(maxsize=256)
+def load_metrics(source, bank, version):
+    """Parsed metrics of one CSV version (`version` is part of the cache key only)."""
+    return ReportMetrics.from_csv(source, bank)
+
+
+# --- Worker functions (run in the process pool) ---
+def render_chart(page, source, bank, version, fmt='png', dpi=150):
+    fig = rv.PAGES[page](rv.page_data(load_metrics(source, bank, version)))
+    buf = io.BytesIO()
+    fig.savefig(buf, format=fmt, dpi=dpi, facecolor=fig.get_facecolor())
+    rv.plt.close(fig)
+    return buf.getvalue()
+
+
+def build_pdf(source, bank, version, assets_dir='.'):
+    fd, path = tempfile.mkstemp(suffix='.pdf')
+    os.close(fd)
+    try:
+        spec = gr.ReportSpec(bank, source, assets_dir, live_charts=True)
+        gr.build_report(spec, path, metrics=load_metrics(source, bank, version))
+        with open(path, 'rb') as f:
+            return f.read()
+    finally:
+        os.remove(path)
+
+
+class ReportService:
+    """Caches and the worker pool behind the HTTP handler."""
+
+    def __init__(self, data_dir=None, assets_dir='.', workers=None, chart_cache_mb=64, pdf_cache_mb=256, dpi=150):
+        self.data_dir = data_dir
+        self.assets_dir = assets_dir
+        self.dpi = dpi
+        self.charts = LRUCache(chart_cache_mb << 20)
+        self.pdfs = LRUCache(pdf_cache_mb << 20)
+        self.sources = {}
+        default = load_metrics(DEFAULT_SOURCE, DEFAULT_BANK, data_version(DEFAULT_SOURCE))
+        self.sources[(DEFAULT_BANK, default.quarter)] = DEFAULT_SOURCE
+        rv._use_agg()  # before the pool forks, so workers start with everything imported
+        self.pool = ProcessPoolExecutor(max_workers=workers or os.cpu_count())
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def source(self, bank, period):
+        """CSV path of (bank, period), or None."""
+        if (bank, period) in self.sources:
+            return self.sources[(bank, period)]
+        if self.data_dir and _NAME_RE.match(bank) and _NAME_RE.match(period) and '..' not in bank + period:
+            path = os.path.join(self.data_dir, bank, f"{period}.csv")
+            if os.path.exists(path):
+                return path
+        return None
+
+    def _cached(self, cache, key, func, *args):
+        """(value, hit): from `cache`, or built once in the pool however many requests ask for it."""
+        value = cache.get(key)
+        if value is not None:
+            return value, True
+        with self._lock:
+            future = self._inflight.get(key)
+            submitted = future is None
+            if submitted:
+                future = self.pool.submit(func, *args)
+                self._inflight[key] = future
+        if submitted:
+            # outside the lock: the callback runs right away if the build has already finished
+            future.add_done_callback(lambda f: self._done(cache, key, f))
+        return future.result(), False
+
+    def _done(self, cache, key, future):
+        # cached before it leaves _inflight, so a request in between finds one or the other
+        if future.exception() is None:
+            cache.put(key, future.result())
+        with self._lock:
+            self._inflight.pop(key, None)
+
+    def metrics(self, bank, period):
+        source = self.source(bank, period)
+        if source is None:
+            raise KeyError(f"No data for {bank} {period}")
+        version = data_version(source)
+        return source, version, load_metrics(source, bank, version)
+
+    def chart(self, bank, period, page, fmt='png'):
+        source, version, _ = self.metrics(bank, period)
+        key = ('chart', source, bank, version, page, fmt, self.dpi)
+        return self._cached(self.charts, key, render_chart, page, source, bank, version, fmt, self.dpi)
+
+    def report(self, bank, period):
+        source, version, _ = self.metrics(bank, period)
+        key = ('pdf', source, bank, version, self.assets_dir)
+        return self._cached(self.pdfs, key, build_pdf, source, bank, version, self.assets_dir)
+
+    def stats(self):
+        info = load_metrics.cache_info()
+        return {'charts': self.charts.stats(), 'pdfs': self.pdfs.stats(),
+                'data': {'items': info.currsize, 'hits': info.hits, 'misses': info.misses}}
+
+    def close(self):
+        self.pool.shutdown()
+
+
+_CONTENT_TYPES = {'png': 'image/png', 'svg': 'image/svg+xml', 'pdf': 'application/pdf', 'json': 'application/json'}
+
+
+class ReportHandler(BaseHTTPRequestHandler):
+    service = None  # set by make_server()
+    log_requests = True
+
+    def log_message(self, *args):
+        if self.log_requests:
+            super().log_message(*args)
+
+    def do_GET(self):
+        start = time.perf_counter()
+        url = urlsplit(self.path)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        bank, period = query.get('bank', DEFAULT_BANK), query.get('period')
+        try:
+            if url.path == '/stats':
+                body, hit, kind = json.dumps(self.service.stats()).encode('utf-8'), False, 'json'
+            elif period is None:
+                return self._send_error(400, "period is required")
+            elif url.path == '/report':
+                (body, hit), kind = self.service.report(bank, period), 'pdf'
+            elif url.path == '/chart':
+                page, kind = query.get('page', '5'), query.get('format', 'png')
+                if not page.isdigit() or int(page) not in rv.PAGES or kind not in ('png', 'svg'):
+                    return self._send_error(400, f"page must be one of {sorted(rv.PAGES)}, format png or svg")
+                body, hit = self.service.chart(bank, period, int(page), kind)
+            elif url.path == '/data':
+                _, _, metrics = self.service.metrics(bank, period)
+                body, hit, kind = json.dumps(rv.page_data(metrics), ensure_ascii=False).encode('utf-8'), True, 'json'
+            else:
+                return self._send_error(404, f"Unknown path {url.path}")
+        except KeyError as e:
+            return self._send_error(404, str(e.args[0]))
+        except Exception as e:
+            return self._send_error(500, f"{type(e).__name__}: {e}")
+        self.send_response(200)
+        self.send_header('Content-Type', _CONTENT_TYPES[kind])
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('X-Cache', 'hit' if hit else 'miss')
+        self.send_header('Server-Timing', f"total;dur={(time.perf_counter() - start) * 1000:.1f}")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_error(self, status, message):
+        body = json.dumps({'error': message}).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def make_server(service, host='127.0.0.1', port=DEFAULT_PORT, log_requests=True):
+    """A threading HTTP server answering from `service`."""
+    handler = type('BoundReportHandler', (ReportHandler,), {'service': service, 'log_requests': log_requests})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="HTTP service for report PDFs and charts.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--data-dir', help="Highlights CSVs as <data_dir>/<bank>/<period>.csv")
+    parser.add_argument('--assets-dir', default='.')
+    parser.add_argument('--workers', type=int, help="Worker processes (default: CPU count)")
+    parser.add_argument('--chart-cache-mb', type=int, default=64)
+    parser.add_argument('--pdf-cache-mb', type=int, default=256)
+    parser.add_argument('--dpi', type=int, default=150, help="PNG chart resolution")
+    args = parser.parse_args()
+
+    service = ReportService(args.data_dir, args.assets_dir, args.workers, args.chart_cache_mb, args.pdf_cache_mb,
+                            args.dpi)
+    server = make_server(service, args.host, args.port)
+    print(f"Serving reports on http://{args.host}:{server.server_address[1]}/ "
+          f"(default: /report?bank={DEFAULT_BANK}&period={next(iter(service.sources))[1]})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
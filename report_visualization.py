@@ -1,47 +1,71 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
 import matplotlib.pyplot as plt
 import seaborn as sns
-import pandas as pd
 import numpy as np
 
-# Set a professional style for the plots
-sns.set_theme(style="whitegrid")
-plt.rcParams['font.family'] = 'sans-serif'
-plt.rcParams['font.sans-serif'] = 'Arial'
-plt.rcParams['axes.labelweight'] = 'bold'
-plt.rcParams['axes.titleweight'] = 'bold'
-plt.rcParams['figure.titleweight'] = 'bold'
-plt.rcParams['axes.titlesize'] = 16
-plt.rcParams['figure.titlesize'] = 20
+from fast_charts import draw_bars, draw_dual_axis, pbt_title, thousands
+from report_metrics import default_metrics
+import tracing
+from tracing import span, traced
+
+# --- Plot Style ---
+# Applied on first use rather than at import, so importing this module for
+# page_data() or PAGES does not touch the matplotlib state.
+_theme_applied = False
+
+
+def apply_theme():
+    """Sets a professional style for the plots; runs once, when the first page is drawn."""
+    global _theme_applied
+    if _theme_applied:
+        return
+    sns.set_theme(style="whitegrid")
+    plt.rcParams['font.family'] = 'sans-serif'
+    plt.rcParams['font.sans-serif'] = 'Arial'
+    plt.rcParams['axes.labelweight'] = 'bold'
+    plt.rcParams['axes.titleweight'] = 'bold'
+    plt.rcParams['figure.titleweight'] = 'bold'
+    plt.rcParams['axes.titlesize'] = 16
+    plt.rcParams['figure.titlesize'] = 20
+    _theme_applied = True
 
-# --- Data Extraction from Report ---
-# Data for Page 4
-pbt_2025_6m = 15135
-pbt_2024_6m = pbt_2025_6m / (1 - 0.032) # Calculate 2024 value from % change
-
-financials_kpi = {
-    'Metric': ['Pre-Tax Profit (6M)', 'Total Assets', 'Customer Deposits', 'CASA Ratio', 'NPL Ratio'],
-    'Value': [f'{pbt_2025_6m:,.0f} tỷ', '1,037,645 tỷ', '589,078 tỷ', '41.1%', '1.32%'],
-    'Change': ['-3.2% vs 6M 2024', '+6.0% vs 2024', '+4.3% vs 2024', 'Leading', '+0.15 p.p.']
-}
 
-# Data for Page 5
-nim_2024 = 4.2
-nim_2025 = 3.7
-cost_of_funds_2024 = 3.4 # Assumed for visualization
-cost_of_funds_2025 = 3.5
-credit_costs_2024 = 0.8
-credit_costs_2025 = 0.6
-
-# Data for Page 6
-credit_growth_2024 = 11.6
-credit_growth_2025 = 10.6
+# --- Data Extraction from Report ---
+def page_data(metrics=None):
+    """
+    Collects the values plotted on pages 4-8 into one dict, the unit the page
+    functions and templates consume. Defaults to the metrics of the default
+    highlights snapshot (see report_metrics).
+    """
+    m = metrics or default_metrics()
+    return {
+        'year': m.year,
+        'plan_year': m.plan_year,
+        'pbt': m.pbt,
+        'pbt_labels': m.ytd_labels,
+        'kpi': m.kpi_table(),
+        'years': m.year_labels,
+        'nim': m.nim,
+        'cof': m.cof,
+        'credit_costs': m.credit_costs,
+        'credit_growth': m.credit_growth,
+        'roa': m.roa,
+        'roe': m.roe,
+    }
 
 # --- Visualization Functions ---
 
-def visualize_page_4():
+@traced()
+def visualize_page_4(data=None):
     """Generates visualizations for Page 4: Financial Summary."""
+    apply_theme()
+    data = data or page_data()
+    financials_kpi = data['kpi']
     fig = plt.figure(figsize=(14, 7), constrained_layout=True)
-    fig.suptitle('Trang 4: Tóm tắt Kết quả Tài chính năm 2025')
+    fig.suptitle(f"Trang 4: Tóm tắt Kết quả Tài chính năm {data['year']}")
     
     # KPI Table
     ax1 = fig.add_subplot(1, 2, 1)
@@ -50,7 +74,7 @@ def visualize_page_4():
     
     table_data = list(zip(financials_kpi['Metric'], financials_kpi['Value'], financials_kpi['Change']))
     table = ax1.table(cellText=table_data,
-                      colLabels=['Chỉ số', 'Giá trị 2025', 'So sánh'],
+                      colLabels=['Chỉ số', f"Giá trị {data['year']}", 'So sánh'],
                       cellLoc='left', loc='center',
                       colWidths=[0.4, 0.3, 0.3])
     table.auto_set_font_size(False)
@@ -71,64 +95,47 @@ def visualize_page_4():
 
     # Bar chart for Pre-Tax Profit
     ax2 = fig.add_subplot(1, 2, 2)
-    pbt_data = {'Year': ['6T 2024', '6T 2025'], 'Profit (tỷ VND)': [pbt_2024_6m, pbt_2025_6m]}
-    pbt_df = pd.DataFrame(pbt_data)
-    
-    sns.barplot(x='Year', y='Profit (tỷ VND)', data=pbt_df, ax=ax2, palette=['#a9a9a9', '#40466e'])
-    ax2.set_title('So sánh Lợi nhuận trước thuế (6 Tháng)')
-    for p in ax2.patches:
-        ax2.annotate(f'{p.get_height():,.0f}', 
-                     (p.get_x() + p.get_width() / 2., p.get_height()), 
-                     ha='center', va='center', 
-                     xytext=(0, 9), 
-                     textcoords='offset points')
-    ax2.set_ylim(0, pbt_df['Profit (tỷ VND)'].max() * 1.1)
-
-
-def visualize_page_5():
+    draw_bars(ax2, data['pbt_labels'], data['pbt'], fmt=thousands, headroom=1.1,
+              xlabel='Year', ylabel='Profit (tỷ VND)')
+    ax2.set_title(pbt_title(data['pbt_labels']))
+    return fig
+
+
+@traced()
+def visualize_page_5(data=None):
     """Generates visualizations for Page 5: Operational Performance."""
+    apply_theme()
+    data = data or page_data()
     fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 6))
     fig.suptitle('Trang 5: Phân tích Chuyên sâu về Hiệu quả Hoạt động')
 
     # Dual-axis chart for NIM and Cost of Funds
-    years = ['2024', '2025']
-    nim = [nim_2024, nim_2025]
-    cof = [cost_of_funds_2024, cost_of_funds_2025]
+    years = list(data['years'])
+    nim = list(data['nim'])
+    cof = list(data['cof'])
     
     ax1.set_title('Biên lãi ròng (NIM) và Chi phí vốn (CoF)')
-    ax1_twin = ax1.twinx()
-    
-    ax1.bar(years, nim, color='#40466e', label='NIM (%)')
-    ax1_twin.plot(years, cof, color='#ff7f0e', marker='o', label='Cost of Funds (%)')
-    
-    ax1.set_ylabel('NIM (%)')
-    ax1_twin.set_ylabel('Cost of Funds (%)')
+    draw_dual_axis(ax1, years, nim, cof, 'NIM (%)', 'Cost of Funds (%)')
     fig.legend(loc='upper right', bbox_to_anchor=(0.4, 0.85))
 
     # Bar chart for Credit Costs
-    cc_data = {'Year': ['2024', '2025'], 'Cost (%)': [credit_costs_2024, credit_costs_2025]}
-    cc_df = pd.DataFrame(cc_data)
-    sns.barplot(x='Year', y='Cost (%)', data=cc_df, ax=ax2, palette=['#a9a9a9', '#40466e'])
+    draw_bars(ax2, years, data['credit_costs'], xlabel='Year', ylabel='Cost (%)')
     ax2.set_title('Chi phí tín dụng (Credit Costs)')
-    for p in ax2.patches:
-        ax2.annotate(f'{p.get_height()}%', (p.get_x() + p.get_width() / 2., p.get_height()), ha='center', va='center', xytext=(0, 9), textcoords='offset points')
-    ax2.set_ylim(0, cc_df['Cost (%)'].max() * 1.2)
+    return fig
 
 
-def visualize_page_6():
+@traced()
+def visualize_page_6(data=None):
     """Generates visualizations for Page 6: Trends, Risks, and Opportunities."""
+    apply_theme()
+    data = data or page_data()
     fig = plt.figure(figsize=(14, 7), constrained_layout=True)
     fig.suptitle('Trang 6: Phân tích Xu hướng, Rủi ro và Cơ hội')
 
     # Credit Growth Bar Chart
     ax1 = fig.add_subplot(1, 2, 1)
-    cg_data = {'Year': ['2024', '2025'], 'Growth (%)': [credit_growth_2024, credit_growth_2025]}
-    cg_df = pd.DataFrame(cg_data)
-    sns.barplot(x='Year', y='Growth (%)', data=cg_df, ax=ax1, palette=['#a9a9a9', '#40466e'])
+    draw_bars(ax1, data['years'], data['credit_growth'], xlabel='Year', ylabel='Growth (%)')
     ax1.set_title('Tăng trưởng tín dụng chậm lại')
-    for p in ax1.patches:
-        ax1.annotate(f'{p.get_height()}%', (p.get_x() + p.get_width() / 2., p.get_height()), ha='center', va='center', xytext=(0, 9), textcoords='offset points')
-    ax1.set_ylim(0, cg_df['Growth (%)'].max() * 1.2)
 
     # Risks vs Opportunities
     ax2 = fig.add_subplot(1, 2, 2)
@@ -140,12 +147,16 @@ def visualize_page_6():
     
     ax2.text(0.1, 0.6, text_risks, fontsize=12, va='center', ha='left', bbox=dict(boxstyle='round,pad=1', fc='#ffcccb', ec='red', alpha=0.6))
     ax2.text(0.9, 0.6, text_opps, fontsize=12, va='center', ha='right', bbox=dict(boxstyle='round,pad=1', fc='#90ee90', ec='green', alpha=0.6))
+    return fig
 
 
-def visualize_page_7():
+@traced()
+def visualize_page_7(data=None):
     """Generates a 'hub and spoke' circular infographic for Page 7 strategy."""
+    apply_theme()
+    plan_year = (data or page_data())['plan_year']
     fig, ax = plt.subplots(figsize=(16, 14))
-    fig.suptitle('Trang 7: Ba Trụ cột Chiến lược cho Tăng trưởng Bền vững 2026', fontsize=24, weight='bold', y=0.96)
+    fig.suptitle(f'Trang 7: Ba Trụ cột Chiến lược cho Tăng trưởng Bền vững {plan_year}', fontsize=24, weight='bold', y=0.96)
 
     # --- Base Setup ---
     ax.set_xlim(-2.2, 2.2)
@@ -155,7 +166,7 @@ def visualize_page_7():
 
     # --- Central Goal ---
     ax.add_patch(plt.Circle((0, 0), 0.6, facecolor='white', edgecolor='black', lw=1.5, zorder=10))
-    ax.text(0, 0, "Tăng trưởng\nBền vững\n2026",
+    ax.text(0, 0, f"Tăng trưởng\nBền vững\n{plan_year}",
             ha='center', va='center', fontsize=20, weight='bold', color='#333333', zorder=11, linespacing=1.3)
 
     # --- Pillar Data ---
@@ -212,12 +223,16 @@ def visualize_page_7():
                 wrap=True)
 
     plt.tight_layout(rect=[0, 0, 1, 0.95])
+    return fig
 
 
-def visualize_page_8():
+@traced()
+def visualize_page_8(data=None):
     """Generates an improved timeline/roadmap visualization for Page 8."""
+    apply_theme()
+    plan_year = (data or page_data())['plan_year']
     fig, ax = plt.subplots(figsize=(18, 9))
-    fig.suptitle('Trang 8: Kế hoạch hành động & Lộ trình 2026', fontsize=22, weight='bold', y=0.98)
+    fig.suptitle(f'Trang 8: Kế hoạch hành động & Lộ trình {plan_year}', fontsize=22, weight='bold', y=0.98)
 
     # --- Configuration ---
     ax.set_ylim(-2.5, 2.5)
@@ -274,14 +289,92 @@ def visualize_page_8():
     ax.legend(legend_patches, legend_labels, loc='upper right', fontsize=12, frameon=False, bbox_to_anchor=(0.99, 0.95))
     
     plt.tight_layout(rect=[0, 0, 1, 0.95])
+    return fig
+
+
+# --- Headless Rendering ---
+PAGES = {
+    4: visualize_page_4,
+    5: visualize_page_5,
+    6: visualize_page_6,
+    7: visualize_page_7,
+    8: visualize_page_8,
+}
+
+# page_data() keys read by each page function
+PAGE_INPUTS = {
+    4: ('year', 'kpi', 'pbt', 'pbt_labels'),
+    5: ('years', 'nim', 'cof', 'credit_costs'),
+    6: ('years', 'credit_growth'),
+    7: ('plan_year',),
+    8: ('plan_year',),
+}
+
+# File names the report pipeline expects for each page (without extension)
+PAGE_OUTPUTS = {4: 'page4', 5: 'page5', 6: 'page6', 7: 'page7', 8: 'timeline'}
+
+
+def _use_agg():
+    """Switches pyplot to the non-interactive Agg backend (safe before any figure exists)."""
+    plt.switch_backend('Agg')
+
+
+def render_page(page, output_dir='.', dpi=150, fmt='png'):
+    """Renders one page function to <output_dir>/<name>.<fmt>. Returns (page, path, seconds)."""
+    start = time.perf_counter()
+    fig = PAGES[page]()
+    path = os.path.join(output_dir, f"{PAGE_OUTPUTS[page]}.{fmt}")
+    with span('savefig', page=page, format=fmt, dpi=dpi) as s:
+        fig.savefig(path, dpi=dpi, format=fmt, facecolor=fig.get_facecolor())
+        s.set(bytes_out=os.path.getsize(path))
+    plt.close(fig)
+    return page, path, time.perf_counter() - start
+
+
+def render_pages(pages=None, output_dir='.', dpi=150, fmt='png', workers=None):
+    """
+    Renders pages to image files in a process pool using the Agg backend.
+    Returns {page: (path, seconds)} and prints the render time of each page.
+    """
+    pages = sorted(pages or PAGES)
+    os.makedirs(output_dir, exist_ok=True)
+    _use_agg()
+    results = {}
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers or min(len(pages), os.cpu_count() or 1),
+                             initializer=_use_agg) as pool:
+        futures = [pool.submit(render_page, page, output_dir, dpi, fmt) for page in pages]
+        for future in as_completed(futures):
+            page, path, seconds = future.result()
+            results[page] = (path, seconds)
+            print(f"Page {page}: {path} rendered in {seconds:.2f}s")
+    print(f"Rendered {len(pages)} pages in {time.perf_counter() - start:.2f}s")
+    return results
 
 
 # --- Main Execution ---
 if __name__ == '__main__':
-    visualize_page_4()
-    visualize_page_5()
-    visualize_page_6()
-    visualize_page_7()
-    visualize_page_8()
-
-    plt.show()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Report page visualizations.")
+    parser.add_argument('--render', action='store_true', help="Render pages to files instead of showing them")
+    parser.add_argument('--pages', type=int, nargs='+', choices=sorted(PAGES), help="Pages to render (default: all)")
+    parser.add_argument('--output-dir', default='.')
+    parser.add_argument('--dpi', type=int, default=150)
+    parser.add_argument('--format', default='png', help="Image format, e.g. png, jpg, svg, pdf")
+    parser.add_argument('--workers', type=int, help="Worker processes (default: one per page, up to the CPU count)")
+    parser.add_argument('--trace', help="Write a Chrome trace of page rendering to this file")
+    args = parser.parse_args()
+    if args.trace:
+        tracing.enable(args.trace)
+
+    if args.render:
+        render_pages(args.pages, args.output_dir, args.dpi, args.format, args.workers)
+    else:
+        visualize_page_4()
+        visualize_page_5()
+        visualize_page_6()
+        visualize_page_7()
+        visualize_page_8()
+
+        plt.show()
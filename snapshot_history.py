@@ -0,0 +1,272 @@
+import csv
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+from highlights_loader import clean_metric_name, is_section_header, parse_rows
+
+# --- Versioned snapshot history ---
+# Every crawl (or hand-copied CSV) of a bank's highlights table becomes a
+# version, but only the cells whose printed text differs from the bank's
+# latest state are stored, keyed by (metric, period label). Period labels
+# are absolute ("1Q25", "6M25", "2Q25 vs 1Q25"), so a snapshot one quarter
+# later shares most of its cells with the previous one and only the new
+# periods and any restated figures are written. The table layout (section
+# headers, labels, the junk first line) is stored once per distinct layout.
+# A crawl identical to the latest version only updates its checked_at time.
+#
+# Snapshot at version v = for each cell of v's layout, the newest stored
+# text with version <= v. Restatements between two versions = cells stored
+# in between whose key appears in both layouts with a different text.
+
+DEFAULT_HISTORY = 'snapshot_history.sqlite'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS layouts (
+    sha256 TEXT PRIMARY KEY,
+    rows TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS versions (
+    version INTEGER PRIMARY KEY AUTOINCREMENT,
+    bank TEXT NOT NULL,
+    source TEXT NOT NULL,
+    sha256 TEXT NOT NULL,
+    layout TEXT NOT NULL REFERENCES layouts (sha256),
+    crawled_at REAL NOT NULL,
+    checked_at REAL NOT NULL,
+    cells INTEGER NOT NULL,
+    changed INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS versions_by_bank ON versions (bank, version);
+CREATE TABLE IF NOT EXISTS cells (
+    bank TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    period TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    text TEXT NOT NULL,
+    PRIMARY KEY (bank, version, metric, period)
+) WITHOUT ROWID;
+"""
+
+
+def split_layout(rows):
+    """
+    Separates raw table rows into a layout and cells. Metric rows under a
+    section header become ['metric', label, width]; every other row is kept
+    as ['raw', row]. Returns (layout, {(metric, period): text}).
+    """
+    layout, cells = [], {}
+    periods = None
+    for row in rows:
+        if is_section_header(row):
+            periods = [cell.strip() for cell in row[1:]]
+            layout.append(['raw', row])
+        elif periods is None or not any(cell.strip() for cell in row):
+            layout.append(['raw', row])
+        else:
+            metric = clean_metric_name(row[0].strip())
+            layout.append(['metric', row[0], len(row) - 1])
+            for period, text in zip(periods, row[1:]):
+                if period:
+                    cells[(metric, period)] = text
+    return layout, cells
+
+
+def join_layout(layout, cells):
+    """Inverse of split_layout()."""
+    rows = []
+    periods = []
+    for entry in layout:
+        if entry[0] == 'raw':
+            row = entry[1]
+            if is_section_header(row):
+                periods = [cell.strip() for cell in row[1:]]
+        else:
+            _, label, width = entry
+            metric = clean_metric_name(label.strip())
+            row = [label] + [cells.get((metric, period), '') for period in periods[:width]]
+            row += [''] * (width + 1 - len(row))
+        rows.append(row)
+    return rows
+
+
+def _sha256(value):
+    return hashlib.sha256(json.dumps(value, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+class SnapshotHistory:
+    """SQLite-backed history of highlights snapshots storing only changed cells."""
+
+    def __init__(self, path=DEFAULT_HISTORY):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(_SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # --- Recording ---
+
+    def record(self, path, bank, crawled_at=None):
+        """Records a highlights CSV as the next version of `bank` (timestamp: the file's mtime)."""
+        with open(path, newline='', encoding='utf-8') as f:
+            rows = list(csv.reader(f))
+        return self.record_rows(rows, bank, str(path), os.path.getmtime(path) if crawled_at is None else crawled_at)
+
+    def record_rows(self, rows, bank, source, crawled_at=None):
+        """
+        Records raw table rows (as extracted by the crawler) as the next
+        version of `bank`. Returns a dict with the version, the number of
+        cells in the snapshot and the number stored; an unchanged snapshot
+        is not stored again ('skipped').
+        """
+        crawled_at = time.time() if crawled_at is None else crawled_at
+        digest = _sha256(rows)
+        latest = self.conn.execute(
+            "SELECT version, sha256 FROM versions WHERE bank = ? ORDER BY version DESC LIMIT 1", (bank,)).fetchone()
+        layout, cells = split_layout(rows)
+        if latest and latest[1] == digest:
+            with self.conn:
+                self.conn.execute("UPDATE versions SET checked_at = ? WHERE version = ?", (crawled_at, latest[0]))
+            return {'version': latest[0], 'cells': len(cells), 'changed': 0, 'skipped': True}
+
+        state = self._state(bank)
+        changed = [(key, text) for key, text in cells.items() if state.get(key) != text]
+        layout_sha = _sha256(layout)
+        with self.conn:
+            self.conn.execute("INSERT OR IGNORE INTO layouts VALUES (?, ?)",
+                              (layout_sha, json.dumps(layout, ensure_ascii=False)))
+            version = self.conn.execute(
+                "INSERT INTO versions (bank, source, sha256, layout, crawled_at, checked_at, cells, changed) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (bank, source, digest, layout_sha, crawled_at, crawled_at, len(cells), len(changed))).lastrowid
+            self.conn.executemany("INSERT INTO cells VALUES (?, ?, ?, ?, ?)",
+                                  [(bank, metric, period, version, text) for (metric, period), text in changed])
+        return {'version': version, 'cells': len(cells), 'changed': len(changed), 'skipped': False}
+
+    # --- Queries ---
+
+    def _state(self, bank, version=None):
+        """{(metric, period): text} as of `version` (default: the latest)."""
+        sql = "SELECT metric, period, text FROM cells WHERE bank = ?"
+        params = [bank]
+        if version is not None:
+            sql += " AND version <= ?"
+            params.append(version)
+        state = {}
+        for metric, period, text in self.conn.execute(sql + " ORDER BY version", params):
+            state[(metric, period)] = text
+        return state
+
+    def _version(self, version):
+        row = self.conn.execute(
+            "SELECT v.bank, l.rows FROM versions v JOIN layouts l ON l.sha256 = v.layout WHERE v.version = ?",
+            (version,)).fetchone()
+        if row is None:
+            raise KeyError(f"Unknown version: {version}")
+        return row[0], json.loads(row[1])
+
+    def versions(self, bank=None):
+        """Every version as a dict, oldest first."""
+        sql = "SELECT version, bank, source, crawled_at, checked_at, cells, changed FROM versions"
+        params = []
+        if bank is not None:
+            sql += " WHERE bank = ?"
+            params.append(bank)
+        keys = ('version', 'bank', 'source', 'crawled_at', 'checked_at', 'cells', 'changed')
+        return [dict(zip(keys, row)) for row in self.conn.execute(sql + " ORDER BY version", params)]
+
+    def version_at(self, bank, when):
+        """The latest version of `bank` crawled at or before `when` (a timestamp), or None."""
+        row = self.conn.execute(
+            "SELECT max(version) FROM versions WHERE bank = ? AND crawled_at <= ?", (bank, when)).fetchone()
+        return row[0]
+
+    def rows(self, version):
+        """The table rows of a version, as they were crawled."""
+        bank, layout = self._version(version)
+        return join_layout(layout, self._state(bank, version))
+
+    def snapshot(self, version):
+        """A version as a Highlights object."""
+        return parse_rows(self.rows(version))
+
+    def write_csv(self, version, path):
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            csv.writer(f).writerows(self.rows(version))
+
+    def restated(self, old_version, new_version):
+        """
+        Figures that changed between two versions of a bank: cells present
+        in both snapshots whose text differs. Returns a list of dicts with
+        metric, period, old and new text and the version that changed it.
+        """
+        bank, old_layout = self._version(old_version)
+        new_bank, new_layout = self._version(new_version)
+        if bank != new_bank:
+            raise ValueError(f"Versions {old_version} and {new_version} belong to different banks")
+        if old_version > new_version:
+            old_version, new_version = new_version, old_version
+            old_layout, new_layout = new_layout, old_layout
+        changes = {}
+        for metric, period, version, text in self.conn.execute(
+                "SELECT metric, period, version, text FROM cells WHERE bank = ? AND version > ? AND version <= ? "
+                "ORDER BY version", (bank, old_version, new_version)):
+            changes[(metric, period)] = (version, text)
+        if not changes:
+            return []
+        _, old_cells = split_layout(join_layout(old_layout, self._state(bank, old_version)))
+        _, new_keys = split_layout(join_layout(new_layout, {}))
+        results = []
+        for key, (version, text) in changes.items():
+            if key in old_cells and key in new_keys and old_cells[key] != text:
+                results.append({'metric': key[0], 'period': key[1], 'old': old_cells[key], 'new': text,
+                                'version': version})
+        return results
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Versioned history of highlights snapshots.")
+    parser.add_argument('--history', default=DEFAULT_HISTORY)
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    record_parser = subparsers.add_parser('record', help="Record CSVs as new versions, in the order given")
+    record_parser.add_argument('files', nargs='+')
+    record_parser.add_argument('--bank', default='Techcombank')
+    log_parser = subparsers.add_parser('log', help="List versions")
+    log_parser.add_argument('--bank')
+    show_parser = subparsers.add_parser('show', help="Rebuild the CSV of a version")
+    show_parser.add_argument('version', type=int)
+    show_parser.add_argument('--output', help="CSV to write (default: print the table)")
+    diff_parser = subparsers.add_parser('restated', help="Figures restated between two versions")
+    diff_parser.add_argument('old', type=int)
+    diff_parser.add_argument('new', type=int)
+    args = parser.parse_args()
+
+    with SnapshotHistory(args.history) as history:
+        if args.command == 'record':
+            for path in args.files:
+                print(f"{path}: {history.record(path, args.bank)}")
+        elif args.command == 'log':
+            for v in history.versions(args.bank):
+                crawled = time.strftime('%Y-%m-%d %H:%M', time.localtime(v['crawled_at']))
+                print(f"{v['version']:5d}  {v['bank']:15} {crawled}  {v['changed']:4d}/{v['cells']:4d} cells stored"
+                      f"  {v['source']}")
+        elif args.command == 'show':
+            if args.output:
+                history.write_csv(args.version, args.output)
+                print(f"Wrote {args.output}")
+            else:
+                print(history.snapshot(args.version).to_frame())
+        else:
+            for r in history.restated(args.old, args.new):
+                print(f"{r['metric']} [{r['period']}]: {r['old']} -> {r['new']} (version {r['version']})")
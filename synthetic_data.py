@@ -0,0 +1,234 @@
+import csv
+import os
+
+import numpy as np
+
+from highlights_loader import period_columns, quarter_key, quarter_label
+
+# --- Synthetic highlights data ---
+# Highlights snapshots for made-up banks in the exact layout of
+# aithucchien_*.csv: the 'Column1,...' line, three sections with repeated
+# period headers, five quarters, two year-to-date columns, three "vs" columns,
+# quoted thousands, parenthesised negatives, % and bps changes and footnote
+# digits on some labels. Each bank gets a simulated quarterly history, so the
+# year-to-date and "vs" columns are consistent with the quarter columns.
+
+# kind: 'stock' (VND bn, YTD = end of period), 'flow' (VND bn, YTD = sum of the
+# quarters), 'ratio' (%, YTD = end of period), 'share' (%, computed from flows,
+# YTD computed from the YTD sums)
+SECTIONS = [
+    ('Balance sheet (VND Bn)', [
+        ('Total assets', 'stock'),
+        ('Deposits from customers', 'stock'),
+        ('Credit growth1', 'ratio'),
+        ('CASA', 'ratio'),
+        ('NPL', 'ratio'),
+        ('Credit costs (LTM)', 'ratio'),
+        ('Coverage ratio', 'ratio'),
+    ]),
+    ('Capital and liquidity', [
+        ('Basel II CAR', 'ratio'),
+        ('Basel II Tier 1 ratio', 'ratio'),
+        ('Total Risk Weighted Assets', 'stock'),
+        ('ST fundings to MLT loans2', 'ratio'),
+        ('LDR2', 'ratio'),
+    ]),
+    ('Profitability (VND Bn)', [
+        ('Net interest income', 'flow'),
+        ('Non-interest income', 'flow'),
+        ('Total operating income', 'flow'),
+        ('Operating expenses', 'flow'),
+        ('Profit before tax', 'flow'),
+        ('NFI/TOI3', 'share'),
+        ('CIR', 'share'),
+        ('ROA (LTM)', 'ratio'),
+        ('ROE (LTM)', 'ratio'),
+        ('NIM (LTM)', 'ratio'),
+        ('Cost of funds', 'ratio'),
+    ]),
+]
+
+# Ratios that start around (level, quarterly volatility), in percent
+_RATIO_LEVELS = {
+    'CASA': (40.0, 1.0), 'NPL': (1.3, 0.08), 'Credit costs (LTM)': (0.9, 0.1),
+    'Coverage ratio': (105.0, 4.0), 'Basel II CAR': (15.0, 0.4), 'Basel II Tier 1 ratio': (14.5, 0.4),
+    'ST fundings to MLT loans2': (25.0, 1.0), 'LDR2': (80.0, 2.0), 'ROA (LTM)': (2.4, 0.1),
+    'ROE (LTM)': (15.5, 0.6), 'NIM (LTM)': (4.1, 0.15), 'Cost of funds': (3.4, 0.1),
+}
+_TWO_DECIMALS = {'NPL'}
+HISTORY_START = '1Q15'
+
+
+def simulate_bank(seed, quarters):
+    """
+    Quarterly history of one bank: {metric: array over `quarters` consecutive
+    quarters}. Flows are per quarter; stocks and ratios are end-of-quarter values.
+    """
+    rng = np.random.default_rng(seed)
+    n = quarters
+    size = rng.uniform(0.05, 1.5)  # relative to a Techcombank-sized bank
+    growth = rng.normal(0.025, 0.02, n)
+
+    def stock(start):
+        return start * size * np.cumprod(1 + growth + rng.normal(0, 0.01, n))
+
+    h = {}
+    h['Total assets'] = stock(600_000)
+    h['Deposits from customers'] = stock(350_000)
+    h['Total Risk Weighted Assets'] = stock(650_000)
+    loans = stock(420_000)
+    for name, (level, vol) in _RATIO_LEVELS.items():
+        h[name] = np.clip(level + np.cumsum(rng.normal(0, vol, n)), level * 0.3, None)
+
+    # Credit growth is year to date: loans against the previous year end
+    keys = quarter_key(HISTORY_START) + np.arange(n)
+    year_end = np.maximum(np.arange(n) - (keys % 4) - 1, 0)
+    h['Credit growth1'] = (loans / loans[year_end] - 1) * 100
+
+    def drifting(level, vol, low, high):
+        return np.clip(level + np.cumsum(rng.normal(0, vol, n)), low, high)
+
+    h['Net interest income'] = h['Total assets'] * h['NIM (LTM)'] / 100 / 4
+    h['Non-interest income'] = h['Net interest income'] * drifting(rng.uniform(0.2, 0.5), 0.03, 0.1, 0.8)
+    h['Total operating income'] = h['Net interest income'] + h['Non-interest income']
+    h['Operating expenses'] = -h['Total operating income'] * drifting(rng.uniform(0.25, 0.45), 0.02, 0.15, 0.7)
+    provisions = h['Total operating income'] * drifting(rng.uniform(0.05, 0.2), 0.015, 0.0, 0.4)
+    h['Profit before tax'] = h['Total operating income'] + h['Operating expenses'] - provisions
+    return h
+
+
+def _share(name, values):
+    """The 'share' metrics, from (flows) values."""
+    if name == 'NFI/TOI3':
+        return values['Non-interest income'] / values['Total operating income'] * 100
+    return -values['Operating expenses'] / values['Total operating income'] * 100
+
+
+def _fmt_vnd(value):
+    text = f"{abs(value):,.0f}"
+    return f"({text})" if round(value) < 0 else text
+
+
+def _fmt_pct(name, value):
+    return f"{value:.2f}%" if name in _TWO_DECIMALS else f"{value:.1f}%"
+
+
+def _fmt_change_pct(cur, prev):
+    return f"{(cur / prev - 1) * 100:.1f}%"
+
+
+def _fmt_bps(cur, prev):
+    bps = round((cur - prev) * 100)
+    return f"{'-' if bps < 0 else '+'}{abs(bps):,} bps"
+
+
+def snapshot_rows(history, quarter, junk_header=True):
+    """
+    CSV rows of the highlights table reported at `quarter` (e.g. '2Q25'), for
+    a history from simulate_bank() starting at HISTORY_START.
+    """
+    end = quarter_key(quarter) - quarter_key(HISTORY_START)
+    if end < 8:
+        raise ValueError(f"{quarter} needs two years of history after {HISTORY_START}")
+    cols = list(range(end - 4, end + 1))
+    qkey = quarter_key(quarter)
+    n_ytd = qkey % 4 + 1
+    ytd_cur = list(range(end - n_ytd + 1, end + 1))
+    ytd_prev = [i - 4 for i in ytd_cur]
+    header = period_columns(qkey)
+
+    flows = {name: history[name] for _, metrics in SECTIONS for name, kind in metrics if kind == 'flow'}
+    rows = [[f"Column{i}" for i in range(1, 12)]] if junk_header else []
+    for section, metrics in SECTIONS:
+        rows.append([section] + header)
+        for name, kind in metrics:
+            if kind == 'share':
+                series = _share(name, history)
+                ytd = (_share(name, {k: v[ytd_prev].sum() for k, v in flows.items()}),
+                       _share(name, {k: v[ytd_cur].sum() for k, v in flows.items()}))
+            else:
+                series = history[name]
+                if kind == 'flow':
+                    ytd = (series[ytd_prev].sum(), series[ytd_cur].sum())
+                else:
+                    ytd = (series[ytd_prev[-1]], series[ytd_cur[-1]])
+            pairs = [(ytd[1], ytd[0]), (series[end], series[end - 1]), (series[end], series[end - 4])]
+            if kind in ('stock', 'flow'):
+                cells = [_fmt_vnd(v) for v in list(series[cols]) + list(ytd)]
+                cells += [_fmt_change_pct(cur, prev) for cur, prev in pairs]
+            else:
+                cells = [_fmt_pct(name, v) for v in list(series[cols]) + list(ytd)]
+                cells += [_fmt_bps(cur, prev) for cur, prev in pairs]
+            rows.append([name] + cells)
+    if junk_header:
+        rows.append([''] * 11)  # the trailing ',,,,' line of the exported files
+    return rows
+
+
+def highlights_html(rows, decoy_tables=0, copies=1):
+    """
+    An HTML highlights page for table rows: the table (repeated `copies`
+    times to make it big) among `decoy_tables` small navigation tables.
+    """
+    rows = [row for row in rows if any(cell.strip() for cell in row)]
+    if rows[0][0].startswith('Column'):
+        rows = rows[1:]
+    parts = ['<html><head><title>Financial highlights</title></head><body>']
+    for i in range(decoy_tables):
+        parts.append(f'<div class="nav"><table class="menu"><tr><td><a href="/p{i}">Link {i}</a></td>'
+                     f'<td>Item {i}</td></tr></table></div>')
+    parts.append('<table id="highlights"><thead><tr>')
+    parts.extend(f'<th>{cell}</th>' for cell in rows[0])
+    parts.append('</tr></thead><tbody>')
+    for _ in range(copies):
+        for row in rows[1:]:
+            parts.append('<tr>' + ''.join(f'<td><span>{cell}</span></td>' for cell in row) + '</tr>')
+    parts.append('</tbody></table></body></html>')
+    return ''.join(parts).encode('utf-8')
+
+
+def bank_name(index):
+    return f"Bank{index:04d}"
+
+
+def generate(output_dir, banks=10, quarters=4, end='2Q25', seed=0, html=False, decoy_tables=50):
+    """
+    Writes <output_dir>/<bank>/<quarter>.csv (and .html) for `banks` banks and
+    the last `quarters` reporting quarters up to `end`.
+    Returns [(bank, quarter, csv path)].
+    """
+    end_key = quarter_key(end)
+    periods = [quarter_label(k) for k in range(end_key - quarters + 1, end_key + 1)]
+    history_len = end_key - quarter_key(HISTORY_START) + 1
+    written = []
+    for b in range(banks):
+        bank = bank_name(b)
+        history = simulate_bank(seed * 1_000_003 + b, history_len)
+        bank_dir = os.path.join(output_dir, bank)
+        os.makedirs(bank_dir, exist_ok=True)
+        for period in periods:
+            rows = snapshot_rows(history, period)
+            path = os.path.join(bank_dir, f"{period}.csv")
+            with open(path, 'w', newline='', encoding='utf-8') as f:
+                csv.writer(f).writerows(rows)
+            if html:
+                with open(os.path.join(bank_dir, f"{period}.html"), 'wb') as f:
+                    f.write(highlights_html(rows, decoy_tables))
+            written.append((bank, period, path))
+    return written
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Synthetic highlights CSVs/pages for N banks x M quarters.")
+    parser.add_argument('output_dir')
+    parser.add_argument('--banks', type=int, default=10)
+    parser.add_argument('--quarters', type=int, default=4, help="Reporting quarters per bank, ending at --end")
+    parser.add_argument('--end', default='2Q25')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--html', action='store_true', help="Also write a highlights HTML page per CSV")
+    args = parser.parse_args()
+
+    written = generate(args.output_dir, args.banks, args.quarters, args.end, args.seed, args.html)
+    print(f"Wrote {len(written)} snapshots for {args.banks} banks to {args.output_dir}")
@@ -0,0 +1,31 @@
+from matplotlib.figure import Figure
+from reportlab.pdfgen.canvas import Canvas
+
+from chart_flowables import FigureFlowable
+
+
+class _RecordingCanvas(Canvas):
+    def __init__(self, path):
+        super().__init__(path)
+        self.calls = []
+
+    def translate(self, dx, dy):
+        self.calls.append(('translate', dx, dy))
+        super().translate(dx, dy)
+
+    def scale(self, x, y):
+        self.calls.append(('scale', x, y))
+        super().scale(x, y)
+
+
+def test_figure_keeps_its_proportions(tmp_path):
+    flowable = FigureFlowable(Figure(figsize=(14, 6)), width=450, height=225)
+    canvas = _RecordingCanvas(str(tmp_path / 'chart.pdf'))
+    flowable.drawOn(canvas, 0, 0)
+
+    (_, sx, sy), = [call for call in canvas.calls if call[0] == 'scale']
+    assert sx == sy
+    assert abs(flowable._drawing.width * sx - 450) < 0.5
+    # centred vertically in the 225 pt box
+    dy = [call[2] for call in canvas.calls if call[0] == 'translate'][-1]
+    assert abs(dy - (225 - flowable._drawing.height * sy) / 2) < 0.5
@@ -0,0 +1,18 @@
+import csv
+
+from columnar_store import import_csvs
+
+
+def _cells(path):
+    with open(path, newline='', encoding='utf-8') as f:
+        return [[cell.strip() for cell in row] for row in csv.reader(f) if any(row)]
+
+
+def test_export_keeps_printed_decimals(tmp_path):
+    # NPL has two decimals in its quarters and one in its YTD columns; NFI/TOI prints '23.0%'
+    store = import_csvs([('Techcombank', 'aithucchien_2.csv'), ('Techcombank', 'aithucchien_1.csv')],
+                        str(tmp_path / 'store'))
+    for source, quarter in (('aithucchien_1.csv', '2Q25'), ('aithucchien_2.csv', '1Q25')):
+        output = tmp_path / f"{quarter}.csv"
+        store.export_csv('Techcombank', quarter, str(output))
+        assert _cells(output)[1:] == _cells(source)[1:]
@@ -0,0 +1,76 @@
+import asyncio
+import http.server
+import threading
+import time
+from collections import Counter
+
+from crawler import CrawlTarget, crawl_many
+
+PAGE = (b'<html><body><table><tr><th>Balance sheet</th><th>1Q25</th></tr>'
+        b'<tr><td>Total assets</td><td>1,000</td></tr></table></body></html>')
+
+
+class _StubServer:
+    """Local HTTP server: /busy/* answers 429 once, /down always, /slow after a pause; tracks concurrency."""
+
+    def __init__(self):
+        self.hits = Counter()
+        self.active = self.max_active = 0
+        lock = threading.Lock()
+        stub = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                with lock:
+                    stub.hits[self.path] += 1
+                    first = stub.hits[self.path] == 1
+                    stub.active += 1
+                    stub.max_active = max(stub.max_active, stub.active)
+                try:
+                    time.sleep(0.3 if self.path == '/slow' else 0.05)
+                    status = 429 if self.path == '/down' or (self.path.startswith('/busy') and first) else 200
+                    body = PAGE if status == 200 else b'slow down'
+                    self.send_response(status)
+                    self.send_header('Content-Length', str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                finally:
+                    with lock:
+                        stub.active -= 1
+
+            def log_message(self, *args):
+                pass
+
+        self.server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+
+def _crawl(targets, **options):
+    async def run():
+        return [result async for result in crawl_many(targets, backoff=0.01, **options)]
+    return asyncio.run(run())
+
+
+def test_crawl_many_retries_and_per_host_cap():
+    stub = _StubServer()
+    try:
+        paths = ['/slow'] + [f"/busy/{i}" for i in range(3)] + [f"/page/{i}" for i in range(4)] + ['/down']
+        targets = [CrawlTarget('Bank', path, stub.base_url + path) for path in paths]
+        results = _crawl(targets, per_host=2, retries=2)
+    finally:
+        stub.server.shutdown()
+
+    by_path = {result.target.period: result for result in results}
+    assert len(results) == len(paths)
+    # one 429 then 200: retried once and parsed
+    for i in range(3):
+        assert stub.hits[f"/busy/{i}"] == 2
+        assert by_path[f"/busy/{i}"].table == [['Balance sheet', '1Q25'], ['Total assets', '1,000']]
+    # always 429: the first request and two retries, then yielded with the error
+    assert stub.hits['/down'] == 3
+    assert by_path['/down'].error is not None and by_path['/down'].table is None
+    # never more than per_host requests in flight on the host, and the cap is used
+    assert stub.max_active == 2
+    # results stream in completion order: the slow page, listed first, is not yielded first
+    assert results[0].target.period != '/slow'
@@ -0,0 +1,23 @@
+import io
+
+import fast_charts
+
+NAN = float('nan')
+DATA = {'pbt_labels': ['6T 2024', '6T 2025'], 'pbt': [15628.0, NAN], 'years': ['2024', '2025'],
+        'credit_costs': [NAN, 0.6], 'credit_growth': [NAN, NAN], 'nim': [4.2, NAN], 'cof': [NAN, 3.5],
+        'roa': [2.2, NAN], 'roe': [NAN, 14.5]}
+
+
+def test_charts_with_placeholder_cells():
+    for name, chart in fast_charts.CHARTS.items():
+        fig = chart(DATA)
+        fast_charts.render(fig, io.BytesIO(), dpi=20)
+        labels = [t.get_text() for t in fig.axes[0].texts]
+        assert 'nan' not in ''.join(labels).lower(), name
+    assert [t.get_text() for t in fast_charts.CHARTS['pbt'](DATA).axes[0].texts] == ['15,628', '']
+
+
+def test_batch_with_placeholder_cells(tmp_path):
+    other = dict(DATA, pbt=[NAN, 15135.0])
+    paths = fast_charts.render_many('pbt', {'a': DATA, 'b': other}, str(tmp_path / '{bank}.png'), dpi=20)
+    assert len(paths) == 2
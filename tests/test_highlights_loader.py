@@ -0,0 +1,8 @@
+from highlights_loader import parse_rows
+
+
+def test_parse_rows_without_metric_rows():
+    h = parse_rows([['Balance sheet (VND Bn)', '1Q25', '2Q25'],
+                    ['Income statement (VND Bn)', '1Q25', '2Q25']])
+    assert h.columns == ['1Q25', '2Q25']
+    assert h.values.shape == (0, 2) and h.labels == []
@@ -0,0 +1,17 @@
+from highlights_loader import parse_rows
+from panel_store import PanelStore
+
+
+def _table(*quarters_and_values):
+    quarters, values = zip(*quarters_and_values)
+    return parse_rows([['Balance sheet (VND Bn)', *quarters], ['Total assets', *values]])
+
+
+def test_placeholder_cell_keeps_value(tmp_path):
+    with PanelStore(str(tmp_path / 'panel.sqlite')) as store:
+        store.ingest_highlights(_table(('1Q25', '989,216'), ('2Q25', '1,037,645')), 'Techcombank', 'old.csv')
+        summary = store.ingest_highlights(_table(('2Q25', '-'), ('3Q25', '1,050,000')), 'Techcombank', 'new.csv')
+
+        assert summary['empty'] == 1 and summary['restated'] == 0
+        assert store.series('Techcombank', 'Total assets') == [('1Q25', 989216.0), ('2Q25', 1037645.0),
+                                                              ('3Q25', 1050000.0)]
@@ -0,0 +1,50 @@
+import numpy as np
+
+from highlights_loader import parse_rows
+from pdf_extractor import extract_rows
+
+PAGE = """\
+Investor presentation, page 12
+Balance sheet (VND Bn)    2Q24      3Q24      4Q24      1Q25      2Q25
+Total assets           908,307   927,053   978,799   989,216 1,037,645
+Deposits from customers 493,497  -         565,055   n/a       589,078
+"""
+
+
+def test_placeholder_cells_parse_as_nan():
+    rows = extract_rows(PAGE)
+    assert [row[0] for row in rows] == ['Balance sheet (VND Bn)', 'Total assets', 'Deposits from customers']
+
+    h = parse_rows(rows)
+    assert h.get('Total assets', '2Q25') == 1037645
+    assert h.get('Deposits from customers', '2Q24') == 493497
+    assert np.isnan(h.get('Deposits from customers', '3Q24'))
+    assert np.isnan(h.get('Deposits from customers', '1Q25'))
+
+
+def test_parse_rows_accepts_raw_placeholders():
+    rows = [['Balance sheet (VND Bn)', '1Q25', '2Q25'],
+            ['Total assets', '-', '1,037,645'],
+            ['CASA', 'N/A', '41.1%']]
+    h = parse_rows(rows)
+    assert np.isnan(h.get('Total assets', '1Q25'))
+    assert np.isnan(h.get('CASA', '1Q25'))
+    assert h.get('CASA', '2Q25') == 41.1
+
+
+def test_extract_pdf_rows_is_quiet(tmp_path, capsys):
+    from reportlab.pdfgen.canvas import Canvas
+
+    from pdf_extractor import extract_pdf_rows
+
+    path = str(tmp_path / 'deck.pdf')
+    canvas = Canvas(path)
+    canvas.setFont('Courier', 8)
+    for i, line in enumerate(PAGE.splitlines()):
+        canvas.drawString(20, 800 - 12 * i, line)
+    canvas.save()
+
+    for _ in range(2):  # read, then cached
+        rows = extract_pdf_rows(path, cache_dir=str(tmp_path / 'cache'), workers=1)
+        assert [row[0] for row in rows] == ['Balance sheet (VND Bn)', 'Total assets', 'Deposits from customers']
+    assert capsys.readouterr().out == ''
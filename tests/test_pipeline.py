@@ -0,0 +1,22 @@
+import generate_report as gr
+from pipeline import REPORT_ASSETS, Job, build_graph, job_key, read_jobs
+
+
+def test_default_job():
+    job = Job(gr.DEFAULT_BANK, source=gr.DEFAULT_SOURCE)
+    assert job.period is None and job.url is None
+    assert job_key(job) == f"{gr.DEFAULT_BANK}_aithucchien_1"
+
+
+def test_read_jobs_without_period(tmp_path):
+    path = tmp_path / 'jobs.csv'
+    path.write_text('bank,source\nTechcombank,aithucchien_2.csv\n', encoding='utf-8')
+    assert read_jobs(str(path)) == [Job('Techcombank', source='aithucchien_2.csv')]
+
+
+def test_pdf_depends_on_rendered_pbt_chart(tmp_path):
+    nodes = {node.name: node for node in build_graph([Job('Techcombank', '2Q25', source='aithucchien_1.csv')],
+                                                     str(tmp_path))}
+    assert 'pbt_chart.png' not in REPORT_ASSETS
+    assert 'pbt_chart:Techcombank_2Q25' in nodes['pdf:Techcombank_2Q25'].deps
+    assert nodes['pbt_chart:Techcombank_2Q25'].outputs[0].endswith('pbt_chart.png')
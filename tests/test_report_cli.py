@@ -0,0 +1,13 @@
+import argparse
+
+from report_cli import cmd_periods
+
+
+def test_periods_data_dir_order(tmp_path, capsys):
+    bank_dir = tmp_path / 'Techcombank'
+    bank_dir.mkdir()
+    for period in ('FY24', '1Q25', '4Q24', '6M24', '2Q24', '3Q24', '9M24', '3Q23'):
+        (bank_dir / f"{period}.csv").write_text('', encoding='utf-8')
+
+    cmd_periods(argparse.Namespace(data_dir=str(tmp_path), store=None, files=[]))
+    assert capsys.readouterr().out == "Techcombank: 3Q23 2Q24 6M24 3Q24 9M24 4Q24 FY24 1Q25\n"
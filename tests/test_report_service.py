@@ -0,0 +1,27 @@
+import threading
+from concurrent.futures import Future
+
+from report_service import LRUCache, ReportService
+
+
+class _InlineExecutor:
+    """Runs each job on submit, so its future is already done when the callback is added."""
+
+    def submit(self, func, *args):
+        future = Future()
+        future.set_result(func(*args))
+        return future
+
+
+def test_cached_with_finished_future():
+    service = ReportService()
+    service.pool.shutdown()
+    service.pool = _InlineExecutor()
+    cache = LRUCache(1 << 20)
+    results = []
+    thread = threading.Thread(target=lambda: results.append(service._cached(cache, 'key', bytes, 3)), daemon=True)
+    thread.start()
+    thread.join(10)
+    assert results == [(b'\0\0\0', False)]
+    assert cache.get('key') == b'\0\0\0' and not service._inflight
+    assert service._cached(cache, 'key', bytes, 3) == (b'\0\0\0', True)
@@ -0,0 +1,170 @@
+import functools
+import json
+import os
+import threading
+import time
+
+try:
+    import resource
+except ImportError:  # Windows: no peak RSS
+    resource = None
+
+# --- Tracing ---
+# Spans around the crawl, parse, render and build stages, written as Chrome
+# trace events (open the file in chrome://tracing or ui.perfetto.dev, or run
+# `python tracing.py trace.json` for a per-span summary).
+#
+# Tracing is off unless enabled with --trace on a CLI, enable(path) or the
+# REPORT_TRACE environment variable. enable() also sets the variable, so
+# worker processes started afterwards trace into the same file. Each finished
+# span is appended as one line, which keeps writes from several processes
+# intact. When tracing is off span() returns a shared no-op object.
+
+TRACE_ENV = 'REPORT_TRACE'
+
+_path = None
+_lock = threading.Lock()
+
+
+def enable(path, truncate=True):
+    """Starts writing spans of this process (and of workers started later) to `path`."""
+    global _path
+    if truncate or not os.path.exists(path):
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('[\n')
+    os.environ[TRACE_ENV] = path
+    _path = path
+
+
+def enabled():
+    return _path is not None
+
+
+def _peak_rss_kb():
+    if resource is None:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _write(event):
+    line = json.dumps(event, ensure_ascii=False) + ',\n'
+    with _lock:
+        with open(_path, 'a', encoding='utf-8') as f:
+            f.write(line)
+
+
+class Span:
+    """One timed region. set() attaches fields such as bytes_in/bytes_out."""
+
+    def __init__(self, name, fields):
+        self.name = name
+        self.fields = fields
+
+    def set(self, **fields):
+        self.fields.update(fields)
+
+    def __enter__(self):
+        self._start = time.time()  # wall clock, so spans of different processes line up
+        self._wall = time.perf_counter()
+        self._cpu = time.process_time()
+        self._rss = _peak_rss_kb()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        wall = time.perf_counter() - self._wall
+        args = dict(self.fields)
+        args['cpu_ms'] = round((time.process_time() - self._cpu) * 1000, 3)
+        rss = _peak_rss_kb()
+        if rss is not None:
+            args['peak_rss_kb'] = rss
+            args['peak_rss_growth_kb'] = rss - self._rss
+        if exc_type is not None:
+            args['error'] = exc_type.__name__
+        _write({
+            'name': self.name,
+            'ph': 'X',
+            'ts': round(self._start * 1e6),
+            'dur': round(wall * 1e6),
+            'pid': os.getpid(),
+            'tid': threading.get_ident(),
+            'args': args,
+        })
+        return False
+
+
+class _NullSpan:
+    def set(self, **fields):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(name, **fields):
+    """Context manager timing a region: `with span('http.get', url=url) as s: ...; s.set(bytes_in=n)`."""
+    if _path is None:
+        return _NULL_SPAN
+    return Span(name, fields)
+
+
+def traced(name=None):
+    """Decorator wrapping every call of a function in a span named after it."""
+    def decorate(func):
+        span_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _path is None:
+                return func(*args, **kwargs)
+            with Span(span_name, {}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def load_trace(path):
+    """Reads the events of a trace file (the trailing ']' is optional in this format)."""
+    with open(path, encoding='utf-8') as f:
+        text = f.read().rstrip().rstrip(',')
+    if not text.endswith(']'):
+        text += ']'
+    return json.loads(text)
+
+
+def summarize(events):
+    """Per span name: count, total wall ms, total CPU ms, max peak RSS (MB), bytes in/out."""
+    summary = {}
+    for event in events:
+        s = summary.setdefault(event['name'], {'count': 0, 'wall_ms': 0.0, 'cpu_ms': 0.0,
+                                               'peak_rss_mb': 0.0, 'bytes_in': 0, 'bytes_out': 0})
+        args = event.get('args', {})
+        s['count'] += 1
+        s['wall_ms'] += event['dur'] / 1000
+        s['cpu_ms'] += args.get('cpu_ms', 0)
+        s['peak_rss_mb'] = max(s['peak_rss_mb'], (args.get('peak_rss_kb') or 0) / 1024)
+        s['bytes_in'] += args.get('bytes_in', 0)
+        s['bytes_out'] += args.get('bytes_out', 0)
+    return summary
+
+
+if os.environ.get(TRACE_ENV):
+    # a worker process (or a run with REPORT_TRACE set): append to the shared file
+    enable(os.environ[TRACE_ENV], truncate=False)
+
+
+if __name__ == '__main__':
+    import sys
+
+    for trace_path in sys.argv[1:] or ['trace.json']:
+        rows = sorted(summarize(load_trace(trace_path)).items(), key=lambda item: -item[1]['wall_ms'])
+        print(f"{trace_path}:")
+        print(f"{'span':32s} {'count':>6s} {'wall ms':>10s} {'cpu ms':>10s} {'peak MB':>8s} {'KB in':>9s} {'KB out':>9s}")
+        for name, s in rows:
+            print(f"{name:32s} {s['count']:6d} {s['wall_ms']:10.1f} {s['cpu_ms']:10.1f} {s['peak_rss_mb']:8.0f} "
+                  f"{s['bytes_in'] / 1024:9.0f} {s['bytes_out'] / 1024:9.0f}")